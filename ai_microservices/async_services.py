@@ -0,0 +1,643 @@
+"""Asyncio serving mode for the AI microservice.
+
+Serves the same routes as services.py with aiohttp, awaiting the model via
+``ainvoke`` so a waiting Gemini call no longer holds a worker thread. The
+number of in-flight LLM calls is capped; excess requests queue up to a limit
+and are rejected with 429 once the queue is full.
+
+Run with ``python async_services.py``.
+"""
+import asyncio
+import json
+import os
+import time
+
+from aiohttp import web
+from langchain_core.messages import HumanMessage
+
+import metrics
+import services
+from single_flight import AsyncSingleFlight
+
+
+class QueueFullError(Exception):
+    """Raised when the LLM admission queue is at capacity"""
+
+
+class LLMAdmission:
+    """Caps concurrent LLM calls and bounds how many requests may wait for a slot"""
+
+    def __init__(self, max_in_flight=16, max_queue=64):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self._semaphore = None
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+        self.completed = 0
+
+    async def __aenter__(self):
+        # Created lazily so the semaphore binds to the serving event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise QueueFullError("Too many requests in progress, please retry shortly")
+
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.in_flight -= 1
+        self.completed += 1
+        self._semaphore.release()
+        return False
+
+    def stats(self):
+        return {
+            "maxInFlight": self.max_in_flight,
+            "maxQueue": self.max_queue,
+            "inFlight": self.in_flight,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+            "completed": self.completed
+        }
+
+
+admission = LLMAdmission(
+    max_in_flight=int(os.getenv("ASYNC_MAX_IN_FLIGHT", 16)),
+    max_queue=int(os.getenv("ASYNC_MAX_QUEUE", 64))
+)
+
+
+# Coroutine counterpart of services.llm_single_flight; bound to the serving loop
+llm_single_flight = AsyncSingleFlight()
+
+
+async def coalesce(endpoint, formatted_prompt, coro_factory):
+    """Await coro_factory() once for concurrent identical prompts and share its result"""
+    if not services.SINGLE_FLIGHT_ENABLED:
+        return await coro_factory()
+    result, _ = await llm_single_flight.do(services.llm_flight_key(endpoint, formatted_prompt), coro_factory)
+    return result
+
+
+def json_error(message, status):
+    return web.json_response({"error": message}, status=status)
+
+
+def llm_json_error(error):
+    """Async counterpart of services.llm_error_response"""
+    headers = {"Retry-After": str(error.retry_after)} if error.retry_after else None
+    return web.json_response({"error": str(error)}, status=error.status, headers=headers)
+
+
+async def ainvoke_llm_cached(endpoint, template_name, inputs, formatted_prompt, validate=None):
+    """Async counterpart of services.invoke_llm_cached, gated by the admission queue"""
+    # The cache may be SQLite-backed: look it up off the event loop
+    cache_key, cached = await run_blocking(services.lookup_cached_response, endpoint, template_name, inputs)
+    if cached is not None:
+        try:
+            if validate is not None:
+                validate(cached)
+            return cached
+        except ValueError:
+            pass
+
+    async def call():
+        # Only the call that actually reaches the model takes an admission slot
+        async with admission:
+            with metrics.stage("llm_invoke"):
+                response = await services.get_llm().ainvoke([HumanMessage(content=formatted_prompt)])
+        content = services.message_text(response)
+        usage = getattr(response, "usage_metadata", None) or {}
+        metrics.record_llm_io(
+            endpoint, formatted_prompt, content, usage.get("input_tokens"), usage.get("output_tokens")
+        )
+        if validate is not None:
+            validate(content)
+        await run_blocking(services.store_cached_response, cache_key, content)
+        return content
+
+    return await coalesce(endpoint, formatted_prompt, call)
+
+
+async def run_blocking(func, *args):
+    """Run CPU-bound or blocking work (PDF parsing, vector store) off the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, func, *args)
+
+
+async def run_analyses(pdf_text, job_description, analysis_types, extra_context=None):
+    """Async counterpart of services.run_analyses: one admitted model call per analysis type"""
+    async def run_one(analysis_type):
+        started = time.perf_counter()
+        formatted_prompt, inputs = services.format_analysis_prompt(
+            services.PROMPTS[analysis_type], pdf_text, job_description, extra_context
+        )
+        analysis = await ainvoke_llm_cached("analyze-resume", analysis_type, inputs, formatted_prompt)
+        return analysis, time.perf_counter() - started
+
+    outcomes = await asyncio.gather(*(run_one(t) for t in analysis_types), return_exceptions=True)
+
+    analyses, errors, timings = {}, {}, {}
+    service_errors = []
+    for analysis_type, outcome in zip(analysis_types, outcomes):
+        if isinstance(outcome, (services.LLMServiceError, QueueFullError)):
+            service_errors.append(outcome)
+            errors[analysis_type] = f"Error generating response: {str(outcome)}"
+        elif isinstance(outcome, Exception):
+            errors[analysis_type] = f"Error generating response: {str(outcome)}"
+        else:
+            analyses[analysis_type] = outcome[0]
+            timings[analysis_type] = round(outcome[1] * 1000, 1)
+    # Nothing to return: let the route report the provider error (or full queue) with its status
+    if service_errors and len(service_errors) == len(outcomes):
+        raise service_errors[0]
+    return analyses, errors, timings
+
+
+async def answer_company_question(company_name, question, context):
+    """Async counterpart of services.answer_company_question"""
+    if not context:
+        return services.NO_COMPANY_INFO
+    formatted_prompt, inputs = services.format_company_question_prompt(company_name, question, context)
+    return await ainvoke_llm_cached("research-company", "company_research", inputs, formatted_prompt)
+
+
+async def answer_company_questions(company_name, questions, answer_mode="concurrent"):
+    """Async counterpart of services.answer_company_questions: retrieval runs off the loop,
+    every model call awaits an admission slot"""
+    started = time.perf_counter()
+    contexts, reports, shared_context = await run_blocking(
+        services.retrieve_company_contexts, company_name, questions,
+        services.RESEARCH_BATCH_CONTEXT_TOKENS if answer_mode == "batched" else None
+    )
+    retrieval_ms = round((time.perf_counter() - started) * 1000, 1)
+    results = [{"question": question, "retrieval": report} for question, report in zip(questions, reports)]
+
+    started = time.perf_counter()
+    if answer_mode == "batched":
+        try:
+            if shared_context:
+                formatted_prompt, inputs = services.format_company_batch_prompt(
+                    company_name, questions, shared_context
+                )
+                content = await ainvoke_llm_cached(
+                    "research-company", "company_research_batch", inputs, formatted_prompt,
+                    validate=lambda completion: services.parse_batch_answers(completion, len(questions))
+                )
+                answers = services.parse_batch_answers(content, len(questions))
+            else:
+                answers = [services.NO_COMPANY_INFO for _ in questions]
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+            for result, answer in zip(results, answers):
+                result.update(answer=answer, timingMs=elapsed_ms)
+        except ValueError as e:
+            print(f"Batched company research answer unusable ({e}), answering separately")
+            answer_mode = "concurrent"
+
+    if answer_mode == "concurrent":
+        async def run_one(question, context):
+            question_started = time.perf_counter()
+            answer = await answer_company_question(company_name, question, context)
+            return answer, round((time.perf_counter() - question_started) * 1000, 1)
+
+        outcomes = await asyncio.gather(
+            *(run_one(question, context) for question, context in zip(questions, contexts)),
+            return_exceptions=True
+        )
+        service_errors = []
+        for result, outcome in zip(results, outcomes):
+            if isinstance(outcome, (services.LLMServiceError, QueueFullError)):
+                service_errors.append(outcome)
+                result["error"] = str(outcome)
+            elif isinstance(outcome, Exception):
+                result["error"] = f"Error querying company information: {str(outcome)}"
+            else:
+                result.update(answer=outcome[0], timingMs=outcome[1])
+        # Nothing to return: let the route report the provider error (or full queue) with its status
+        if service_errors and len(service_errors) == len(results):
+            raise service_errors[0]
+
+    return results, {
+        "retrieval": retrieval_ms,
+        "answers": round((time.perf_counter() - started) * 1000, 1)
+    }, answer_mode
+
+
+async def read_json(request):
+    try:
+        return await request.json()
+    except Exception:
+        return None
+
+
+async def analyze_resume(request):
+    """Async /api/analyze-resume"""
+    form = await request.post()
+
+    resume_file = form.get('resume')
+    if resume_file is None or not hasattr(resume_file, 'file'):
+        return json_error("Missing resume file", 400)
+
+    if 'jobDescription' not in form:
+        return json_error("Missing job description", 400)
+
+    try:
+        job_description = form['jobDescription']
+        analysis_type = form.get('analysisType', 'general')
+        try:
+            mode = services.parse_analysis_mode(form.get('mode'))
+        except ValueError as e:
+            return json_error(str(e), 400)
+
+        # Batch mode: several analysis types in one upload
+        analysis_types = None
+        if 'analysisTypes' in form:
+            try:
+                analysis_types = services.validate_analysis_types(form.getall('analysisTypes'))
+            except ValueError as e:
+                return json_error(str(e), 400)
+
+        if not resume_file.filename.lower().endswith('.pdf'):
+            return json_error("Only PDF files are supported", 400)
+
+        pdf_bytes = services.read_upload(resume_file.file, services.PDF_MAX_BYTES)
+        extraction = {}
+        pdf_text = await run_blocking(services.extract_text_from_pdf, pdf_bytes, extraction)
+
+        if pdf_text.startswith("Error"):
+            return json_error(pdf_text, 500)
+
+        template_name = analysis_type if analysis_type in services.PROMPTS else "general"
+        score = await run_blocking(services.score_resume, pdf_text, job_description) if mode != "llm" else None
+        extra_context = services.score_context(score) if mode == "hybrid" else None
+        if mode == "fast" and analysis_types is None:
+            if template_name not in services.FAST_ANALYSIS_TYPES:
+                return json_error(f"Fast mode supports only: {', '.join(services.FAST_ANALYSIS_TYPES)}", 400)
+            return web.json_response({
+                "success": True,
+                "analysis": services.format_score(score, template_name),
+                "analysisType": analysis_type,
+                "mode": mode,
+                "score": score,
+                "extraction": extraction
+            })
+
+        compaction = {}
+        pdf_text, job_description = await run_blocking(
+            services.compact_prompt_inputs, pdf_text, job_description, compaction
+        )
+
+        if analysis_types is not None:
+            # In fast mode the scorer answers what it can and the LLM handles the rest
+            local_types = [t for t in analysis_types if t in services.FAST_ANALYSIS_TYPES] if mode == "fast" else []
+            llm_types = [t for t in analysis_types if t not in local_types]
+            try:
+                analyses, errors, timings = await run_analyses(pdf_text, job_description, llm_types, extra_context)
+            except (QueueFullError, services.LLMServiceError) as e:
+                if not local_types:
+                    if isinstance(e, QueueFullError):
+                        raise
+                    return llm_json_error(e)
+                analyses, errors, timings = {}, {t: f"Error generating response: {str(e)}" for t in llm_types}, {}
+            for local_type in local_types:
+                analyses[local_type] = services.format_score(score, local_type)
+                timings[local_type] = score["elapsedMs"]
+
+            if not analyses:
+                return web.json_response({"error": "All analyses failed", "errors": errors}, status=500)
+
+            return web.json_response({
+                "success": True,
+                "partial": bool(errors),
+                "analyses": analyses,
+                "errors": errors,
+                "analysisTypes": analysis_types,
+                "timingsMs": timings,
+                "mode": mode,
+                "score": score,
+                "extraction": extraction,
+                "compaction": compaction
+            })
+
+        formatted_prompt, inputs = services.format_analysis_prompt(
+            services.PROMPTS[template_name], pdf_text, job_description, extra_context
+        )
+
+        try:
+            analysis = await ainvoke_llm_cached("analyze-resume", template_name, inputs, formatted_prompt)
+        except QueueFullError:
+            raise
+        except services.LLMServiceError as e:
+            return llm_json_error(e)
+        except Exception as e:
+            return json_error(f"Error generating response: {str(e)}", 500)
+
+        return web.json_response({
+            "success": True,
+            "analysis": analysis,
+            "analysisType": analysis_type,
+            "mode": mode,
+            "score": score,
+            "extraction": extraction,
+            "compaction": compaction
+        })
+
+    except QueueFullError:
+        raise
+    except services.PDFLimitError as e:
+        return json_error(str(e), 413)
+    except Exception as e:
+        return json_error(f"Server error: {str(e)}", 500)
+
+
+async def generate_interview_questions(request):
+    """Async /api/generate-interview-questions"""
+    data = await read_json(request)
+    if not data:
+        return json_error("Missing request data", 400)
+
+    try:
+        target_role = data.get('targetRole', '').strip()
+        years_experience = data.get('yearsExperience', '').strip()
+        topics = data.get('topics', '').strip()
+        description = data.get('description', '').strip()
+
+        if not target_role:
+            return json_error("Target role is required", 400)
+
+        if not years_experience:
+            return json_error("Years of experience is required", 400)
+
+        prompt_inputs = {
+            "target_role": target_role,
+            "years_experience": years_experience,
+            "topics": topics if topics else "General topics relevant to the role",
+            "description": description if description else "No additional description provided"
+        }
+
+        banked_questions = await run_blocking(
+            services.lookup_question_bank, target_role, years_experience, topics, description
+        )
+        if banked_questions is not None:
+            return web.json_response({
+                "success": True,
+                "questions": banked_questions,
+                "metadata": {
+                    "targetRole": target_role,
+                    "yearsExperience": years_experience,
+                    "topics": topics,
+                    "description": description
+                },
+                "source": "bank"
+            })
+
+        cache_key, cached_content = await run_blocking(
+            services.lookup_cached_response, "generate-interview-questions", "ai_prep", prompt_inputs
+        )
+        questions_data, generation = None, None
+        if cached_content is not None:
+            try:
+                questions_data = services.parse_interview_questions(cached_content)
+            except ValueError:
+                questions_data = None
+
+        if questions_data is None:
+            count = services.INTERVIEW_QUESTION_COUNT
+            formatted_prompt = services.AI_PREP_PROMPT.format(**prompt_inputs)
+
+            async def generate():
+                async with admission:
+                    with metrics.stage("llm_generate_questions"):
+                        questions, stats = await services.make_question_generator(
+                            prompt_inputs
+                        ).arun(services.get_llm())
+                services.interview_generation_tracker.record(stats, success=len(questions) == count)
+                metrics.record_llm_io(
+                    "generate-interview-questions", formatted_prompt, json.dumps(questions),
+                    stats["inputTokens"], stats["outputTokens"]
+                )
+                return questions, stats
+
+            try:
+                questions_data, generation = await coalesce("generate-interview-questions", formatted_prompt, generate)
+            except QueueFullError:
+                raise
+            except services.LLMServiceError as e:
+                return llm_json_error(e)
+            except Exception as e:
+                print(f"AI generation error: {str(e)}")
+                return json_error(f"AI generation error: {str(e)}", 500)
+
+            if len(questions_data) != count:
+                return web.json_response({
+                    "error": f"Expected {count} questions, got {len(questions_data)}",
+                    "generation": generation
+                }, status=500)
+
+            await run_blocking(services.store_cached_response, cache_key, json.dumps(questions_data))
+            await run_blocking(
+                services.add_to_question_bank, target_role, years_experience, topics, description, questions_data
+            )
+
+        return web.json_response({
+            "success": True,
+            "questions": questions_data,
+            "metadata": {
+                "targetRole": target_role,
+                "yearsExperience": years_experience,
+                "topics": topics,
+                "description": description
+            },
+            "generation": generation,
+            "source": "cache" if generation is None else "llm"
+        })
+
+    except QueueFullError:
+        raise
+    except Exception as e:
+        print(f"Server error: {str(e)}")
+        return json_error(f"Server error: {str(e)}", 500)
+
+
+async def research_company(request):
+    """Async /api/research-company"""
+    data = await read_json(request)
+
+    if not data or 'company' not in data:
+        return json_error("Company name is required", 400)
+
+    try:
+        company_name = data['company'].strip()
+        question = data.get('question', 'Tell me about this company, its culture, recent news, and interview tips.')
+
+        if not company_name:
+            return json_error("Company name cannot be empty", 400)
+
+        questions = None
+        if 'questions' in data:
+            try:
+                questions = services.parse_research_questions(data['questions'])
+                answer_mode = services.parse_research_answer_mode(data.get('answerMode'))
+            except ValueError as e:
+                return json_error(str(e), 400)
+
+        started = time.perf_counter()
+        company_info, error = await run_blocking(services.ensure_company_ingested, company_name)
+
+        if error:
+            return json_error(error, 500)
+
+        if questions is not None:
+            ingest_ms = round((time.perf_counter() - started) * 1000, 1)
+            try:
+                results, timings, answer_mode = await answer_company_questions(company_name, questions, answer_mode)
+            except QueueFullError:
+                raise
+            except services.LLMServiceError as e:
+                return llm_json_error(e)
+            errors = [result for result in results if "error" in result]
+            if len(errors) == len(results):
+                return web.json_response({"error": "All questions failed", "questions": results}, status=500)
+
+            return web.json_response({
+                "success": True,
+                "company": company_name,
+                "questions": results,
+                "partial": bool(errors),
+                "answerMode": answer_mode,
+                "raw_info": company_info,
+                "timingsMs": {
+                    "ingest": ingest_ms,
+                    **timings,
+                    "total": round((time.perf_counter() - started) * 1000, 1)
+                }
+            })
+
+        retrieval = {}
+        context = await run_blocking(services.retrieve_company_context, company_name, question, retrieval)
+
+        try:
+            answer = await answer_company_question(company_name, question, context)
+        except QueueFullError:
+            raise
+        except services.LLMServiceError as e:
+            return llm_json_error(e)
+        except Exception as e:
+            answer = f"Error querying company information: {str(e)}"
+
+        return web.json_response({
+            "success": True,
+            "company": company_name,
+            "question": question,
+            "answer": answer,
+            "raw_info": company_info,
+            "retrieval": retrieval
+        })
+
+    except QueueFullError:
+        raise
+    except Exception as e:
+        print(f"Company research error: {str(e)}")
+        return json_error(f"Server error: {str(e)}", 500)
+
+
+async def health_check(request):
+    """Async /api/health"""
+    return web.json_response({
+        "status": "healthy",
+        "service": "resume-analyzer-api",
+        "mode": "async",
+        "admission": admission.stats(),
+        "singleFlight": llm_single_flight.stats(),
+        "llmClient": services.llm.stats() if isinstance(services.llm, services.ResilientLLM) else None
+    })
+
+
+async def metrics_endpoint(request):
+    """Async /metrics"""
+    return web.Response(
+        text=metrics.registry.render(),
+        headers={"Content-Type": metrics.registry.CONTENT_TYPE}
+    )
+
+
+@web.middleware
+async def metrics_middleware(request, handler):
+    """Count requests and observe latency per route pattern, like the Flask hooks"""
+    started = time.perf_counter()
+    resource = request.match_info.route.resource
+    route = resource.canonical if resource is not None else "unmatched"
+    status = 500
+    try:
+        response = await handler(request)
+        status = response.status
+        return response
+    except web.HTTPException as e:
+        status = e.status
+        raise
+    finally:
+        metrics.observe_request(route, request.method, status, time.perf_counter() - started)
+
+
+@web.middleware
+async def backpressure_middleware(request, handler):
+    """Turn a full admission queue into 429 Too Many Requests"""
+    try:
+        return await handler(request)
+    except QueueFullError as e:
+        return web.json_response({"error": str(e)}, status=429, headers={"Retry-After": "1"})
+
+
+@web.middleware
+async def cors_middleware(request, handler):
+    """Allow cross-origin requests, like flask_cors does for the Flask app"""
+    if request.method == "OPTIONS":
+        response = web.Response()
+    else:
+        response = await handler(request)
+    response.headers["Access-Control-Allow-Origin"] = "*"
+    response.headers["Access-Control-Allow-Headers"] = "Content-Type"
+    response.headers["Access-Control-Allow-Methods"] = "GET, POST, OPTIONS"
+    return response
+
+
+async def warm_up_on_startup(app):
+    """Create heavy components in a background thread so first requests don't block the loop"""
+    if os.getenv("WARMUP_ON_START", "false").lower() == "true":
+        services.start_warm_up_thread()
+
+
+async def start_job_workers(app):
+    """Process queued jobs in this server process"""
+    if services.job_queue is not None:
+        services.job_queue.start()
+
+
+def create_app():
+    """Build the aiohttp application"""
+    app = web.Application(
+        middlewares=[metrics_middleware, cors_middleware, backpressure_middleware],
+        client_max_size=services.app.config["MAX_CONTENT_LENGTH"]
+    )
+    app.router.add_post('/api/analyze-resume', analyze_resume)
+    app.router.add_post('/api/generate-interview-questions', generate_interview_questions)
+    app.router.add_post('/api/research-company', research_company)
+    app.router.add_get('/api/health', health_check)
+    app.router.add_get('/metrics', metrics_endpoint)
+    app.on_startup.append(warm_up_on_startup)
+    app.on_startup.append(start_job_workers)
+    return app
+
+
+if __name__ == '__main__':
+    port = int(os.environ.get('PORT', 10001))
+    web.run_app(create_app(), host='0.0.0.0', port=port)
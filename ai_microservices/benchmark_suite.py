@@ -0,0 +1,419 @@
+"""Offline benchmark suite for the AI microservice.
+
+Generates a deterministic synthetic corpus (resume PDFs of several sizes and
+job descriptions), swaps the chat model for fake_llm.FakeLLM with a fixed
+latency and runs every route through the Flask test client and through a
+real threaded HTTP server on 127.0.0.1. ChromaDB is disabled and all stores
+live in a temporary directory, so no network access is needed.
+
+For each route and transport it reports throughput, p50/p95/p99 latency and
+the route's peak Python allocation, measured by a separate untimed
+tracemalloc pass after the timed requests (tracing slows allocation-heavy
+routes several times over, so it never runs during them; --no-trace-memory
+skips it). The process-wide peak RSS is reported alongside, but it only
+ever grows, so it cannot be attributed to a single route.
+Runs can be saved as JSON and compared:
+
+    python benchmark_suite.py --requests 50 --concurrency 8 --output before.json
+    python benchmark_suite.py --requests 50 --concurrency 8 --output after.json
+    python benchmark_suite.py --compare before.json after.json
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; the process peak RSS is then not reported
+    resource = None
+
+PDF_SIZES = {"1p": 1, "3p": 3, "10p": 10, "30p": 30}
+LINES_PER_PAGE = 45
+
+SKILLS = [
+    "Python", "Java", "TypeScript", "React", "Node.js", "Flask", "Django", "PostgreSQL", "MongoDB",
+    "Redis", "Kafka", "Docker", "Kubernetes", "AWS", "GCP", "Terraform", "GraphQL", "REST APIs",
+    "Pandas", "PyTorch", "TensorFlow", "Spark", "Airflow", "CI/CD", "Linux", "Go", "C++", "Tableau"
+]
+ROLES = ["Software Engineer", "Backend Engineer", "Data Scientist", "Frontend Engineer",
+         "DevOps Engineer", "Machine Learning Engineer", "Data Analyst", "Full Stack Developer"]
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises"]
+VERBS = ["Built", "Designed", "Led", "Optimized", "Migrated", "Automated", "Scaled", "Shipped"]
+OBJECTS = ["a payments API", "the data pipeline", "an internal dashboard", "the search service",
+           "a recommendation model", "the CI/CD workflow", "a real-time event system", "the auth service"]
+OUTCOMES = ["cutting latency by {n}%", "serving {n}k daily users", "reducing costs by {n}%",
+            "improving conversion by {n}%", "processing {n}M events per day"]
+
+QUESTIONS_RESPONSE = json.dumps([
+    {"question": f"Benchmark question {i}?", "explanation": "Benchmark explanation."}
+    for i in range(10)
+])
+
+
+def synthetic_resume_lines(pages, rng):
+    """Resume text lines filling roughly `pages` PDF pages"""
+    lines = [
+        f"Candidate {rng.randint(1000, 9999)}",
+        f"candidate{rng.randint(1, 999)}@example.com | +1 555 {rng.randint(1000, 9999)}",
+        "",
+        "SUMMARY",
+        f"{rng.choice(ROLES)} with {rng.randint(1, 15)} years of experience in "
+        f"{', '.join(rng.sample(SKILLS, 4))}.",
+        "",
+        "SKILLS",
+        ", ".join(rng.sample(SKILLS, 12)),
+        "",
+        "EXPERIENCE",
+    ]
+    while len(lines) < pages * LINES_PER_PAGE - 4:
+        lines.append(f"{rng.choice(ROLES)} - {rng.choice(COMPANIES)} ({rng.randint(2010, 2024)})")
+        for _ in range(rng.randint(3, 6)):
+            outcome = rng.choice(OUTCOMES).format(n=rng.randint(5, 90))
+            lines.append(f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} with "
+                         f"{' and '.join(rng.sample(SKILLS, 2))}, {outcome}.")
+        lines.append("")
+    lines += ["EDUCATION", f"BSc Computer Science, University {rng.randint(1, 50)}"]
+    return lines
+
+
+def make_resume_pdf(pages, seed):
+    """Deterministic synthetic resume PDF with the given page count"""
+    import fitz
+    rng = random.Random(seed)
+    lines = synthetic_resume_lines(pages, rng)
+    document = fitz.open()
+    for start in range(0, len(lines), LINES_PER_PAGE):
+        page = document.new_page()
+        page.insert_textbox(fitz.Rect(50, 50, 550, 800), "\n".join(lines[start:start + LINES_PER_PAGE]), fontsize=9)
+    while document.page_count < pages:
+        document.new_page()
+    return document.tobytes()
+
+
+def synthetic_job_description(rng):
+    skills = rng.sample(SKILLS, 8)
+    return (
+        f"{rng.choice(COMPANIES)} is hiring a {rng.choice(ROLES)}.\n"
+        f"Requirements: {', '.join(skills[:5])}.\n"
+        f"Nice to have: {', '.join(skills[5:])}.\n"
+        f"You will {rng.choice(VERBS).lower()} {rng.choice(OBJECTS)} and mentor the team."
+    )
+
+
+class Corpus:
+    """Synthetic inputs shared by every scenario; several variants per size avoid identical requests"""
+
+    def __init__(self, seed, variants=4):
+        rng = random.Random(seed)
+        self.pdfs = {
+            size: [make_resume_pdf(pages, seed * 1000 + pages * 10 + v) for v in range(variants)]
+            for size, pages in PDF_SIZES.items()
+        }
+        self.job_descriptions = [synthetic_job_description(rng) for _ in range(200)]
+
+    def pdf(self, size, i):
+        variants = self.pdfs[size]
+        return variants[i % len(variants)]
+
+    def job_description(self, i):
+        return self.job_descriptions[i % len(self.job_descriptions)]
+
+
+def build_scenarios(corpus):
+    """Scenario name -> function(i) returning a request spec"""
+    def analyze(size, **extra):
+        def spec(i):
+            return {
+                "method": "POST",
+                "path": "/api/analyze-resume",
+                "form": {"jobDescription": corpus.job_description(i), **extra},
+                "file": corpus.pdf(size, i)
+            }
+        return spec
+
+    def rank_jobs(i):
+        jobs = [
+            {"id": f"job-{j}", "company": "Bench", "position": "Engineer",
+             "jobDescription": corpus.job_description(i + j)}
+            for j in range(100)
+        ]
+        return {"method": "POST", "path": "/api/rank-jobs",
+                "form": {"jobs": json.dumps(jobs)}, "file": corpus.pdf("3p", i)}
+
+    def questions(i):
+        return {"method": "POST", "path": "/api/generate-interview-questions",
+                "json": {"targetRole": f"{ROLES[i % len(ROLES)]} {i}", "yearsExperience": str(i % 12),
+                         "topics": "system design, python"}}
+
+    def research(i):
+        return {"method": "POST", "path": "/api/research-company",
+                "json": {"company": COMPANIES[i % len(COMPANIES)], "question": f"What is the culture like? ({i})"}}
+
+    scenarios = {f"analyze-resume/{size}": analyze(size) for size in PDF_SIZES}
+    scenarios.update({
+        "analyze-resume/fast": analyze("3p", mode="fast", analysisType="percentage"),
+        "analyze-resume/batch": analyze("3p", analysisTypes="all"),
+        "rank-jobs/100": rank_jobs,
+        "generate-interview-questions": questions,
+        "research-company": research,
+        "health": lambda i: {"method": "GET", "path": "/api/health"},
+    })
+    return scenarios
+
+
+def test_client_sender(app):
+    def send(spec):
+        client = app.test_client()
+        if "file" in spec:
+            data = dict(spec["form"], resume=(io.BytesIO(spec["file"]), "resume.pdf"))
+            response = client.open(spec["path"], method=spec["method"], data=data,
+                                   content_type="multipart/form-data")
+        else:
+            response = client.open(spec["path"], method=spec["method"], json=spec.get("json"))
+        response.get_data()
+        return response.status_code
+    return send
+
+
+def http_sender(base_url):
+    import requests
+    session = requests.Session()
+    session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=64))
+
+    def send(spec):
+        url = base_url + spec["path"]
+        if "file" in spec:
+            response = session.request(spec["method"], url, data=spec["form"],
+                                        files={"resume": ("resume.pdf", spec["file"], "application/pdf")})
+        else:
+            response = session.request(spec["method"], url, json=spec.get("json"))
+        return response.status_code
+    return send
+
+
+def peak_rss_mb():
+    """Process-wide peak RSS so far (ru_maxrss is KiB on Linux, bytes on macOS), None on Windows"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / 2 ** 20 if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def run_scenario(send, spec_for, total_requests, concurrency, percentile):
+    # One untimed request warms lazy components so they do not skew the first sample
+    send(spec_for(total_requests))
+    specs = [spec_for(i) for i in range(total_requests)]
+
+    latencies, statuses = [], {}
+
+    def one(spec):
+        started = time.perf_counter()
+        status = send(spec)
+        return time.perf_counter() - started, status
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for elapsed, status in executor.map(one, specs):
+            latencies.append(elapsed)
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": total_requests,
+        "concurrency": concurrency,
+        "elapsedSeconds": round(elapsed, 3),
+        "requestsPerSecond": round(total_requests / elapsed, 2),
+        "meanMs": round(statistics.mean(latencies) * 1000, 2),
+        "p50Ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95Ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99Ms": round(percentile(latencies, 99) * 1000, 2),
+        # Monotonic over the whole run: includes every earlier route
+        "processPeakRssMb": peak_rss_mb(),
+        "statuses": statuses
+    }
+
+
+def trace_scenario_memory(send, spec_for, total_requests, concurrency):
+    """Untimed pass under tracemalloc; returns the peak Python allocation of the route in MB"""
+    specs = [spec_for(i) for i in range(total_requests)]
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(send, specs))
+        return round((tracemalloc.get_traced_memory()[1] - baseline) / 2 ** 20, 2)
+    finally:
+        tracemalloc.stop()
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def configure_environment(args, data_dir):
+    """Isolate and de-network the service before it is imported"""
+    os.environ.update({
+        "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY") or "benchmark-placeholder",
+        "CHROMA_ENABLED": "false",
+        "WARMUP_ON_START": "false",
+        "LLM_RATE_LIMIT_PER_MINUTE": "0",
+        "COMPANY_STORE_PATH": os.path.join(data_dir, "company_store.sqlite3"),
+        "LOCAL_INDEX_DIR": os.path.join(data_dir, "vector_index"),
+        "QUESTION_BANK_PATH": os.path.join(data_dir, "question_bank.sqlite3"),
+        "LLM_CACHE_PATH": os.path.join(data_dir, "llm_cache.sqlite3"),
+        "JOB_QUEUE_PATH": os.path.join(data_dir, "jobs.sqlite3"),
+    })
+    if not args.with_caches:
+        # Measure the work itself: every request parses its PDF and reaches the model
+        os.environ.update({
+            "PDF_CACHE_MAX_BYTES": "0",
+            "PDF_CACHE_DIR": "",
+            "LLM_CACHE_BACKEND": "off",
+            "QUESTION_BANK_ENABLED": "false",
+            "SINGLE_FLIGHT_ENABLED": "false",
+        })
+
+
+def run(args):
+    data_dir = tempfile.mkdtemp(prefix="ai-benchmark-")
+    configure_environment(args, data_dir)
+
+    import logging
+    import services
+    from fake_llm import FakeLLM
+    from load_benchmark import percentile, start_flask_server
+
+    def respond(prompt):
+        return QUESTIONS_RESPONSE if "interview questions" in prompt else "Benchmark analysis response."
+
+    services.set_llm(FakeLLM(responses=respond, latency=args.llm_latency))
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    corpus = Corpus(args.seed)
+    scenarios = build_scenarios(corpus)
+    selected = list(scenarios) if args.scenarios == "all" else args.scenarios.split(",")
+    unknown = [name for name in selected if name not in scenarios]
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(unknown)} (choose from {', '.join(scenarios)})")
+
+    senders = {}
+    transports = args.transports.split(",")
+    if "testclient" in transports:
+        senders["testclient"] = test_client_sender(services.app)
+    if "http" in transports:
+        server = start_flask_server(args.port, services.app)
+        senders["http"] = http_sender(f"http://127.0.0.1:{args.port}")
+
+    results = []
+    for transport, send in senders.items():
+        for name in selected:
+            result = run_scenario(send, scenarios[name], args.requests, args.concurrency, percentile)
+            result["peakTracedMemoryMb"] = (
+                trace_scenario_memory(send, scenarios[name], min(args.requests, 10), args.concurrency)
+                if args.trace_memory else None
+            )
+            results.append({"scenario": name, "transport": transport, **result})
+            memory = result["peakTracedMemoryMb"]
+            print(f"{transport:10} {name:30} {result['requestsPerSecond']:>9.2f} req/s  "
+                  f"p50 {result['p50Ms']:>8.2f} ms  p95 {result['p95Ms']:>8.2f} ms  "
+                  f"p99 {result['p99Ms']:>8.2f} ms  "
+                  f"peak {'n/a' if memory is None else f'{memory:.2f} MB':>9}  "
+                  f"statuses {result['statuses']}", file=sys.stderr)
+
+    if "http" in senders:
+        server.shutdown()
+    services.get_pdf_extractor().shutdown()
+
+    return {
+        "meta": {
+            "createdAt": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "gitCommit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpuCount": os.cpu_count(),
+            "llmLatencySeconds": args.llm_latency,
+            "caches": args.with_caches,
+            "seed": args.seed
+        },
+        "results": results
+    }
+
+
+def compare(base_path, new_path):
+    """Print per-scenario deltas between two saved runs"""
+    with open(base_path, "r", encoding="utf-8") as f:
+        base = {(r["scenario"], r["transport"]): r for r in json.load(f)["results"]}
+    with open(new_path, "r", encoding="utf-8") as f:
+        new = {(r["scenario"], r["transport"]): r for r in json.load(f)["results"]}
+
+    def delta(old, current):
+        return f"{(current - old) / old * 100:+.1f}%" if old else "n/a"
+
+    def memory(result):
+        peak = result.get("peakTracedMemoryMb")
+        return "n/a" if peak is None else f"{peak:.2f}"
+
+    def memory_delta(old, current):
+        if old.get("peakTracedMemoryMb") is None or current.get("peakTracedMemoryMb") is None:
+            return "n/a"
+        return delta(old["peakTracedMemoryMb"], current["peakTracedMemoryMb"])
+
+    print(f"{'transport':10} {'scenario':30} {'req/s':>18} {'p50 ms':>20} {'p95 ms':>20} {'peak MB':>20}")
+    for key in sorted(base.keys() & new.keys(), key=lambda k: (k[1], k[0])):
+        old, current = base[key], new[key]
+        print(f"{key[1]:10} {key[0]:30} "
+              f"{current['requestsPerSecond']:>9.2f} {delta(old['requestsPerSecond'], current['requestsPerSecond']):>8} "
+              f"{current['p50Ms']:>10.2f} {delta(old['p50Ms'], current['p50Ms']):>9} "
+              f"{current['p95Ms']:>10.2f} {delta(old['p95Ms'], current['p95Ms']):>9} "
+              f"{memory(current):>10} {memory_delta(old, current):>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=30, help="timed requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="fake model latency in seconds")
+    parser.add_argument("--scenarios", default="all", help="comma-separated scenario names")
+    parser.add_argument("--transports", default="testclient,http", help="testclient, http or both")
+    parser.add_argument("--port", type=int, default=18003)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--with-caches", action="store_true",
+                        help="keep the PDF/LLM caches, question bank and request coalescing enabled")
+    parser.add_argument("--no-trace-memory", dest="trace_memory", action="store_false",
+                        help="skip the untimed tracemalloc pass per route (up to 10 requests)")
+    parser.add_argument("--output", help="write the results JSON to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="compare two saved runs and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    report = run(args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
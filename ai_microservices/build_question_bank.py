@@ -0,0 +1,89 @@
+"""Offline job that pre-generates the interview question bank.
+
+Runs the normal AI Prep generation pipeline for popular (role, experience,
+topics) combinations and stores the validated questions, so serving can
+assemble sets from the bank without calling the LLM. Example:
+
+    python build_question_bank.py --combos combos.json --rounds 3 --workers 4
+
+combos.json is a list of {"targetRole", "yearsExperience", "topics"} objects.
+Without --combos a built-in list of common combinations is used.
+"""
+import argparse
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import services
+
+DEFAULT_COMBOS = [
+    {"targetRole": role, "yearsExperience": years, "topics": ""}
+    for role in (
+        "Software Engineer",
+        "Frontend Engineer",
+        "Backend Engineer",
+        "Full Stack Engineer",
+        "Data Scientist",
+        "Data Analyst",
+        "Machine Learning Engineer",
+        "DevOps Engineer",
+        "Product Manager",
+    )
+    for years in ("0", "3", "6", "10")
+]
+
+
+def build_combo(combo, rounds):
+    """Generate `rounds` question sets for one combination; returns (combo, questions added)"""
+    prompt_inputs = {
+        "target_role": combo["targetRole"],
+        "years_experience": combo["yearsExperience"],
+        "topics": combo.get("topics") or "General topics relevant to the role",
+        "description": "No additional description provided"
+    }
+    added = 0
+    for _ in range(rounds):
+        try:
+            questions, _ = services.generate_question_set(prompt_inputs)
+        except Exception as e:
+            print(f"Generation failed for {combo}: {e}")
+            continue
+        added += services.question_bank.add(
+            combo["targetRole"], combo["yearsExperience"], combo.get("topics", ""), questions
+        )
+    return combo, added
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--combos", help="JSON file with the combinations to pre-generate")
+    parser.add_argument("--rounds", type=int, default=2, help="question sets to generate per combination")
+    parser.add_argument("--workers", type=int, default=4, help="combinations generated concurrently")
+    parser.add_argument("--min-questions", type=int, default=services.INTERVIEW_QUESTION_COUNT * 2,
+                        help="skip combinations that already have this many questions")
+    args = parser.parse_args()
+
+    if services.question_bank is None:
+        raise SystemExit("QUESTION_BANK_ENABLED is false; nothing to build")
+
+    combos = DEFAULT_COMBOS
+    if args.combos:
+        with open(args.combos, "r", encoding="utf-8") as f:
+            combos = json.load(f)
+
+    pending = [
+        combo for combo in combos
+        if services.question_bank.count(
+            combo["targetRole"], combo["yearsExperience"], combo.get("topics", "")
+        ) < args.min_questions
+    ]
+    print(f"Generating {len(pending)} of {len(combos)} combinations ({args.rounds} rounds each)")
+
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        for combo, added in executor.map(lambda combo: build_combo(combo, args.rounds), pending):
+            print(f"{combo['targetRole']} / {combo['yearsExperience']} / {combo.get('topics') or 'general'}: +{added}")
+
+    print(json.dumps(services.question_bank.stats(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
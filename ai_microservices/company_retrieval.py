@@ -0,0 +1,176 @@
+import math
+import re
+from collections import Counter
+
+from llm_text import estimate_tokens
+from keyword_scorer import STOPWORDS
+from vector_index import tokenize
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(])")
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+
+
+def _is_heading(line):
+    # "Company Culture:", "## Benefits" and the like
+    words = line.split()
+    return 0 < len(words) <= 8 and (line.endswith(":") or line.startswith("#"))
+
+
+def _split_long(unit, max_tokens):
+    """Break a unit longer than the chunk size at word boundaries"""
+    pieces, current = [], []
+    for word in unit.split():
+        if current and estimate_tokens(" ".join(current + [word])) > max_tokens:
+            pieces.append(" ".join(current))
+            current = []
+        current.append(word)
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def _units(text, max_tokens):
+    """Yield (paragraph index, heading, unit) for every line or sentence of the text"""
+    for paragraph_index, paragraph in enumerate(_PARAGRAPH_RE.split(text)):
+        heading = None
+        for line in paragraph.splitlines():
+            line = " ".join(line.split())
+            if not line:
+                continue
+            if _is_heading(line):
+                heading = line.lstrip("# ")
+                yield paragraph_index, None, heading
+                continue
+            for sentence in _SENTENCE_RE.split(line):
+                for unit in _split_long(sentence, max_tokens):
+                    yield paragraph_index, heading, unit
+
+
+def chunk_text(text, max_tokens=120, overlap_tokens=20):
+    """Pack lines and sentences into chunks of at most ~max_tokens, overlapping by ~overlap_tokens.
+
+    A new paragraph starts a new chunk once the current one is half full, and a
+    chunk that starts inside a section repeats the section heading so it stays
+    identifiable on its own.
+    """
+    chunks, current, current_tokens = [], [], 0
+    last_paragraph = None
+
+    def flush():
+        if any(not is_overlap for _, is_overlap in current):
+            chunks.append("\n".join(unit for unit, _ in current))
+
+    for paragraph_index, heading, unit in _units(text, max_tokens):
+        unit_tokens = estimate_tokens(unit)
+        new_paragraph = paragraph_index != last_paragraph and current_tokens >= max_tokens // 2
+        if current and (current_tokens + unit_tokens > max_tokens or new_paragraph):
+            flush()
+            # Carry the tail of the previous chunk over, unless a paragraph just ended
+            overlap, overlap_size = [], 0
+            if not new_paragraph:
+                for previous, _ in reversed(current):
+                    size = estimate_tokens(previous)
+                    if overlap_size + size > overlap_tokens:
+                        break
+                    overlap.insert(0, (previous, True))
+                    overlap_size += size
+            current, current_tokens = overlap, overlap_size
+            if heading and all(previous != heading for previous, _ in current):
+                current.insert(0, (heading, True))
+                current_tokens += estimate_tokens(heading)
+        current.append((unit, False))
+        current_tokens += unit_tokens
+        last_paragraph = paragraph_index
+    if current:
+        flush()
+    return chunks
+
+
+def tokenize_documents(documents):
+    """Token lists for bm25_scores, so several queries can share one tokenization pass"""
+    return [tokenize(document) for document in documents]
+
+
+def bm25_scores(query, documents, k1=1.5, b=0.75, doc_tokens=None):
+    """Okapi BM25 score of every document for the query's non-stopword terms"""
+    if doc_tokens is None:
+        doc_tokens = tokenize_documents(documents)
+    if not doc_tokens:
+        return []
+    terms = {token for token in tokenize(query) if token not in STOPWORDS}
+    average_length = sum(len(tokens) for tokens in doc_tokens) / len(doc_tokens) or 1.0
+    document_frequency = Counter(token for tokens in doc_tokens for token in set(tokens) if token in terms)
+
+    scores = []
+    for tokens in doc_tokens:
+        counts = Counter(token for token in tokens if token in terms)
+        score = 0.0
+        for term, frequency in counts.items():
+            df = document_frequency[term]
+            idf = math.log(1 + (len(doc_tokens) - df + 0.5) / (df + 0.5))
+            score += idf * frequency * (k1 + 1) / (frequency + k1 * (1 - b + b * len(tokens) / average_length))
+        scores.append(score)
+    return scores
+
+
+def hybrid_rank(query, documents, vector_similarities, alpha=0.5, doc_tokens=None):
+    """Rank documents by alpha * vector + (1 - alpha) * BM25, each scaled to [0, 1].
+
+    vector_similarities holds one similarity per document, or None for documents
+    the vector search did not return. Returns (indexes best first, scores).
+    """
+    lexical = bm25_scores(query, documents, doc_tokens=doc_tokens)
+    top_lexical = max(lexical, default=0.0) or 1.0
+
+    known = [similarity for similarity in vector_similarities if similarity is not None]
+    low, high = min(known, default=0.0), max(known, default=0.0)
+    spread = high - low
+
+    scores = []
+    for lexical_score, similarity in zip(lexical, vector_similarities):
+        if similarity is None:
+            vector_score = 0.0
+        else:
+            vector_score = (similarity - low) / spread if spread else 1.0
+        scores.append(alpha * vector_score + (1 - alpha) * lexical_score / top_lexical)
+    order = sorted(range(len(documents)), key=lambda index: -scores[index])
+    return order, scores
+
+
+def assemble_context(chunks, max_tokens):
+    """Join chunks (in document order) without repeating overlapped lines, within max_tokens"""
+    lines, seen, used = [], set(), 0
+    for chunk in chunks:
+        for line in chunk.split("\n"):
+            if line in seen:
+                continue
+            size = estimate_tokens(line)
+            if used + size > max_tokens:
+                remaining = (max_tokens - used) * 4
+                if not lines and remaining > 0:
+                    # A single oversized line still gives the model something to work with
+                    lines.append(line[:remaining])
+                return "\n".join(lines)
+            seen.add(line)
+            lines.append(line)
+            used += size
+    return "\n".join(lines)
+
+
+def select_chunks(question, documents, positions, vector_similarities, top_k=4, max_tokens=500, alpha=0.5,
+                  doc_tokens=None):
+    """Indexes of the top_k chunks by hybrid score that fit max_tokens, in document order"""
+    order, scores = hybrid_rank(question, documents, vector_similarities, alpha, doc_tokens)
+    # Chunks with no lexical or vector signal are not worth prompt tokens
+    chosen = [index for index in order[:top_k] if scores[index] > 0] or order[:1]
+
+    # Whole chunks, best first, until the budget is spent
+    selected, used = [], 0
+    for index in chosen:
+        size = estimate_tokens(documents[index])
+        if selected and used + size > max_tokens:
+            continue
+        selected.append(index)
+        used += size
+    return sorted(selected, key=lambda index: positions[index])
+
@@ -0,0 +1,90 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+
+def company_key(company_name):
+    """Normalize a company name so 'Acme ', 'acme' and 'ACME' share one record"""
+    return " ".join(company_name.lower().split())
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class CompanyStore:
+    """Persistent record of which companies have been researched and ingested"""
+
+    def __init__(self, path="company_store.sqlite3", ttl_seconds=86400):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS companies ("
+            "company_key TEXT PRIMARY KEY, company_name TEXT NOT NULL, "
+            "content_hash TEXT NOT NULL, raw_info TEXT NOT NULL, "
+            "chunk_count INTEGER NOT NULL, fetched_at REAL NOT NULL)"
+        )
+        conn.commit()
+
+    def _connect(self):
+        # sqlite3 connections must not be shared across threads, nor with a forked child
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def close(self):
+        """Close this thread's connection, e.g. in a server master before it forks workers"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            conn.close()
+        self._local.conn = None
+
+    def get(self, company_name):
+        """Return the stored record for a company as a dict, or None"""
+        row = self._connect().execute(
+            "SELECT * FROM companies WHERE company_key = ?", (company_key(company_name),)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def is_fresh(self, record):
+        """True while a record is younger than the freshness TTL"""
+        return record is not None and time.time() - record["fetched_at"] < self.ttl_seconds
+
+    def save(self, company_name, raw_info, chunk_count):
+        """Insert or replace a company's ingested content"""
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO companies "
+            "(company_key, company_name, content_hash, raw_info, chunk_count, fetched_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (company_key(company_name), company_name, content_hash(raw_info),
+             raw_info, chunk_count, time.time())
+        )
+        conn.commit()
+
+    def touch(self, company_name):
+        """Mark a company as freshly fetched without re-ingesting it"""
+        conn = self._connect()
+        conn.execute(
+            "UPDATE companies SET fetched_at = ? WHERE company_key = ?",
+            (time.time(), company_key(company_name))
+        )
+        conn.commit()
+
+    def delete(self, company_name):
+        conn = self._connect()
+        conn.execute("DELETE FROM companies WHERE company_key = ?", (company_key(company_name),))
+        conn.commit()
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+
+class FakeLLM:
+    """Offline stand-in for ChatGoogleGenerativeAI used by tests and benchmarks"""
+
+    def __init__(self, responses=None, latency=0.0, model="fake-llm", temperature=0.0,
+                 chunk_size=16, chunk_latency=0.0, errors=None, hang_calls=None, hang_seconds=3600.0):
+        # responses may be a string, a list cycled through in order, or a
+        # callable taking the prompt text and returning the completion
+        # errors: per-call exceptions to raise (None entries succeed), or a
+        # callable taking the call index and returning an exception or None
+        # hang_calls: call indexes that block for hang_seconds, to exercise timeouts
+        self.errors = errors
+        self.hang_calls = set(hang_calls or ())
+        self.hang_seconds = hang_seconds
+        self.responses = responses if responses is not None else "Fake analysis response"
+        self.latency = latency
+        self.model = model
+        self.temperature = temperature
+        self.chunk_size = chunk_size
+        self.chunk_latency = chunk_latency
+        self.calls = 0
+        self.prompts = []
+        self._lock = threading.Lock()
+
+    def _prompt_text(self, messages):
+        if isinstance(messages, str):
+            return messages
+        return "\n".join(getattr(message, "content", str(message)) for message in messages)
+
+    def _start_call(self, messages):
+        """Record the prompt; returns (call index, seconds to wait before answering)"""
+        with self._lock:
+            self.prompts.append(self._prompt_text(messages))
+            index = self.calls
+            self.calls += 1
+        return index, self.hang_seconds if index in self.hang_calls else self.latency
+
+    def _response(self, index):
+        error = self._fault(index)
+        if error is not None:
+            raise error
+        if callable(self.responses):
+            return self.responses(self.prompts[index])
+        if isinstance(self.responses, (list, tuple)):
+            return self.responses[index % len(self.responses)]
+        return self.responses
+
+    def _fault(self, index):
+        if callable(self.errors):
+            return self.errors(index)
+        if self.errors and index < len(self.errors):
+            return self.errors[index]
+        return None
+
+    def invoke(self, messages, **kwargs):
+        index, delay = self._start_call(messages)
+        if delay:
+            time.sleep(delay)
+        return AIMessage(content=self._response(index))
+
+    async def ainvoke(self, messages, **kwargs):
+        index, delay = self._start_call(messages)
+        if delay:
+            await asyncio.sleep(delay)
+        return AIMessage(content=self._response(index))
+
+    def _chunks(self, text):
+        for start in range(0, len(text), self.chunk_size):
+            yield AIMessageChunk(content=text[start:start + self.chunk_size])
+
+    def stream(self, messages, **kwargs):
+        index, delay = self._start_call(messages)
+        if delay:
+            time.sleep(delay)
+        for chunk in self._chunks(self._response(index)):
+            if self.chunk_latency:
+                time.sleep(self.chunk_latency)
+            yield chunk
+
+    async def astream(self, messages, **kwargs):
+        index, delay = self._start_call(messages)
+        if delay:
+            await asyncio.sleep(delay)
+        for chunk in self._chunks(self._response(index)):
+            if self.chunk_latency:
+                await asyncio.sleep(self.chunk_latency)
+            yield chunk
@@ -0,0 +1,31 @@
+# Multi-process serving: gunicorn -c gunicorn.conf.py services:app
+import os
+
+# Shared SQLite backends instead of per-process state (see shared_default in services.py)
+os.environ.setdefault("MULTIPROCESS_MODE", "true")
+
+bind = f"0.0.0.0:{os.getenv('PORT', 10001)}"
+workers = int(os.getenv("WEB_CONCURRENCY", 2))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", 8))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 120))
+preload_app = True
+
+
+def when_ready(server):
+    # The master only imports heavy libraries, shared copy-on-write by the workers;
+    # clients and threads are created after the fork
+    import services
+    services.preload_modules()
+
+
+def pre_fork(server, worker):
+    # SQLite connections must not be inherited by the children
+    import services
+    services.close_connections()
+
+
+def post_fork(server, worker):
+    # Each worker runs its own warm-up and job queue threads
+    import services
+    services.start_background_workers()
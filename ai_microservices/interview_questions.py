@@ -0,0 +1,237 @@
+import json
+import threading
+import time
+
+from langchain_core.messages import HumanMessage
+
+from llm_text import estimate_tokens, message_text
+
+
+def validate_question(item):
+    """Return a normalized question dict, or None if the item is unusable"""
+    if not isinstance(item, dict):
+        return None
+    question = item.get("question")
+    explanation = item.get("explanation")
+    if not isinstance(question, str) or not isinstance(explanation, str):
+        return None
+    question, explanation = question.strip(), explanation.strip()
+    if not question or not explanation:
+        return None
+    return {"question": question, "explanation": explanation}
+
+
+class StreamingQuestionParser:
+    """Tolerant incremental parser for a JSON array of question objects.
+
+    Text is fed in as it streams from the model. Anything before the first
+    '[' (markdown fences, chatter) is skipped, and each top-level object is
+    parsed and validated as soon as its closing brace arrives, so one
+    malformed item does not invalidate the rest of the response.
+    """
+
+    def __init__(self):
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._current = []
+        self.invalid_items = 0
+
+    def feed(self, text):
+        """Consume a chunk of text; returns the valid questions completed by it"""
+        completed = []
+        for char in text:
+            if not self._started:
+                if char == '[':
+                    self._started = True
+                continue
+
+            if self._depth == 0:
+                # Between objects: only an opening brace matters
+                if char == '{':
+                    self._depth = 1
+                    self._current = [char]
+                continue
+
+            self._current.append(char)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == '{':
+                self._depth += 1
+            elif char == '}':
+                self._depth -= 1
+                if self._depth == 0:
+                    question = self._finish_object()
+                    if question is not None:
+                        completed.append(question)
+        return completed
+
+    def _finish_object(self):
+        raw = "".join(self._current)
+        self._current = []
+        try:
+            # strict=False tolerates raw newlines inside strings, a common model slip
+            item = json.loads(raw, strict=False)
+        except json.JSONDecodeError:
+            self.invalid_items += 1
+            return None
+        question = validate_question(item)
+        if question is None:
+            self.invalid_items += 1
+        return question
+
+
+class GenerationCostTracker:
+    """Aggregate LLM calls, tokens and latency per successful question set"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.successes = 0
+        self.failures = 0
+        self.llm_calls = 0
+        self.retries = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.latency_seconds = 0.0
+
+    def record(self, stats, success):
+        with self._lock:
+            if success:
+                self.successes += 1
+            else:
+                self.failures += 1
+            self.llm_calls += stats["llmCalls"]
+            self.retries += stats["retries"]
+            self.input_tokens += stats["inputTokens"]
+            self.output_tokens += stats["outputTokens"]
+            self.latency_seconds += stats["latencyMs"] / 1000
+
+    def stats(self):
+        with self._lock:
+            per_success = self.successes or 1
+            return {
+                "successes": self.successes,
+                "failures": self.failures,
+                "llmCalls": self.llm_calls,
+                "retries": self.retries,
+                "inputTokensPerSuccess": round(self.input_tokens / per_success, 1),
+                "outputTokensPerSuccess": round(self.output_tokens / per_success, 1),
+                "latencyMsPerSuccess": round(self.latency_seconds * 1000 / per_success, 1)
+            }
+
+
+class QuestionGenerator:
+    """Generate a fixed number of questions, re-requesting only missing or invalid items"""
+
+    def __init__(self, build_prompt, build_followup_prompt, count=10, max_retries=2):
+        # build_prompt() -> prompt text for the full set
+        # build_followup_prompt(missing_count, existing_questions) -> prompt text for the gap
+        self.build_prompt = build_prompt
+        self.build_followup_prompt = build_followup_prompt
+        self.count = count
+        self.max_retries = max_retries
+
+    def _new_run(self):
+        return {
+            "questions": [],
+            "seen": set(),
+            "stats": {
+                "llmCalls": 0,
+                "retries": 0,
+                "invalidItems": 0,
+                "duplicateItems": 0,
+                "streamErrors": 0,
+                "inputTokens": 0,
+                "outputTokens": 0,
+                "latencyMs": 0.0
+            }
+        }
+
+    def _prompts(self, run):
+        """Yield the prompt for each attempt until the set is complete or retries run out"""
+        yield self.build_prompt()
+        for _ in range(self.max_retries):
+            missing = self.count - len(run["questions"])
+            if missing <= 0:
+                return
+            run["stats"]["retries"] += 1
+            yield self.build_followup_prompt(missing, [q["question"] for q in run["questions"]])
+
+    def _accept(self, run, questions):
+        for question in questions:
+            key = " ".join(question["question"].lower().split())
+            if key in run["seen"]:
+                run["stats"]["duplicateItems"] += 1
+                continue
+            if len(run["questions"]) < self.count:
+                run["seen"].add(key)
+                run["questions"].append(question)
+
+    def _account(self, run, prompt, output_text, usage):
+        stats = run["stats"]
+        stats["llmCalls"] += 1
+        usage = usage or {}
+        stats["inputTokens"] += usage.get("input_tokens") or estimate_tokens(prompt)
+        stats["outputTokens"] += usage.get("output_tokens") or estimate_tokens(output_text)
+
+    @staticmethod
+    def _stream_failed(run, error):
+        """Keep the questions accepted before a stream broke; the follow-up prompt asks for the rest"""
+        if not run["questions"]:
+            raise error
+        run["stats"]["streamErrors"] += 1
+
+    @staticmethod
+    def _merge_usage(usage, chunk):
+        chunk_usage = getattr(chunk, "usage_metadata", None)
+        if chunk_usage:
+            for key in ("input_tokens", "output_tokens"):
+                usage[key] = max(usage.get(key) or 0, chunk_usage.get(key) or 0)
+
+    def run(self, llm):
+        """Generate questions with llm.stream; returns (questions, stats)"""
+        run = self._new_run()
+        started = time.perf_counter()
+        for prompt in self._prompts(run):
+            parser = StreamingQuestionParser()
+            output, usage = [], {}
+            try:
+                for chunk in llm.stream([HumanMessage(content=prompt)]):
+                    text = message_text(chunk)
+                    output.append(text)
+                    self._merge_usage(usage, chunk)
+                    self._accept(run, parser.feed(text))
+            except Exception as e:
+                self._stream_failed(run, e)
+            run["stats"]["invalidItems"] += parser.invalid_items
+            self._account(run, prompt, "".join(output), usage)
+        run["stats"]["latencyMs"] = round((time.perf_counter() - started) * 1000, 1)
+        return run["questions"], run["stats"]
+
+    async def arun(self, llm):
+        """Async counterpart of run() using llm.astream"""
+        run = self._new_run()
+        started = time.perf_counter()
+        for prompt in self._prompts(run):
+            parser = StreamingQuestionParser()
+            output, usage = [], {}
+            try:
+                async for chunk in llm.astream([HumanMessage(content=prompt)]):
+                    text = message_text(chunk)
+                    output.append(text)
+                    self._merge_usage(usage, chunk)
+                    self._accept(run, parser.feed(text))
+            except Exception as e:
+                self._stream_failed(run, e)
+            run["stats"]["invalidItems"] += parser.invalid_items
+            self._account(run, prompt, "".join(output), usage)
+        run["stats"]["latencyMs"] = round((time.perf_counter() - started) * 1000, 1)
+        return run["questions"], run["stats"]
@@ -0,0 +1,377 @@
+import hashlib
+import hmac
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+# Lower runs first; equal priorities run in submission order
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+# Handler statuses worth another attempt once the provider has recovered
+RETRYABLE_STATUSES = (429, 503, 504)
+
+
+def parse_priority(raw_priority):
+    """Validate a priority name (high, normal, low); returns its sort value"""
+    priority = (raw_priority or "normal").strip().lower()
+    if priority not in PRIORITIES:
+        raise ValueError(f"priority must be one of: {', '.join(PRIORITIES)}")
+    return PRIORITIES[priority]
+
+
+def sign_payload(secret, body):
+    """HMAC-SHA256 signature sent as X-Webhook-Signature so receivers can verify the sender"""
+    return "sha256=" + hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+
+
+class QueueFullError(Exception):
+    """The queue already holds max_pending unfinished jobs"""
+
+
+class JobQueue:
+    """SQLite-persisted priority job queue processed by a local pool of worker threads.
+
+    handlers maps a job kind to fn(payload, attachment) -> (status_code, body, retry_after).
+    Jobs survive restarts: a running job's worker renews its claim (heartbeat_at) while the
+    handler runs, and a job whose claim has not been renewed for stale_after_seconds (its
+    process died mid-job) is queued again, or failed once it has used max_attempts.
+    Results are recorded only by the attempt that currently holds the claim, so a job
+    recovered by mistake cannot finish (or fire its webhook) twice.
+    Claims go through BEGIN IMMEDIATE, so several processes may share one database file.
+    """
+
+    def __init__(self, path="jobs.sqlite3", handlers=None, workers=2, max_pending=1000,
+                 max_attempts=3, retry_delay=5.0, result_ttl_seconds=86400, stale_after_seconds=900,
+                 poll_interval=1.0, webhook_sender=None, webhook_secret=None, webhook_attempts=3):
+        self.path = path
+        self.handlers = dict(handlers or {})
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.result_ttl_seconds = result_ttl_seconds
+        self.stale_after_seconds = stale_after_seconds
+        self.poll_interval = poll_interval
+        # webhook_sender(url, body_bytes, headers) -> HTTP status; None disables webhooks
+        self.webhook_sender = webhook_sender
+        self.webhook_secret = webhook_secret
+        self.webhook_attempts = webhook_attempts
+        self._local = threading.local()
+        self._wakeup = threading.Condition()
+        self._threads = []
+        self._threads_pid = None
+        self._stopping = False
+        self._lock = threading.Lock()
+        self._counters = {"processed": 0, "failed": 0, "retried": 0, "webhooksSent": 0, "webhooksFailed": 0}
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, kind TEXT NOT NULL, priority INTEGER NOT NULL, "
+            "status TEXT NOT NULL, payload TEXT NOT NULL, attachment BLOB, "
+            "webhook_url TEXT, attempts INTEGER NOT NULL DEFAULT 0, "
+            "status_code INTEGER, result TEXT, error TEXT, webhook_status TEXT, "
+            "created_at REAL NOT NULL, run_after REAL NOT NULL, "
+            "started_at REAL, finished_at REAL, heartbeat_at REAL)"
+        )
+        # Databases created before claims were renewed lack the heartbeat column
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+        if "heartbeat_at" not in columns:
+            conn.execute("ALTER TABLE jobs ADD COLUMN heartbeat_at REAL")
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_pending ON jobs (status, priority, created_at)")
+        conn.commit()
+
+    def _connect(self):
+        # sqlite3 connections must not be shared across threads, nor with a forked child
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def close(self):
+        """Close this thread's connection, e.g. in a server master before it forks workers"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            conn.close()
+        self._local.conn = None
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def submit(self, kind, payload, attachment=None, priority=PRIORITIES["normal"], webhook_url=None):
+        """Persist a job and wake a worker; returns the job id or raises QueueFullError"""
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            pending = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')"
+            ).fetchone()[0]
+            if pending >= self.max_pending:
+                raise QueueFullError("The job queue is full, please retry shortly")
+            conn.execute(
+                "INSERT INTO jobs (id, kind, priority, status, payload, attachment, webhook_url, "
+                "created_at, run_after) VALUES (?, ?, ?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, kind, priority, json.dumps(payload), attachment, webhook_url, now, now)
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        with self._wakeup:
+            self._wakeup.notify()
+        return job_id
+
+    def get(self, job_id):
+        """Return a job as a dict (without its attachment), or None"""
+        row = self._connect().execute(
+            "SELECT id, kind, priority, status, webhook_url, attempts, status_code, result, error, "
+            "webhook_status, created_at, run_after, started_at, finished_at FROM jobs WHERE id = ?",
+            (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def position(self, job):
+        """Number of queued jobs that will be claimed before this one"""
+        if job["status"] != "queued":
+            return 0
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = 'queued' "
+            "AND (priority < ? OR (priority = ? AND created_at < ?))",
+            (job["priority"], job["priority"], job["created_at"])
+        ).fetchone()[0]
+
+    def cancel(self, job_id):
+        """Cancel a job that has not started; returns True if it was cancelled"""
+        conn = self._connect()
+        cursor = conn.execute(
+            "UPDATE jobs SET status = 'cancelled', attachment = NULL, finished_at = ? "
+            "WHERE id = ? AND status = 'queued'",
+            (time.time(), job_id)
+        )
+        return cursor.rowcount == 1
+
+    def _claim(self):
+        """Atomically mark the next runnable job as running; returns its row or None"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' AND run_after <= ? "
+                "ORDER BY priority, created_at LIMIT 1",
+                (time.time(),)
+            ).fetchone()
+            if row is not None:
+                now = time.time()
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, started_at = ?, "
+                    "heartbeat_at = ? WHERE id = ?",
+                    (now, now, row["id"])
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return row
+
+    # Updates below match the attempt number, so only the current claim holder writes
+
+    def _finish(self, job_id, attempt, status, status_code, body, error=None):
+        """Record the outcome; returns False if this attempt no longer holds the claim"""
+        cursor = self._connect().execute(
+            "UPDATE jobs SET status = ?, status_code = ?, result = ?, error = ?, attachment = NULL, "
+            "finished_at = ? WHERE id = ? AND attempts = ? AND status = 'running'",
+            (status, status_code, json.dumps(body) if body is not None else None, error, time.time(),
+             job_id, attempt)
+        )
+        return cursor.rowcount == 1
+
+    def _requeue(self, job_id, attempt, delay):
+        self._connect().execute(
+            "UPDATE jobs SET status = 'queued', run_after = ? WHERE id = ? AND attempts = ? AND status = 'running'",
+            (time.time() + delay, job_id, attempt)
+        )
+
+    def _renew_claims(self, job_id, attempt, done):
+        # Heartbeat thread: keep the claim fresh while a slow handler (LLM retries) runs
+        interval = max(1.0, min(60.0, self.stale_after_seconds / 3))
+        while not done.wait(interval):
+            try:
+                self._connect().execute(
+                    "UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND attempts = ? AND status = 'running'",
+                    (time.time(), job_id, attempt)
+                )
+            except Exception as e:
+                print(f"Heartbeat for job {job_id} failed: {e}")
+        self.close()
+
+    def run_one(self):
+        """Claim and process a single job; returns False when nothing was runnable"""
+        row = self._claim()
+        if row is None:
+            return False
+
+        attempts = row["attempts"] + 1
+        done = threading.Event()
+        threading.Thread(
+            target=self._renew_claims, args=(row["id"], attempts, done), name="job-heartbeat", daemon=True
+        ).start()
+        try:
+            status_code, body, retry_after = self.handlers[row["kind"]](
+                json.loads(row["payload"]), row["attachment"]
+            )
+        except Exception as e:
+            status_code, body, retry_after = 500, {"error": f"Server error: {str(e)}"}, None
+        finally:
+            done.set()
+
+        if status_code in RETRYABLE_STATUSES and attempts < self.max_attempts:
+            # Provider trouble: wait it out instead of failing the job
+            self._count("retried")
+            self._requeue(row["id"], attempts, max(retry_after or 0, self.retry_delay * 2 ** (attempts - 1)))
+            return True
+
+        succeeded = status_code < 400
+        if not self._finish(
+            row["id"], attempts, "succeeded" if succeeded else "failed", status_code, body,
+            None if succeeded else (body or {}).get("error")
+        ):
+            print(f"Job {row['id']} was claimed again before attempt {attempts} finished; result discarded")
+            return True
+        self._count("processed" if succeeded else "failed")
+        if row["webhook_url"]:
+            self._deliver_webhook(row["id"], row["webhook_url"])
+        return True
+
+    def _deliver_webhook(self, job_id, url):
+        """POST the finished job to its webhook URL, retrying a few times"""
+        if self.webhook_sender is None:
+            return
+        job = self.get(job_id)
+        body = json.dumps({
+            "jobId": job["id"],
+            "kind": job["kind"],
+            "status": job["status"],
+            "statusCode": job["status_code"],
+            "result": job["result"]
+        }).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if self.webhook_secret:
+            headers["X-Webhook-Signature"] = sign_payload(self.webhook_secret, body)
+
+        outcome = "failed"
+        for attempt in range(self.webhook_attempts):
+            try:
+                if self.webhook_sender(url, body, headers) < 400:
+                    outcome = "delivered"
+                    break
+            except Exception as e:
+                print(f"Webhook delivery for job {job_id} failed: {e}")
+            if attempt + 1 < self.webhook_attempts:
+                time.sleep(min(30, 2 ** attempt))
+        self._count("webhooksSent" if outcome == "delivered" else "webhooksFailed")
+        self._connect().execute("UPDATE jobs SET webhook_status = ? WHERE id = ?", (outcome, job_id))
+
+    def purge(self):
+        """Delete finished jobs older than the result TTL; returns how many were removed"""
+        cursor = self._connect().execute(
+            "DELETE FROM jobs WHERE status IN ('succeeded', 'failed', 'cancelled') AND finished_at < ?",
+            (time.time() - self.result_ttl_seconds,)
+        )
+        return cursor.rowcount
+
+    def recover_stale(self):
+        """Queue again jobs whose worker died mid-run, failing those already out of attempts;
+        returns how many were queued again"""
+        stale = "status = 'running' AND COALESCE(heartbeat_at, started_at) < ?"
+        now = time.time()
+        cutoff = now - self.stale_after_seconds
+        error = f"Worker stopped during the last of {self.max_attempts} attempts"
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            exhausted = conn.execute(
+                f"SELECT id, webhook_url FROM jobs WHERE {stale} AND attempts >= ?", (cutoff, self.max_attempts)
+            ).fetchall()
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', status_code = 500, result = ?, error = ?, attachment = NULL, "
+                f"finished_at = ? WHERE {stale} AND attempts >= ?",
+                (json.dumps({"error": error}), error, now, cutoff, self.max_attempts)
+            )
+            cursor = conn.execute(f"UPDATE jobs SET status = 'queued', run_after = ? WHERE {stale}", (now, cutoff))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        for row in exhausted:
+            self._count("failed")
+            if row["webhook_url"]:
+                self._deliver_webhook(row["id"], row["webhook_url"])
+        return cursor.rowcount
+
+    def _worker(self):
+        last_maintenance = 0.0
+        while not self._stopping:
+            try:
+                if self.run_one():
+                    continue
+                if time.time() - last_maintenance > 60:
+                    self.recover_stale()
+                    self.purge()
+                    last_maintenance = time.time()
+            except Exception as e:
+                print(f"Job worker error: {e}")
+            # Submissions notify; the timeout picks up delayed retries and other processes' jobs
+            with self._wakeup:
+                self._wakeup.wait(self.poll_interval)
+
+    def start(self):
+        """Start the worker threads"""
+        # Threads do not survive fork(): a child process starts its own pool
+        if self._threads and self._threads_pid == os.getpid():
+            return
+        self._threads = []
+        self._threads_pid = os.getpid()
+        self._stopping = False
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=5.0):
+        self._stopping = True
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def stats(self):
+        rows = self._connect().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            **counters,
+            "workers": len(self._threads),
+            "byStatus": {status: count for status, count in rows},
+            "maxPending": self.max_pending
+        }
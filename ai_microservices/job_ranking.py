@@ -0,0 +1,36 @@
+import time
+
+import numpy as np
+
+from vector_index import HashingEmbedder
+
+
+class JobRanker:
+    """Rank many job descriptions against one resume with hashed TF-IDF vectors"""
+
+    def __init__(self, embedder=None):
+        self.embedder = embedder or HashingEmbedder(dim=4096)
+
+    def rank(self, resume_text, job_texts):
+        """Return (order, similarities, elapsed_ms); order lists job indices best-first"""
+        started = time.perf_counter()
+        if not job_texts:
+            return [], np.zeros(0, dtype=np.float32), 0.0
+
+        # One pass builds the counts for every description; the resume is the last row
+        counts = self.embedder.count_matrix(list(job_texts) + [resume_text], signed=False)
+
+        # IDF over the submitted descriptions, so terms every posting shares
+        # ("team", "experience") count for little and distinguishing ones dominate
+        document_frequency = np.count_nonzero(counts[:-1], axis=0)
+        idf = np.log((1 + len(job_texts)) / (1 + document_frequency)) + 1
+
+        weighted = np.log1p(counts) * idf
+        norms = np.linalg.norm(weighted, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        weighted /= norms
+
+        similarities = weighted[:-1] @ weighted[-1]
+        # Stable sort keeps submission order for ties
+        order = np.argsort(-similarities, kind="stable").tolist()
+        return order, similarities, round((time.perf_counter() - started) * 1000, 2)
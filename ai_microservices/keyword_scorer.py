@@ -0,0 +1,229 @@
+import math
+import re
+import time
+from collections import Counter
+
+# Canonical skill names and the spellings that map onto them
+SKILL_ALIASES = {
+    "python": ["python", "python3"],
+    "java": ["java"],
+    "javascript": ["javascript", "js", "ecmascript"],
+    "typescript": ["typescript", "ts"],
+    "c++": ["c++", "cpp"],
+    "c#": ["c#", "csharp"],
+    "go": ["golang"],
+    "rust": ["rust"],
+    "ruby": ["ruby"],
+    "php": ["php"],
+    "kotlin": ["kotlin"],
+    "swift": ["swift"],
+    "scala": ["scala"],
+    "r": ["r programming"],
+    "sql": ["sql"],
+    "nosql": ["nosql"],
+    "html": ["html", "html5"],
+    "css": ["css", "css3"],
+    "react": ["react", "react.js", "reactjs"],
+    "react native": ["react native"],
+    "angular": ["angular", "angularjs"],
+    "vue": ["vue", "vue.js", "vuejs"],
+    "next.js": ["next.js", "nextjs"],
+    "node.js": ["node.js", "nodejs", "node"],
+    "express": ["express", "express.js", "expressjs"],
+    "django": ["django"],
+    "flask": ["flask"],
+    "fastapi": ["fastapi"],
+    "spring boot": ["spring boot", "springboot"],
+    "graphql": ["graphql"],
+    "rest api": ["rest api", "rest apis", "restful api", "restful apis", "restful"],
+    "microservices": ["microservices", "microservice"],
+    "postgresql": ["postgresql", "postgres"],
+    "mysql": ["mysql"],
+    "mongodb": ["mongodb", "mongo"],
+    "redis": ["redis"],
+    "elasticsearch": ["elasticsearch"],
+    "kafka": ["kafka", "apache kafka"],
+    "spark": ["spark", "apache spark", "pyspark"],
+    "hadoop": ["hadoop"],
+    "airflow": ["airflow", "apache airflow"],
+    "aws": ["aws", "amazon web services"],
+    "azure": ["azure", "microsoft azure"],
+    "gcp": ["gcp", "google cloud", "google cloud platform"],
+    "docker": ["docker"],
+    "kubernetes": ["kubernetes", "k8s"],
+    "terraform": ["terraform"],
+    "ci/cd": ["ci/cd", "cicd", "continuous integration", "continuous delivery", "continuous deployment"],
+    "jenkins": ["jenkins"],
+    "github actions": ["github actions"],
+    "git": ["git"],
+    "linux": ["linux"],
+    "machine learning": ["machine learning", "ml"],
+    "deep learning": ["deep learning"],
+    "nlp": ["nlp", "natural language processing"],
+    "computer vision": ["computer vision"],
+    "llm": ["llm", "llms", "large language models", "large language model"],
+    "tensorflow": ["tensorflow"],
+    "pytorch": ["pytorch"],
+    "scikit-learn": ["scikit-learn", "sklearn"],
+    "pandas": ["pandas"],
+    "numpy": ["numpy"],
+    "data analysis": ["data analysis", "data analytics"],
+    "data visualization": ["data visualization"],
+    "tableau": ["tableau"],
+    "power bi": ["power bi", "powerbi"],
+    "excel": ["excel", "microsoft excel"],
+    "statistics": ["statistics", "statistical analysis"],
+    "agile": ["agile", "scrum"],
+    "unit testing": ["unit testing", "unit tests"],
+    "system design": ["system design"],
+    "distributed systems": ["distributed systems"],
+    "communication": ["communication skills", "communication"],
+    "leadership": ["leadership"],
+    "project management": ["project management"],
+}
+
+STOPWORDS = frozenset("""
+a about above across after all also an and any are as at be been being both but by can could
+do does each etc for from has have having how if in into is it its may more most must new of on
+one or other our out over per plus preferred required requirements responsibilities role should
+so such than that the their them then there these they this those through to under up us use
+using via we well what when where which while who will with within work working would you your
+ability able strong excellent good great years year experience experienced knowledge understanding
+skills skill team teams including include includes across join looking opportunity candidate
+candidates position company job based related relevant etc least minimum bonus nice
+""".split())
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#./\-]*")
+
+# Alias phrase (as a token tuple) -> canonical skill
+_ALIAS_INDEX = {}
+for _skill, _aliases in SKILL_ALIASES.items():
+    for _alias in _aliases:
+        _ALIAS_INDEX[tuple(_alias.split())] = _skill
+_MAX_ALIAS_WORDS = max(len(alias) for alias in _ALIAS_INDEX)
+
+# Lexicon skills count more than other terms in the overlap score
+SKILL_WEIGHT = 2.0
+
+
+def tokenize(text):
+    """Lowercase tokens that keep names like c++, c#, node.js and ci/cd intact"""
+    return [token.rstrip(".-/") for token in _TOKEN_RE.findall(text.lower())]
+
+
+def _stem(token):
+    # Light plural folding so "apis" matches "api" and "services" matches "service"
+    if len(token) > 4 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def extract_terms(text):
+    """Count skills from the lexicon plus plain unigram/bigram terms in a text"""
+    tokens = tokenize(text)
+    skills = Counter()
+    covered = [False] * len(tokens)
+    i = 0
+    while i < len(tokens):
+        # Longest lexicon phrase starting here wins ("react native" over "react")
+        for width in range(min(_MAX_ALIAS_WORDS, len(tokens) - i), 0, -1):
+            skill = _ALIAS_INDEX.get(tuple(tokens[i:i + width]))
+            if skill is not None:
+                skills[skill] += 1
+                for j in range(i, i + width):
+                    covered[j] = True
+                i += width
+                break
+        else:
+            i += 1
+
+    words = [
+        _stem(token) if not covered[i] and token not in STOPWORDS and len(token) > 2 and not token.isdigit() else None
+        for i, token in enumerate(tokens)
+    ]
+    terms = Counter(word for word in words if word)
+    for first, second in zip(words, words[1:]):
+        if first and second:
+            terms[f"{first} {second}"] += 1
+    return skills, terms
+
+
+def _sentences(text):
+    return [part for part in re.split(r"[\n.;!?]+", text) if part.strip()]
+
+
+def score_resume(resume_text, job_description, max_missing=15):
+    """Deterministic TF-IDF-weighted keyword overlap between a resume and a job description"""
+    started = time.perf_counter()
+    job_skills, job_terms = extract_terms(job_description)
+    resume_skills, resume_terms = extract_terms(resume_text)
+
+    # Plain bigrams are noisy; keep only those the job description repeats
+    job_terms = Counter({
+        term: count for term, count in job_terms.items()
+        if " " not in term or count > 1
+    })
+
+    # IDF over the sentences of both texts: terms that appear everywhere
+    # ("development", "systems") carry less weight than specific ones
+    sentences = _sentences(job_description) + _sentences(resume_text)
+    document_frequency = Counter()
+    for sentence in sentences:
+        sentence_skills, sentence_terms = extract_terms(sentence)
+        document_frequency.update(set(sentence_skills) | set(sentence_terms))
+
+    def weight(term, count, boost=1.0):
+        idf = math.log((1 + len(sentences)) / (1 + document_frequency[term])) + 1
+        return (1 + math.log(count)) * idf * boost
+
+    weights = {}
+    for skill, count in job_skills.items():
+        weights[("skill", skill)] = weight(skill, count, SKILL_WEIGHT)
+    for term, count in job_terms.items():
+        weights[("term", term)] = weight(term, count)
+
+    matched, missing = [], []
+    for (kind, term), term_weight in weights.items():
+        present = resume_skills[term] if kind == "skill" else resume_terms[term]
+        (matched if present else missing).append((term_weight, kind, term))
+
+    total = sum(weights.values())
+    matched_weight = sum(item[0] for item in matched)
+    matched.sort(key=lambda item: (-item[0], item[2]))
+    missing.sort(key=lambda item: (-item[0], item[2]))
+
+    return {
+        "matchPercentage": round(matched_weight * 100 / total) if total else 0,
+        "matchedSkills": [term for _, kind, term in matched if kind == "skill"],
+        "missingSkills": [term for _, kind, term in missing if kind == "skill"],
+        "missingKeywords": [term for _, _, term in missing[:max_missing]],
+        "matchedKeywords": [term for _, _, term in matched[:max_missing]],
+        "elapsedMs": round((time.perf_counter() - started) * 1000, 2)
+    }
+
+
+def format_score(result, analysis_type):
+    """Render a scorer result as analysis text in the same shape the prompts ask for"""
+    missing = ", ".join(result["missingKeywords"]) or "None"
+    matched = ", ".join(result["matchedSkills"] or result["matchedKeywords"]) or "None"
+    lines = []
+    if analysis_type == "percentage":
+        lines.append(f"Match Percentage: {result['matchPercentage']}%")
+    lines.append(f"Missing Keywords: {missing}")
+    lines.append(f"Matched Skills: {matched}")
+    if analysis_type == "keywords" and result["missingSkills"]:
+        lines.append(
+            "Recommendations: add evidence of " + ", ".join(result["missingSkills"][:5])
+            + " where you have real experience with them."
+        )
+    return "\n".join(lines)
+
+
+def score_context(result):
+    """Summarize a scorer result as extra prompt context for the LLM"""
+    return (
+        "Deterministic keyword analysis (computed locally; use these figures rather than estimating your own):\n"
+        f"- Match percentage: {result['matchPercentage']}%\n"
+        f"- Matched skills: {', '.join(result['matchedSkills']) or 'none'}\n"
+        f"- Missing keywords: {', '.join(result['missingKeywords']) or 'none'}"
+    )
@@ -0,0 +1,227 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(value):
+    """Collapse runs of whitespace so cosmetic differences share a cache entry"""
+    if value is None:
+        return ""
+    return _WHITESPACE_RE.sub(" ", str(value)).strip()
+
+
+def make_cache_key(template_name, model_name, temperature, inputs):
+    """Build a stable cache key from the template, model settings and normalized inputs"""
+    payload = {
+        "template": template_name,
+        "model": model_name,
+        "temperature": temperature,
+        "inputs": {name: normalize_text(value) for name, value in sorted(inputs.items())}
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class InMemoryCacheBackend:
+    """Process-local LRU backend with per-entry expiry"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl_seconds):
+        expires_at = time.time() + ttl_seconds if ttl_seconds else None
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (value, expires_at)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """Local SQLite file backend, shared by every process that opens the same path"""
+
+    def __init__(self, path, max_entries=10000):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self.evictions = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "expires_at REAL, last_access REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON llm_cache(last_access)")
+        conn.commit()
+
+    def _connect(self):
+        # sqlite3 connections must not be shared across threads, nor with a forked child
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def close(self):
+        """Close this thread's connection, e.g. in a server master before it forks workers"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            conn.close()
+        self._local.conn = None
+
+    def get(self, key):
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        now = time.time()
+        if expires_at is not None and expires_at <= now:
+            conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            conn.commit()
+            return None
+        conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+        conn.commit()
+        return value
+
+    def set(self, key, value, ttl_seconds):
+        now = time.time()
+        expires_at = now + ttl_seconds if ttl_seconds else None
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+            (key, value, expires_at, now)
+        )
+
+        # Drop expired rows, then the least recently used ones beyond the size bound
+        conn.execute("DELETE FROM llm_cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        overflow = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM llm_cache WHERE key IN "
+                "(SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                (overflow,)
+            )
+            self.evictions += overflow
+        conn.commit()
+
+    def clear(self):
+        conn = self._connect()
+        conn.execute("DELETE FROM llm_cache")
+        conn.commit()
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+
+class LLMResponseCache:
+    """TTL cache of LLM completions with per-endpoint hit-rate metrics"""
+
+    def __init__(self, backend, ttl_seconds=3600):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, endpoint="default"):
+        """Return the cached completion for key, recording a hit or miss for endpoint"""
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            print(f"LLM cache read failed: {e}")
+            value = None
+        self._record(endpoint, value is not None)
+        return value
+
+    def set(self, key, value):
+        """Store a completion; backend failures never break the request"""
+        try:
+            self.backend.set(key, value, self.ttl_seconds)
+        except Exception as e:
+            print(f"LLM cache write failed: {e}")
+
+    def clear(self):
+        self.backend.clear()
+        with self._lock:
+            self._metrics.clear()
+
+    def _record(self, endpoint, hit):
+        with self._lock:
+            counters = self._metrics.setdefault(endpoint, {"hits": 0, "misses": 0})
+            counters["hits" if hit else "misses"] += 1
+
+    def stats(self):
+        """Return backend info and per-endpoint hit rates"""
+        with self._lock:
+            endpoints = {}
+            for endpoint, counters in self._metrics.items():
+                total = counters["hits"] + counters["misses"]
+                endpoints[endpoint] = {
+                    "hits": counters["hits"],
+                    "misses": counters["misses"],
+                    "hitRate": round(counters["hits"] / total, 4) if total else 0.0
+                }
+        try:
+            size = len(self.backend)
+        except Exception:
+            size = None
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": size,
+            "ttlSeconds": self.ttl_seconds,
+            "evictions": getattr(self.backend, "evictions", 0),
+            "endpoints": endpoints
+        }
+
+
+def create_llm_cache(backend_name="memory", ttl_seconds=3600, max_entries=1024, sqlite_path=None):
+    """Create an LLMResponseCache, or None when caching is disabled"""
+    backend_name = (backend_name or "memory").lower()
+    if backend_name in ("off", "none", "disabled"):
+        return None
+    if backend_name == "sqlite":
+        try:
+            backend = SQLiteCacheBackend(sqlite_path or "llm_cache.sqlite3", max_entries=max_entries)
+            return LLMResponseCache(backend, ttl_seconds=ttl_seconds)
+        except Exception as e:
+            print(f"SQLite LLM cache unavailable, using in-memory cache: {e}")
+    return LLMResponseCache(InMemoryCacheBackend(max_entries=max_entries), ttl_seconds=ttl_seconds)
@@ -0,0 +1,14 @@
+def estimate_tokens(text):
+    """Rough token estimate (~4 characters per token) when the model reports no usage"""
+    return max(1, len(text) // 4) if text else 0
+
+
+def message_text(message):
+    """Return the text of a chat message or chunk, whose content may be a list of parts"""
+    content = getattr(message, "content", message)
+    if isinstance(content, list):
+        return "".join(
+            part.get("text", "") if isinstance(part, dict) else str(part)
+            for part in content
+        )
+    return content or ""
@@ -0,0 +1,176 @@
+"""Load benchmark: Flask (threaded) vs. the asyncio serving mode.
+
+Both servers run in this process against fake_llm.FakeLLM with a fixed
+latency. Every store lives in a temporary directory and the LLM response
+cache, question bank and job queue are disabled, so every request reaches
+the model and the working directory's data is left alone. The LLM call pool
+and the async admission queue are sized to the concurrency so both servers
+accept the whole load; throughput and latency count successful (2xx)
+responses only, and the run fails when the error rate exceeds --max-error-rate.
+Example:
+
+    python load_benchmark.py --requests 400 --concurrency 100 --llm-latency 0.5
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+import aiohttp
+from aiohttp import web
+from werkzeug.serving import make_server
+
+from fake_llm import FakeLLM
+
+QUESTIONS_RESPONSE = json.dumps([
+    {"question": f"Benchmark question {i}?", "explanation": "Benchmark explanation."}
+    for i in range(10)
+])
+
+
+def configure_environment(data_dir, concurrency):
+    """Isolate the service before it is imported: fresh stores, no caches or background workers,
+    and call pools large enough that neither server rejects the benchmark's own load"""
+    os.environ.update({
+        "LLM_CALL_WORKERS": str(max(64, concurrency)),
+        "ASYNC_MAX_QUEUE": str(max(64, concurrency)),
+        "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY") or "benchmark-placeholder",
+        "CHROMA_ENABLED": "false",
+        "WARMUP_ON_START": "false",
+        "LLM_RATE_LIMIT_PER_MINUTE": "0",
+        "LLM_CACHE_BACKEND": "off",
+        "QUESTION_BANK_ENABLED": "false",
+        "JOB_QUEUE_ENABLED": "false",
+        "PDF_CACHE_DIR": "",
+        "COMPANY_STORE_PATH": os.path.join(data_dir, "company_store.sqlite3"),
+        "LOCAL_INDEX_DIR": os.path.join(data_dir, "vector_index"),
+        "LOCAL_INDEX_PATH": os.path.join(data_dir, "vector_index.sqlite3"),
+        "QUESTION_BANK_PATH": os.path.join(data_dir, "question_bank.sqlite3"),
+        "LLM_CACHE_PATH": os.path.join(data_dir, "llm_cache.sqlite3"),
+        "JOB_QUEUE_PATH": os.path.join(data_dir, "jobs.sqlite3"),
+    })
+
+
+def start_flask_server(port, app):
+    server = make_server("127.0.0.1", port, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def start_async_server(port):
+    import async_services
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(async_services.create_app())
+    ready = threading.Event()
+
+    def serve():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, "127.0.0.1", port).start())
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=serve, daemon=True).start()
+    ready.wait()
+    return loop, runner
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_load(url, total_requests, concurrency):
+    latencies = []
+    statuses = {}
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    timeout = aiohttp.ClientTimeout(total=300)
+
+    async with aiohttp.ClientSession(timeout=timeout, connector=aiohttp.TCPConnector(limit=concurrency)) as session:
+        async def one(i):
+            nonlocal errors
+            payload = {"targetRole": f"Engineer {i}", "yearsExperience": "3"}
+            async with semaphore:
+                started = time.perf_counter()
+                async with session.post(url, json=payload) as response:
+                    await response.read()
+                    statuses[response.status] = statuses.get(response.status, 0) + 1
+                    ok = 200 <= response.status < 300
+                if ok:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total_requests)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": total_requests,
+        "concurrency": concurrency,
+        "elapsedSeconds": round(elapsed, 3),
+        "requestsPerSecond": round(len(latencies) / elapsed, 2),
+        "p50Ms": round(statistics.median(latencies) * 1000, 1) if latencies else None,
+        "p99Ms": round(percentile(latencies, 99) * 1000, 1) if latencies else None,
+        "errorRate": round(errors / total_requests, 4),
+        "statuses": statuses
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--max-in-flight", type=int, default=None,
+                        help="override ASYNC_MAX_IN_FLIGHT for the async server")
+    parser.add_argument("--max-error-rate", type=float, default=0.01,
+                        help="exit non-zero when a server's share of non-2xx responses exceeds this")
+    parser.add_argument("--flask-port", type=int, default=18001)
+    parser.add_argument("--async-port", type=int, default=18002)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="ai-load-benchmark-")
+    configure_environment(data_dir, args.concurrency)
+    import services
+    import async_services
+
+    services.set_llm(FakeLLM(responses=QUESTIONS_RESPONSE, latency=args.llm_latency))
+    if args.max_in_flight:
+        async_services.admission.max_in_flight = args.max_in_flight
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    start_flask_server(args.flask_port, services.app)
+    start_async_server(args.async_port)
+
+    results = {}
+    for name, port in (("flask", args.flask_port), ("async", args.async_port)):
+        url = f"http://127.0.0.1:{port}/api/generate-interview-questions"
+        results[name] = asyncio.run(run_load(url, args.requests, args.concurrency))
+
+    print(json.dumps({
+        "llmLatencySeconds": args.llm_latency,
+        "asyncAdmission": async_services.admission.stats(),
+        "results": results
+    }, indent=2))
+    shutil.rmtree(data_dir, ignore_errors=True)
+    failed = [name for name, result in results.items() if result["errorRate"] > args.max_error_rate]
+    if failed:
+        print(f"Error rate above {args.max_error_rate} for: {', '.join(failed)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
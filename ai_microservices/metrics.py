@@ -0,0 +1,170 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds; spans fast cache hits up to slow LLM calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _format_labels(labelnames, labelvalues, extra=None):
+    pairs = list(zip(labelnames, labelvalues))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [(self.name, _format_labels(self.labelnames, key), value) for key, value in items]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels"""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                # Per-bucket counts (plus +Inf), sum, count; made cumulative on render
+                series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._values.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(float(bound))))
+                lines.append((f"{self.name}_bucket", labels, cumulative))
+            labels = _format_labels(self.labelnames, key)
+            lines.append((f"{self.name}_sum", labels, round(total, 6)))
+            lines.append((f"{self.name}_count", labels, count))
+        return lines
+
+
+class MetricsRegistry:
+    """Collects metrics and renders them in the Prometheus text exposition format"""
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    "ai_http_requests_total", "HTTP requests by route, method and status", ("route", "method", "status")
+)
+http_latency = registry.histogram(
+    "ai_http_request_duration_seconds", "Time until the response is returned (headers, for streams)", ("route",)
+)
+stage_latency = registry.histogram(
+    "ai_stage_duration_seconds", "Time spent in each processing stage", ("stage",)
+)
+llm_input_chars = registry.counter(
+    "ai_llm_input_chars_total", "Prompt characters sent to the model", ("endpoint",)
+)
+llm_output_chars = registry.counter(
+    "ai_llm_output_chars_total", "Completion characters received from the model", ("endpoint",)
+)
+llm_input_tokens = registry.counter(
+    "ai_llm_input_tokens_total", "Prompt tokens sent to the model (estimated when not reported)", ("endpoint",)
+)
+llm_output_tokens = registry.counter(
+    "ai_llm_output_tokens_total", "Completion tokens received from the model (estimated when not reported)", ("endpoint",)
+)
+
+
+@contextmanager
+def stage(name):
+    """Time a block into ai_stage_duration_seconds{stage=name}"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_latency.observe(time.perf_counter() - started, stage=name)
+
+
+def record_llm_io(endpoint, prompt, completion, input_tokens=None, output_tokens=None):
+    """Count characters and tokens (~4 characters per token unless reported) for one model call"""
+    llm_input_chars.inc(len(prompt), endpoint=endpoint)
+    llm_output_chars.inc(len(completion), endpoint=endpoint)
+    llm_input_tokens.inc(input_tokens if input_tokens is not None else len(prompt) // 4, endpoint=endpoint)
+    llm_output_tokens.inc(output_tokens if output_tokens is not None else len(completion) // 4, endpoint=endpoint)
+
+
+def observe_request(route, method, status, seconds):
+    http_requests.inc(route=route, method=method, status=str(status))
+    http_latency.observe(seconds, route=route)
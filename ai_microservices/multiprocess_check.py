@@ -0,0 +1,225 @@
+"""Multi-process deployment check: gunicorn workers sharing caches and the vector index.
+
+For each worker count it starts gunicorn with gunicorn.conf.py (MULTIPROCESS_MODE,
+preload and fork) over a fresh temporary data directory, with the chat model
+swapped for fake_llm.FakeLLM. Every fake answer names the prompt hash and the pid
+of the worker that generated it, so a worker that missed the shared LLM cache
+or the shared vector index shows up as a differing answer.
+
+  consistency  ingest a company once, ask questions sequentially, then repeat them
+               concurrently: every worker must serve the same answers and the same
+               retrieval candidates, and more than one worker must have answered
+  throughput   unique questions (every one reaches the model) at fixed concurrency;
+               reports requests/s, speedup and scaling efficiency per worker count
+
+    python multiprocess_check.py --workers 1,2,4 --llm-latency 0.2
+
+Exits non-zero when a consistency check fails.
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+COMPANY = "Multiprocess Check Co"
+QUESTIONS = [
+    "What is the company culture like?",
+    "What recent news is there about the company?",
+    "How should I prepare for the interview?",
+    "Does the company invest in AI and machine learning?",
+    "Is work-life balance important there?",
+    "What markets is the company expanding into?",
+]
+NO_COMPANY_INFO = "No information found for this company"
+
+
+def create_app():
+    """gunicorn app factory ("multiprocess_check:create_app()"): the service with a fake model"""
+    import services
+    from fake_llm import FakeLLM
+
+    def respond(prompt):
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+        return f"Answer {digest} generated by worker {os.getpid()}"
+
+    services.set_llm(FakeLLM(responses=respond, latency=float(os.getenv("MP_CHECK_LLM_LATENCY", 0.1))))
+
+    @services.app.after_request
+    def add_worker_pid(response):
+        response.headers["X-Worker-Pid"] = str(os.getpid())
+        return response
+
+    return services.app
+
+
+def start_server(args, workers, data_dir):
+    env = dict(
+        os.environ,
+        GOOGLE_API_KEY=os.environ.get("GOOGLE_API_KEY") or "multiprocess-check-placeholder",
+        PORT=str(args.port),
+        WEB_CONCURRENCY=str(workers),
+        GUNICORN_THREADS=str(args.threads),
+        MP_CHECK_LLM_LATENCY=str(args.llm_latency),
+        WARMUP_ON_START="false",
+        LLM_RATE_LIMIT_PER_MINUTE="0",
+        COMPANY_STORE_PATH=os.path.join(data_dir, "company_store.sqlite3"),
+        LOCAL_INDEX_PATH=os.path.join(data_dir, "vector_index.sqlite3"),
+        LLM_CACHE_PATH=os.path.join(data_dir, "llm_cache.sqlite3"),
+        PDF_CACHE_DIR=os.path.join(data_dir, "pdf_cache"),
+        QUESTION_BANK_PATH=os.path.join(data_dir, "question_bank.sqlite3"),
+        JOB_QUEUE_PATH=os.path.join(data_dir, "jobs.sqlite3"),
+    )
+    log = open(os.path.join(data_dir, "gunicorn.log"), "w")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "multiprocess_check:create_app()"],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+    return process, log
+
+
+def wait_until_ready(session, base_url, process, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("gunicorn exited during startup")
+        try:
+            if session.get(f"{base_url}/api/health", timeout=2).status_code == 200:
+                return
+        except Exception:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError("gunicorn did not become ready in time")
+
+
+def ask(session, base_url, question):
+    started = time.perf_counter()
+    response = session.post(f"{base_url}/api/research-company", json={"company": COMPANY, "question": question},
+                            timeout=120)
+    elapsed = time.perf_counter() - started
+    body = response.json()
+    return {
+        "status": response.status_code,
+        "pid": response.headers.get("X-Worker-Pid"),
+        "answer": body.get("answer") or body.get("error"),
+        "candidates": (body.get("retrieval") or {}).get("candidates"),
+        "seconds": elapsed
+    }
+
+
+def check_consistency(session, base_url, workers, repeats, concurrency):
+    """Returns (failures, distinct worker pids that answered)"""
+    failures = []
+    first = [ask(session, base_url, question) for question in QUESTIONS]
+    expected = {question: result for question, result in zip(QUESTIONS, first)}
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        repeated = list(pool.map(lambda question: (question, ask(session, base_url, question)),
+                                 QUESTIONS * repeats))
+
+    pids = set()
+    for question, result in list(zip(QUESTIONS, first)) + repeated:
+        pids.add(result["pid"])
+        reference = expected[question]
+        if result["status"] != 200:
+            failures.append(f"{question!r}: status {result['status']} ({result['answer']})")
+        elif NO_COMPANY_INFO in (result["answer"] or ""):
+            failures.append(f"{question!r}: worker {result['pid']} found no company information")
+        elif result["answer"] != reference["answer"]:
+            failures.append(f"{question!r}: worker {result['pid']} answered {result['answer']!r}, "
+                            f"expected {reference['answer']!r}")
+        elif result["candidates"] != reference["candidates"]:
+            failures.append(f"{question!r}: worker {result['pid']} retrieved {result['candidates']} candidates, "
+                            f"expected {reference['candidates']}")
+    if workers > 1 and len(pids) < 2:
+        failures.append(f"only worker {pids.pop()} answered; requests were not spread across processes")
+    return failures, sorted(pids)
+
+
+def measure_throughput(session, base_url, requests_count, concurrency, offset):
+    questions = [f"{QUESTIONS[i % len(QUESTIONS)]} (throughput {offset + i})" for i in range(requests_count)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda question: ask(session, base_url, question), questions))
+    elapsed = time.perf_counter() - started
+    latencies = sorted(result["seconds"] for result in results)
+    return {
+        "requestsPerSecond": round(len(results) / elapsed, 2),
+        "p50Ms": round(latencies[len(latencies) // 2] * 1000, 1),
+        "errors": sum(result["status"] != 200 for result in results),
+        "workerPids": len({result["pid"] for result in results})
+    }
+
+
+def run_worker_count(args, workers):
+    import requests
+
+    data_dir = tempfile.mkdtemp(prefix="ai-multiprocess-")
+    process, log = start_server(args, workers, data_dir)
+    session = requests.Session()
+    session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=64))
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        wait_until_ready(session, base_url, process)
+        failures, pids = check_consistency(session, base_url, workers, args.repeats, args.concurrency)
+        throughput = measure_throughput(session, base_url, args.requests, args.concurrency, workers * 100000)
+        if throughput["errors"]:
+            failures.append(f"{throughput['errors']} throughput requests failed")
+        return {"workers": workers, "consistencyFailures": failures, "answeringPids": len(pids), **throughput}
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        log.close()
+        if args.keep_data:
+            print(f"Data and gunicorn.log kept in {data_dir}", file=sys.stderr)
+        else:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts to compare")
+    parser.add_argument("--threads", type=int, default=1, help="gunicorn threads per worker")
+    parser.add_argument("--requests", type=int, default=40, help="unique questions in the throughput phase")
+    parser.add_argument("--repeats", type=int, default=4, help="concurrent repeats of each consistency question")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--llm-latency", type=float, default=0.1, help="fake model latency in seconds")
+    parser.add_argument("--port", type=int, default=18005)
+    parser.add_argument("--keep-data", action="store_true", help="keep each run's data directory and log")
+    parser.add_argument("--output", help="write the results JSON to this file")
+    args = parser.parse_args()
+
+    results = []
+    for workers in [int(value) for value in args.workers.split(",")]:
+        result = run_worker_count(args, workers)
+        results.append(result)
+        baseline = results[0]
+        result["speedup"] = round(result["requestsPerSecond"] / baseline["requestsPerSecond"], 2)
+        result["efficiency"] = round(result["speedup"] / (workers / baseline["workers"]), 2)
+        status = "ok" if not result["consistencyFailures"] else f"{len(result['consistencyFailures'])} failures"
+        print(f"workers {workers:>3}  {result['requestsPerSecond']:>8.2f} req/s  p50 {result['p50Ms']:>8.1f} ms  "
+              f"speedup {result['speedup']:>5.2f}  efficiency {result['efficiency']:>5.2f}  "
+              f"answering pids {result['answeringPids']}  consistency {status}", file=sys.stderr)
+        for failure in result["consistencyFailures"][:10]:
+            print(f"    {failure}", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"cpuCount": os.cpu_count(), "llmLatencySeconds": args.llm_latency, "results": results},
+                      f, indent=2)
+        print(f"Results written to {args.output}", file=sys.stderr)
+    if any(result["consistencyFailures"] for result in results):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
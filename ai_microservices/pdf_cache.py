@@ -0,0 +1,187 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+# When the disk tier outgrows its budget it is pruned to this fraction of it, so a
+# full tier is not rescanned on every write
+DISK_PRUNE_TARGET = 0.9
+
+
+class PDFTextCache:
+    """Content-addressed cache of extracted PDF text with an optional disk tier"""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, disk_dir=None, disk_max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        # 0 or None: the disk tier is not size-limited
+        self.disk_max_bytes = disk_max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        # Estimate of the disk tier's size; None until the first scan. Other processes
+        # sharing disk_dir also write to it, so pruning rescans instead of trusting this
+        self._disk_size = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+
+        if self.disk_dir:
+            try:
+                os.makedirs(self.disk_dir, exist_ok=True)
+            except OSError as e:
+                print(f"PDF cache disk tier disabled: {e}")
+                self.disk_dir = None
+
+    @staticmethod
+    def key_for(pdf_bytes):
+        """Return the cache key (SHA-256 hex digest) for raw PDF bytes"""
+        return hashlib.sha256(pdf_bytes).hexdigest()
+
+    def get(self, key):
+        """Return cached text for key, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        text = self._read_disk(key)
+        with self._lock:
+            if text is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store(key, text)
+        return text
+
+    def put(self, key, text):
+        """Cache extracted text in memory and, if enabled, on disk"""
+        with self._lock:
+            self._store(key, text)
+        self._write_disk(key, text)
+
+    def clear(self):
+        """Drop all in-memory entries (the disk tier is left untouched)"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        """Return hit/miss counters and current memory usage"""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "maxBytes": self.max_bytes,
+                "hits": self.hits,
+                "diskHits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hitRate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "diskEnabled": bool(self.disk_dir),
+                "diskBytes": self._disk_size,
+                "diskMaxBytes": self.disk_max_bytes,
+                "diskEvictions": self.disk_evictions
+            }
+
+    def _store(self, key, text):
+        # Caller must hold the lock
+        size = len(text.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size -= previous[1]
+
+        self._entries[key] = (text, size)
+        self._size += size
+
+        # Evict least recently used entries until we fit the byte budget
+        while self._size > self.max_bytes and self._entries:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._size -= evicted_size
+            self.evictions += 1
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], f"{key}.txt")
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+            # The modification time is the disk tier's recency for LRU eviction
+            os.utime(path)
+            return text
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            print(f"PDF cache disk read failed: {e}")
+            return None
+
+    def _write_disk(self, key, text):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temp file first so readers never see a partial entry
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"PDF cache disk write failed: {e}")
+            return
+        if self.disk_max_bytes:
+            with self._disk_lock:
+                if self._disk_size is None:
+                    self._disk_size = sum(size for _, size, _ in self._scan_disk())
+                else:
+                    self._disk_size += len(text.encode("utf-8"))
+                if self._disk_size > self.disk_max_bytes:
+                    self._prune_disk()
+
+    def _scan_disk(self):
+        """Yield (mtime, size, path) for every cached file in the disk tier"""
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                # Skip temp files that another writer has not renamed into place yet
+                if not name.endswith(".txt"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield stat.st_mtime, stat.st_size, path
+
+    def _prune_disk(self):
+        """Remove least recently used files until the disk tier is under its budget (caller holds _disk_lock)"""
+        entries = sorted(self._scan_disk())
+        size = sum(entry_size for _, entry_size, _ in entries)
+        target = self.disk_max_bytes * DISK_PRUNE_TARGET
+        for _, entry_size, path in entries:
+            if size <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"PDF cache disk eviction failed: {e}")
+                continue
+            size -= entry_size
+            self.disk_evictions += 1
+        self._disk_size = size
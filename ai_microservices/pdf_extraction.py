@@ -0,0 +1,189 @@
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+# Joins the text of consecutive pages; counts toward the character budget
+PAGE_SEPARATOR = " "
+
+
+class PDFLimitError(Exception):
+    """Raised when an upload exceeds the configured size or page limits"""
+
+
+def read_upload(file_obj, max_bytes, chunk_size=64 * 1024):
+    """Read an uploaded file in chunks, refusing anything larger than max_bytes"""
+    chunks = []
+    total = 0
+    while True:
+        chunk = file_obj.read(chunk_size)
+        if not chunk:
+            break
+        total += len(chunk)
+        if max_bytes and total > max_bytes:
+            raise PDFLimitError(f"PDF is larger than the {max_bytes // (1024 * 1024)} MB limit")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def _import_fitz():
+    # Runs in a worker process so the first real task does not pay the import
+    import fitz  # noqa: F401
+    return True
+
+
+def _extract_page_range(pdf_path, start, end):
+    # Runs in a worker process: open the document and extract pages [start, end)
+    import fitz
+    document = fitz.open(pdf_path, filetype="pdf")
+    pages = []
+    for page_number in range(start, end):
+        started = time.perf_counter()
+        text = document[page_number].get_text()
+        pages.append((page_number, text, (time.perf_counter() - started) * 1000))
+    document.close()
+    return pages
+
+
+class PDFExtractor:
+    """Page-streaming PDF text extraction with a process pool for large documents"""
+
+    def __init__(self, max_pages=50, max_chars=60000, parallel_min_pages=8,
+                 max_workers=2, pages_per_task=4):
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.parallel_min_pages = parallel_min_pages
+        self.max_workers = max_workers
+        self.pages_per_task = pages_per_task
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.documents = 0
+        self.parallel_documents = 0
+        self.truncated_documents = 0
+        self.pages_extracted = 0
+        self.page_ms_total = 0.0
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                # spawn avoids forking a multi-threaded server process
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def warm_up(self):
+        """Start the worker processes ahead of the first large document"""
+        if self.max_workers > 1:
+            pool = self._get_pool()
+            for future in [pool.submit(_import_fitz) for _ in range(self.max_workers)]:
+                future.result()
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+    def iter_pages(self, pdf_bytes, page_count=None):
+        """Yield (page_number, text, elapsed_ms) in page order; stop iterating to cancel"""
+        if page_count is None:
+            page_count = self.page_count(pdf_bytes)
+
+        if self.max_workers > 1 and page_count >= self.parallel_min_pages:
+            yield from self._iter_pages_parallel(pdf_bytes, page_count)
+            return
+
+        import fitz
+        document = fitz.open(stream=pdf_bytes, filetype="pdf")
+        try:
+            for page_number in range(page_count):
+                started = time.perf_counter()
+                text = document[page_number].get_text()
+                yield page_number, text, (time.perf_counter() - started) * 1000
+        finally:
+            document.close()
+
+    def _iter_pages_parallel(self, pdf_bytes, page_count):
+        # Tasks get a path, not the bytes: pickling the document into every page
+        # range would send one copy per task through the pool
+        fd, pdf_path = tempfile.mkstemp(suffix=".pdf")
+        with os.fdopen(fd, "wb") as f:
+            f.write(pdf_bytes)
+        pool = self._get_pool()
+        futures = [
+            pool.submit(_extract_page_range, pdf_path, start, min(start + self.pages_per_task, page_count))
+            for start in range(0, page_count, self.pages_per_task)
+        ]
+        try:
+            for future in futures:
+                yield from future.result()
+        finally:
+            # Early stop (or an error) cancels page ranges that have not started yet;
+            # ranges already running finish before their file is removed
+            wait([future for future in futures if not future.cancel()])
+            os.remove(pdf_path)
+
+    def page_count(self, pdf_bytes):
+        import fitz
+        document = fitz.open(stream=pdf_bytes, filetype="pdf")
+        try:
+            return document.page_count
+        finally:
+            document.close()
+
+    def extract(self, pdf_bytes, max_chars=None):
+        """Extract text up to the character budget; returns (text, report)"""
+        started = time.perf_counter()
+        max_chars = max_chars if max_chars is not None else self.max_chars
+
+        page_count = self.page_count(pdf_bytes)
+        if self.max_pages and page_count > self.max_pages:
+            raise PDFLimitError(f"PDF has {page_count} pages; the limit is {self.max_pages}")
+
+        parallel = self.max_workers > 1 and page_count >= self.parallel_min_pages
+        parts = []
+        total_chars = 0
+        page_timings = []
+        truncated = False
+        for page_number, text, elapsed_ms in self.iter_pages(pdf_bytes, page_count):
+            page_timings.append(round(elapsed_ms, 2))
+            separator = len(PAGE_SEPARATOR) if parts else 0
+            remaining = max_chars - total_chars - separator
+            if max_chars and len(text) >= remaining:
+                if remaining > 0:
+                    parts.append(text[:remaining])
+                truncated = page_number < page_count - 1 or len(text) > remaining
+                break
+            parts.append(text)
+            total_chars += separator + len(text)
+
+        report = {
+            "pageCount": page_count,
+            "pagesExtracted": len(page_timings),
+            "parallel": parallel,
+            "truncated": truncated,
+            "pageTimingsMs": page_timings,
+            "totalMs": round((time.perf_counter() - started) * 1000, 2)
+        }
+        with self._stats_lock:
+            self.documents += 1
+            self.parallel_documents += int(parallel)
+            self.truncated_documents += int(truncated)
+            self.pages_extracted += len(page_timings)
+            self.page_ms_total += sum(page_timings)
+        return PAGE_SEPARATOR.join(parts), report
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "documents": self.documents,
+                "parallelDocuments": self.parallel_documents,
+                "truncatedDocuments": self.truncated_documents,
+                "pagesExtracted": self.pages_extracted,
+                "avgPageMs": round(self.page_ms_total / self.pages_extracted, 2) if self.pages_extracted else 0.0
+            }
@@ -0,0 +1,184 @@
+import hashlib
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+
+# Common spellings of the same role, so they share one bank entry
+ROLE_ALIASES = {
+    "swe": "software engineer",
+    "sde": "software engineer",
+    "software developer": "software engineer",
+    "software development engineer": "software engineer",
+    "frontend developer": "frontend engineer",
+    "front end developer": "frontend engineer",
+    "front end engineer": "frontend engineer",
+    "backend developer": "backend engineer",
+    "back end developer": "backend engineer",
+    "back end engineer": "backend engineer",
+    "full stack developer": "full stack engineer",
+    "fullstack developer": "full stack engineer",
+    "fullstack engineer": "full stack engineer",
+    "ml engineer": "machine learning engineer",
+    "data analyst intern": "data analyst",
+}
+
+# (upper bound in years, bucket name)
+EXPERIENCE_BUCKETS = [
+    (1, "entry"),
+    (4, "mid"),
+    (9, "senior"),
+    (float("inf"), "staff"),
+]
+
+_NON_WORD_RE = re.compile(r"[^a-z0-9+#]+")
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+
+
+def normalize_role(role):
+    """Lowercase, strip punctuation and seniority prefixes, and apply aliases"""
+    role = _NON_WORD_RE.sub(" ", role.lower()).strip()
+    role = re.sub(r"^(junior|jr|senior|sr|lead|principal|staff)\s+", "", role)
+    return ROLE_ALIASES.get(role, role)
+
+
+def experience_bucket(years_experience):
+    """Map free-form experience ('3', '2-4 years', '10+') to a coarse bucket"""
+    numbers = [float(n) for n in _NUMBER_RE.findall(str(years_experience))]
+    if not numbers:
+        return "entry"
+    # Ranges like '2-4' use their midpoint
+    years = sum(numbers[:2]) / len(numbers[:2])
+    for upper, bucket in EXPERIENCE_BUCKETS:
+        if years <= upper:
+            return bucket
+    return EXPERIENCE_BUCKETS[-1][1]
+
+
+def normalize_topics(topics):
+    """Canonical topic key: lowercase topics, sorted and de-duplicated"""
+    parts = [_NON_WORD_RE.sub(" ", part.lower()).strip() for part in re.split(r"[,;/\n]", topics or "")]
+    parts = sorted(set(part for part in parts if part))
+    return ", ".join(parts) if parts else "general"
+
+
+def bank_key(target_role, years_experience, topics):
+    return (normalize_role(target_role), experience_bucket(years_experience), normalize_topics(topics))
+
+
+class QuestionBank:
+    """Validated interview questions stored per (role, experience bucket, topic) key"""
+
+    def __init__(self, path="question_bank.sqlite3", refresh_seconds=0):
+        self.path = path
+        # With several processes writing the bank, re-read it this often (0 = never)
+        self.refresh_seconds = refresh_seconds
+        self._loaded_at = 0.0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._index = None
+        self.hits = 0
+        self.misses = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS questions ("
+            "role TEXT NOT NULL, bucket TEXT NOT NULL, topic TEXT NOT NULL, "
+            "question_hash TEXT NOT NULL, question TEXT NOT NULL, explanation TEXT NOT NULL, "
+            "PRIMARY KEY (role, bucket, topic, question_hash))"
+        )
+        conn.commit()
+
+    def _connect(self):
+        # sqlite3 connections must not be shared across threads, nor with a forked child
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def close(self):
+        """Close this thread's connection, e.g. in a server master before it forks workers"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            conn.close()
+        self._local.conn = None
+
+    def _load_index(self):
+        # Caller must hold the lock; the in-memory index makes lookups a dict access
+        if self._index is not None and self.refresh_seconds and \
+                time.monotonic() - self._loaded_at > self.refresh_seconds:
+            self._index = None
+        if self._index is None:
+            self._loaded_at = time.monotonic()
+            self._index = {}
+            rows = self._connect().execute(
+                "SELECT role, bucket, topic, question, explanation FROM questions"
+            )
+            for role, bucket, topic, question, explanation in rows:
+                self._index.setdefault((role, bucket, topic), []).append(
+                    {"question": question, "explanation": explanation}
+                )
+        return self._index
+
+    def reload(self):
+        """Drop the in-memory index so the next lookup re-reads the database"""
+        with self._lock:
+            self._index = None
+
+    def add(self, target_role, years_experience, topics, questions):
+        """Store validated questions under the request's key; returns how many were new"""
+        key = bank_key(target_role, years_experience, topics)
+        rows = []
+        for item in questions:
+            normalized = " ".join(item["question"].lower().split())
+            question_hash = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+            rows.append((*key, question_hash, item["question"], item["explanation"]))
+
+        conn = self._connect()
+        added = []
+        for row in rows:
+            cursor = conn.execute("INSERT OR IGNORE INTO questions VALUES (?, ?, ?, ?, ?, ?)", row)
+            if cursor.rowcount:
+                added.append({"question": row[4], "explanation": row[5]})
+        conn.commit()
+
+        # Keep a loaded index in step instead of re-reading the whole table
+        with self._lock:
+            if self._index is not None and added:
+                self._index.setdefault(key, []).extend(added)
+        return len(added)
+
+    def count(self, target_role, years_experience, topics):
+        key = bank_key(target_role, years_experience, topics)
+        with self._lock:
+            return len(self._load_index().get(key, []))
+
+    def assemble(self, target_role, years_experience, topics, count=10):
+        """Return `count` questions for the key in random order, or None if the bank is short"""
+        key = bank_key(target_role, years_experience, topics)
+        with self._lock:
+            candidates = self._load_index().get(key, [])
+            if len(candidates) < count:
+                self.misses += 1
+                return None
+            self.hits += 1
+            chosen = random.sample(candidates, count)
+        return [dict(item) for item in chosen]
+
+    def stats(self):
+        with self._lock:
+            index = self._load_index()
+            return {
+                "keys": len(index),
+                "questions": sum(len(items) for items in index.values()),
+                "hits": self.hits,
+                "misses": self.misses
+            }
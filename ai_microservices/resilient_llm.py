@@ -0,0 +1,402 @@
+import asyncio
+import queue
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+
+class LLMServiceError(Exception):
+    """The model could not be called; carries the HTTP status and Retry-After to report"""
+
+    status = 503
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class LLMTimeoutError(LLMServiceError):
+    status = 504
+
+
+class RateLimitedError(LLMServiceError):
+    status = 429
+
+
+class CircuitOpenError(LLMServiceError):
+    status = 503
+
+
+_RATE_LIMIT_RE = re.compile(
+    r"\b429\b|resource_?exhausted|too many requests|rate[ _-]?limit(?:ed|ing)?\b|"
+    r"quota (?:exceeded|exhausted)|exceeded (?:your |the )?(?:current )?quota",
+    re.IGNORECASE
+)
+_TRANSIENT_RE = re.compile(
+    r"\b(500|502|503|504)\b|unavailable|internal ?server|deadline|time(d)? ?out|connection|temporar",
+    re.IGNORECASE
+)
+_RETRY_HINT_RE = re.compile(r"retry(?:[ _-]?(?:in|after|delay))?[^0-9]{0,20}(\d+(?:\.\d+)?)\s*s", re.IGNORECASE)
+
+
+def is_rate_limit_error(error):
+    """True for provider quota errors (HTTP 429 / RESOURCE_EXHAUSTED)"""
+    return bool(_RATE_LIMIT_RE.search(f"{type(error).__name__} {error}"))
+
+
+def is_retryable_error(error):
+    """True for failures worth retrying: timeouts, rate limits, connection and 5xx errors"""
+    if isinstance(error, (LLMTimeoutError, TimeoutError, ConnectionError, FutureTimeoutError, asyncio.TimeoutError)):
+        return True
+    if is_rate_limit_error(error):
+        return True
+    return bool(_TRANSIENT_RE.search(f"{type(error).__name__} {error}"))
+
+
+def retry_hint(error):
+    """Seconds the provider asked us to wait, if the error message says so"""
+    match = _RETRY_HINT_RE.search(str(error))
+    return float(match.group(1)) if match else None
+
+
+class TokenBucket:
+    """Token-bucket rate limiter shared by threads and coroutines"""
+
+    def __init__(self, rate_per_minute, burst=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(burst or max(1, int(rate_per_minute // 6)))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waits = 0
+        self.rejected = 0
+
+    def reserve(self, max_wait):
+        """Take a token; returns seconds to wait before using it, or None if that exceeds max_wait"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            wait = (1 - self._tokens) / self.rate
+            if wait > max_wait:
+                self.rejected += 1
+                return None
+            # Going negative queues callers in arrival order without polling
+            self._tokens -= 1
+            self.waits += 1
+            return wait
+
+    def stats(self):
+        with self._lock:
+            return {
+                "ratePerMinute": round(self.rate * 60, 1),
+                "burst": self.capacity,
+                "available": round(min(self.capacity, self._tokens + (time.monotonic() - self._updated) * self.rate), 2),
+                "waits": self.waits,
+                "rejected": self.rejected
+            }
+
+
+class CircuitBreaker:
+    """Fail fast after consecutive provider failures, probing again after reset_seconds"""
+
+    def __init__(self, failure_threshold=5, reset_seconds=30):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.opens = 0
+        self.rejected = 0
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go through"""
+        with self._lock:
+            if self.state == "closed":
+                return
+            remaining = self._opened_at + self.reset_seconds - time.monotonic()
+            if remaining <= 0 and not self._probing:
+                # Half-open: let exactly one probe through
+                self.state = "half_open"
+                self._probing = True
+                return
+            self.rejected += 1
+            raise CircuitOpenError(
+                "The AI provider is unavailable, please retry shortly",
+                retry_after=max(1, round(remaining))
+            )
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.opens += 1
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def release_probe(self):
+        # A probe that ended in a non-provider error decides nothing
+        with self._lock:
+            if self.state == "half_open":
+                self.state = "open"
+                self._probing = False
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutiveFailures": self._failures,
+                "opens": self.opens,
+                "rejected": self.rejected
+            }
+
+
+_DONE = object()
+
+
+class ResilientLLM:
+    """Chat model wrapper adding deadlines, jittered retries, rate limiting and a circuit breaker.
+
+    Exposes the invoke/ainvoke/stream/astream surface the services use, so it
+    can wrap ChatGoogleGenerativeAI or fake_llm.FakeLLM interchangeably.
+    timeout bounds the whole call, retries and backoff included; a retry is only
+    attempted while time remains. Streams are retried only until their first
+    chunk has been yielded.
+    """
+
+    def __init__(self, model, timeout=60.0, max_retries=3, backoff_base=0.5, backoff_max=8.0,
+                 rate_limiter=None, rate_limit_max_wait=10.0, circuit_breaker=None, max_workers=16):
+        self.wrapped = model
+        self.model = getattr(model, "model", type(model).__name__)
+        self.temperature = getattr(model, "temperature", None)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.rate_limiter = rate_limiter
+        self.rate_limit_max_wait = rate_limit_max_wait
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        # Blocking calls run here so a hung request times out without holding the caller
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-call")
+        self._running = 0
+        self._lock = threading.Lock()
+        self._counters = {
+            "calls": 0,
+            "successes": 0,
+            "failures": 0,
+            "retries": 0,
+            "timeouts": 0,
+            "providerRateLimits": 0,
+            "busyRejections": 0
+        }
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def _backoff(self, attempt, error):
+        # Full jitter keeps retrying workers from hitting the provider in lockstep
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        hint = retry_hint(error) if is_rate_limit_error(error) else None
+        return min(self.backoff_max, max(delay, hint or 0))
+
+    def _deadline(self):
+        return time.monotonic() + self.timeout
+
+    def _admit(self, deadline):
+        """Circuit check plus rate-limit reservation; returns seconds to wait"""
+        if deadline - time.monotonic() <= 0:
+            raise self._timeout_error()
+        self.circuit_breaker.before_call()
+        if self.rate_limiter is None:
+            return 0.0
+        wait = self.rate_limiter.reserve(min(self.rate_limit_max_wait, deadline - time.monotonic()))
+        if wait is None:
+            # The reserved probe slot (if any) was not used
+            self.circuit_breaker.release_probe()
+            raise RateLimitedError("AI request quota reached, please retry shortly", retry_after=1)
+        return wait
+
+    def _submit(self, fn, *args, **kwargs):
+        """Run fn on the call pool, failing fast when every worker is taken (e.g. by hung calls)"""
+        with self._lock:
+            if self._running >= self.max_workers:
+                self._counters["busyRejections"] += 1
+                busy = True
+            else:
+                self._running += 1
+                busy = False
+        if busy:
+            self.circuit_breaker.release_probe()
+            raise LLMServiceError("The AI service is busy, please retry shortly", retry_after=1)
+        future = self._executor.submit(fn, *args, **kwargs)
+        future.add_done_callback(self._release_worker)
+        return future
+
+    def _release_worker(self, future):
+        with self._lock:
+            self._running -= 1
+
+    def _on_error(self, error, attempt, deadline):
+        """Record a failed attempt; returns the backoff before retrying, or re-raises"""
+        if isinstance(error, LLMTimeoutError):
+            self._count("timeouts")
+        rate_limited = is_rate_limit_error(error)
+        if rate_limited:
+            # Throttling says the provider is up: it must not open the circuit for everyone
+            self._count("providerRateLimits")
+            self.circuit_breaker.release_probe()
+        elif is_retryable_error(error):
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.release_probe()
+
+        backoff = self._backoff(attempt, error)
+        out_of_time = time.monotonic() + backoff >= deadline
+        if not is_retryable_error(error) or attempt >= self.max_retries or out_of_time:
+            self._count("failures")
+            if isinstance(error, LLMServiceError):
+                raise error
+            if is_rate_limit_error(error):
+                raise RateLimitedError(
+                    "The AI provider is rate limiting requests, please retry shortly",
+                    retry_after=max(1, round(retry_hint(error) or 1))
+                ) from error
+            raise error
+        self._count("retries")
+        return backoff
+
+    def _on_success(self):
+        self.circuit_breaker.record_success()
+        self._count("successes")
+
+    def _timeout_error(self):
+        return LLMTimeoutError(f"AI request timed out after {self.timeout:g}s", retry_after=1)
+
+    def invoke(self, messages, **kwargs):
+        self._count("calls")
+        deadline = self._deadline()
+        for attempt in range(self.max_retries + 1):
+            time.sleep(self._admit(deadline))
+            future = self._submit(self.wrapped.invoke, messages, **kwargs)
+            try:
+                result = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                future.cancel()
+                time.sleep(self._on_error(self._timeout_error(), attempt, deadline))
+                continue
+            except Exception as e:
+                time.sleep(self._on_error(e, attempt, deadline))
+                continue
+            self._on_success()
+            return result
+
+    async def ainvoke(self, messages, **kwargs):
+        self._count("calls")
+        deadline = self._deadline()
+        for attempt in range(self.max_retries + 1):
+            await asyncio.sleep(self._admit(deadline))
+            try:
+                result = await asyncio.wait_for(
+                    self.wrapped.ainvoke(messages, **kwargs), max(0.0, deadline - time.monotonic())
+                )
+            except asyncio.TimeoutError:
+                await asyncio.sleep(self._on_error(self._timeout_error(), attempt, deadline))
+                continue
+            except Exception as e:
+                await asyncio.sleep(self._on_error(e, attempt, deadline))
+                continue
+            self._on_success()
+            return result
+
+    def _pump(self, messages, kwargs, chunks, cancelled):
+        # Worker thread: move chunks from the blocking stream into a queue
+        try:
+            for chunk in self.wrapped.stream(messages, **kwargs):
+                if cancelled.is_set():
+                    return
+                chunks.put(chunk)
+            chunks.put(_DONE)
+        except Exception as e:
+            chunks.put(e)
+
+    def stream(self, messages, **kwargs):
+        self._count("calls")
+        deadline = self._deadline()
+        for attempt in range(self.max_retries + 1):
+            time.sleep(self._admit(deadline))
+            chunks, cancelled = queue.Queue(), threading.Event()
+            self._submit(self._pump, messages, kwargs, chunks, cancelled)
+            started_output = False
+            try:
+                while True:
+                    try:
+                        item = chunks.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        raise self._timeout_error()
+                    if item is _DONE:
+                        break
+                    if isinstance(item, Exception):
+                        raise item
+                    started_output = True
+                    yield item
+            except Exception as e:
+                cancelled.set()
+                # Once chunks have reached the caller the stream cannot be replayed
+                time.sleep(self._on_error(e, self.max_retries if started_output else attempt, deadline))
+                continue
+            finally:
+                cancelled.set()
+            self._on_success()
+            return
+
+    async def astream(self, messages, **kwargs):
+        self._count("calls")
+        deadline = self._deadline()
+        for attempt in range(self.max_retries + 1):
+            await asyncio.sleep(self._admit(deadline))
+            iterator = self.wrapped.astream(messages, **kwargs).__aiter__()
+            started_output = False
+            try:
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(iterator.__anext__(), max(0.0, deadline - time.monotonic()))
+                    except StopAsyncIteration:
+                        break
+                    except asyncio.TimeoutError:
+                        raise self._timeout_error()
+                    started_output = True
+                    yield chunk
+            except Exception as e:
+                await asyncio.sleep(self._on_error(e, self.max_retries if started_output else attempt, deadline))
+                continue
+            self._on_success()
+            return
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            **counters,
+            "runningCalls": self._running,
+            "timeoutSeconds": self.timeout,
+            "maxRetries": self.max_retries,
+            "circuitBreaker": self.circuit_breaker.stats(),
+            "rateLimiter": self.rate_limiter.stats() if self.rate_limiter else None
+        }
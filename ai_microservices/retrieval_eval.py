@@ -0,0 +1,277 @@
+"""Offline evaluation of company research retrieval.
+
+Ingests a small fixed set of company pages through the service's own chunking
+and storage (ChromaDB disabled, local index in a temporary directory), asks
+each eval question and checks whether the passage holding the answer reached
+the prompt context. The same questions are also run through the previous
+pipeline (blank-line chunks, top 3 by vector similarity) as a baseline:
+
+    python retrieval_eval.py
+    python retrieval_eval.py --top-k 3 --context-tokens 400 --alpha 0.3 --output eval.json
+
+Reports answer recall (gold passage present in the prompt context), MRR of the
+first ranked chunk holding it, and mean prompt tokens with the reduction over
+the baseline.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+
+COMPANY_PAGES = {
+    "Northwind Analytics": """
+Northwind Analytics builds forecasting software for grocery and retail chains. The company was founded in 2012 in Minneapolis and now employs about 1,400 people across offices in Minneapolis, Toronto and Lisbon. Its flagship product, Northwind Forecast, predicts store-level demand for fresh produce and is used by more than 300 retail brands.
+
+About the Company:
+Northwind started as a consulting shop that helped regional grocers reduce spoilage. The founders turned their models into a hosted product in 2015 and raised a Series C round of $120 million in 2021 led by Meridian Capital. Revenue grew 38% year over year in the last fiscal year, and the company reports that customers cut fresh-food waste by an average of 22% in their first year.
+
+Engineering:
+The platform runs on Kubernetes in AWS, with most services written in Python and Go. Forecast models are trained nightly with Spark on a lakehouse built on Delta Lake, and feature pipelines are orchestrated with Airflow. The data platform team is migrating batch jobs to streaming ingestion with Kafka so forecasts can be refreshed every fifteen minutes. Engineers own their services in production and participate in a follow-the-sun on-call rotation shared between Minneapolis and Lisbon.
+
+Culture and Values:
+Northwind describes its culture as "calm urgency". Teams plan in six-week cycles followed by a two-week cooldown for cleanup, learning and experiments. Written proposals are preferred over meetings, and every engineering decision that affects more than one team goes through a lightweight RFC. The company offers a $2,000 yearly learning budget and a four-day work week in July and August.
+
+Benefits:
+Employees get fully paid health, dental and vision coverage, a 6% 401(k) match in the US, sixteen weeks of paid parental leave for all parents and a home-office stipend of $1,500. Remote work is supported across the US, Canada and Portugal, with quarterly in-person weeks at the nearest office.
+
+Recent News:
+In March the company launched Northwind Shelf, a computer vision product that detects empty shelves from in-store cameras. It also announced a partnership with FreshMart to roll out automated ordering in 900 stores. In September Northwind opened a new engineering hub in Lisbon focused on machine learning infrastructure.
+
+Interview Process:
+The process has four stages: a recruiter call, a take-home exercise based on a simplified demand forecasting dataset, a virtual onsite with a system design interview and a pairing session, and a final values conversation with a director. Candidates are told to expect questions about handling missing data and seasonality. The whole process usually takes three weeks, and candidates receive written feedback after the take-home.
+""",
+    "Helios Energy Systems": """
+Helios Energy Systems designs battery storage and grid software for utilities and commercial solar farms. Headquartered in Austin, Texas, Helios has around 2,800 employees and manufacturing sites in Nevada and Poland.
+
+Company Overview:
+Helios was spun out of a university research lab in 2009. Its hardware line includes the HeliosStack modular battery and the GridPilot controller, and its software platform, Helios Orchestrator, schedules charging and discharging across thousands of sites to follow wholesale electricity prices. Utilities in eleven countries use the platform, and the company manages more than 9 gigawatt-hours of storage capacity.
+
+Technology:
+Helios Orchestrator is built as an event-driven system on Azure, using Rust for the real-time dispatch engine and TypeScript with React for operator dashboards. Telemetry from field devices is ingested through MQTT into a time-series database built on TimescaleDB. The optimization team uses mixed-integer programming with Gurobi to plan battery dispatch a day ahead, and reinforcement learning experiments are under way for intraday trading.
+
+Working at Helios:
+Helios emphasizes safety first: every engineer completes electrical safety training in their first month, including software staff who visit sites. Teams are cross-functional, pairing firmware, cloud and field engineers. The company runs an internal "energy academy" with courses on power markets, and engineers rotate through a week at a manufacturing site during onboarding.
+
+Compensation and Benefits:
+Helios offers equity to all full-time employees, an annual bonus tied to deployed storage capacity, 25 days of paid time off, and a relocation package for roles in Austin and Reno. Hybrid work is the default, with three office days per week for hardware teams and two for software teams.
+
+Latest Developments:
+This year Helios signed a 2 gigawatt-hour supply agreement with Lone Star Power, the largest contract in its history. The company also opened a recycling line in Poland that recovers lithium and cobalt from retired battery packs. Its CEO, Maria Okafor, announced plans for an initial public offering within the next eighteen months.
+
+Hiring and Interviews:
+Software candidates go through a phone screen, a live coding interview in the language of their choice, a systems interview focused on reliability of distributed control systems, and a behavioral round on safety culture and ownership. Interviewers look for candidates who can reason about failure modes, such as what happens when a site loses connectivity mid-dispatch. Offers are typically made within ten business days of the final round.
+""",
+    "Lumen Health": """
+Lumen Health is a digital health company that provides virtual physical therapy. Patients follow guided exercise programs in a mobile app while licensed therapists monitor progress remotely. Lumen is based in Boston and has roughly 650 employees, about a third of whom are clinicians.
+
+Mission and Story:
+Lumen was founded in 2016 by a physical therapist and a former fitness app engineer who wanted to make rehabilitation accessible to patients in rural areas. The company works with employers and health plans, which cover the program for their members. Lumen reports that 68% of patients with chronic back pain reach their recovery goals within twelve weeks.
+
+Product and Engineering:
+The mobile apps are written in Swift and Kotlin, and the backend is a set of Java and Kotlin services on Google Cloud. Lumen uses on-device pose estimation models to give real-time feedback on exercise form without sending video to the cloud, which keeps patient data private. Clinical data is stored in a HIPAA-compliant data warehouse in BigQuery, and the data science team builds models that predict which patients are at risk of dropping out of their program.
+
+Culture:
+Lumen's values are "patients first", "evidence over opinion" and "kind candor". Product decisions are validated with clinical trials and A/B tests, and engineers regularly shadow therapist sessions to understand patient needs. The company holds a monthly "clinic day" where every employee reviews anonymized patient feedback.
+
+Perks and Benefits:
+Lumen offers comprehensive health coverage, a free Lumen program for employees and their families, a $100 monthly wellness stipend, twenty days of vacation plus a winter shutdown between Christmas and New Year, and fully remote work within the United States.
+
+News:
+Lumen recently received FDA clearance for its pose-estimation feedback feature as a software medical device. It expanded its coverage to two national health plans, adding access for 4 million members, and launched a pelvic health program for postpartum patients.
+
+Interview Tips:
+Lumen interviews include a conversation about a product you care about, a technical interview with practical debugging of a small service, and a collaboration round with a clinician and an engineer. Candidates are encouraged to show empathy for patients and to discuss how they would measure the clinical impact of a feature. Familiarity with healthcare privacy rules such as HIPAA is a plus but not required.
+""",
+    # Scraped the way real pages arrive: one line per element, no blank lines
+    "Corvid Robotics": "\n".join([
+        "Home | Products | Careers | Newsroom | Contact",
+        "Corvid Robotics builds autonomous mobile robots for warehouses and hospital logistics.",
+        "Founded in 2014 in Pittsburgh, Corvid has deployed more than 6,000 robots in 19 countries.",
+        "Careers at Corvid",
+        "We are hiring across robotics software, perception, fleet management, hardware and customer success.",
+        "Our robotics software is written in C++ and ROS 2, with fleet management services in Go running on Google Cloud.",
+        "The perception team trains obstacle detection models with PyTorch and deploys them to NVIDIA Jetson modules on every robot.",
+        "Simulation is central to how we work: every change to navigation code runs through 10,000 simulated warehouse hours before it reaches a customer site.",
+        "Life at Corvid",
+        "Teams are small and own a capability end to end, from the algorithm to the dashboards customers use.",
+        "We host a quarterly robot olympics where teams compete on navigation challenges in our test warehouse.",
+        "Engineers spend their first two weeks at a customer site alongside field technicians.",
+        "Benefits include a 401(k) match of 5%, stock options for every employee, twelve weeks of paid parental leave and an annual commuter stipend.",
+        "Corvid offers hybrid work with two office days per week in Pittsburgh, Boston or Eindhoven.",
+        "Newsroom",
+        "Corvid raised a $210 million Series D led by Atlas Ventures to expand manufacturing in Eindhoven.",
+        "The company unveiled the Corvid Lift, a robot that moves pallets of up to 1,500 kilograms.",
+        "Corvid partnered with St. Anne Health to deliver medication and lab samples between hospital wards.",
+        "How we hire",
+        "Our process starts with a call with a recruiter and a technical screen on data structures and geometry.",
+        "The onsite includes a robotics systems design interview where you design a fleet traffic manager for 200 robots, a coding interview in C++ or Python, and a conversation about collaboration with field teams.",
+        "We look for engineers who test their assumptions with data and can explain trade-offs between safety and throughput.",
+        "Most candidates hear back within a week of their onsite.",
+        "Footer: Privacy policy | Terms of use | Cookie settings | Accessibility statement",
+        "Copyright 2024 Corvid Robotics. All rights reserved.",
+    ]),
+}
+
+# Each question's answer is in the gold passage; recall checks it reached the context
+EVAL_QUESTIONS = [
+    ("Northwind Analytics", "What does the interview process look like?", "take-home exercise based on a simplified demand forecasting dataset"),
+    ("Northwind Analytics", "What technologies does the engineering team use?", "Python and Go"),
+    ("Northwind Analytics", "How much parental leave do employees get?", "sixteen weeks of paid parental leave"),
+    ("Northwind Analytics", "What products did they launch recently?", "Northwind Shelf"),
+    ("Northwind Analytics", "How do teams plan their work?", "six-week cycles"),
+    ("Helios Energy Systems", "Which programming languages does Helios use?", "Rust for the real-time dispatch engine"),
+    ("Helios Energy Systems", "What should I expect in the systems interview?", "reliability of distributed control systems"),
+    ("Helios Energy Systems", "Is the company planning to go public?", "initial public offering"),
+    ("Helios Energy Systems", "What is the remote work policy?", "three office days per week"),
+    ("Helios Energy Systems", "How do they handle battery recycling?", "recovers lithium and cobalt"),
+    ("Lumen Health", "What are the company values?", "kind candor"),
+    ("Lumen Health", "How does the app protect patient privacy?", "without sending video to the cloud"),
+    ("Lumen Health", "What interview rounds are there?", "collaboration round with a clinician"),
+    ("Lumen Health", "What cloud provider does Lumen run on?", "Google Cloud"),
+    ("Lumen Health", "How much vacation do employees get?", "twenty days of vacation"),
+    ("Corvid Robotics", "What is asked in the system design interview?", "fleet traffic manager for 200 robots"),
+    ("Corvid Robotics", "What languages does the robotics software use?", "C++ and ROS 2"),
+    ("Corvid Robotics", "How much funding has Corvid raised?", "$210 million Series D"),
+    ("Corvid Robotics", "What is the hybrid work policy?", "two office days per week"),
+    ("Corvid Robotics", "How are navigation changes tested?", "10,000 simulated warehouse hours"),
+]
+
+
+def configure_environment(data_dir, args):
+    """Isolate the service in a temporary directory before it is imported"""
+    os.environ.update({
+        "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY") or "eval-placeholder",
+        "CHROMA_ENABLED": "false",
+        "WARMUP_ON_START": "false",
+        "JOB_QUEUE_ENABLED": "false",
+        "COMPANY_STORE_PATH": os.path.join(data_dir, "company_store.sqlite3"),
+        "LOCAL_INDEX_DIR": os.path.join(data_dir, "vector_index"),
+    })
+    overrides = {
+        "RETRIEVAL_TOP_K": args.top_k,
+        "RETRIEVAL_CONTEXT_TOKENS": args.context_tokens,
+        "RETRIEVAL_HYBRID_ALPHA": args.alpha,
+        "RETRIEVAL_CHUNK_TOKENS": args.chunk_tokens,
+    }
+    os.environ.update({name: str(value) for name, value in overrides.items() if value is not None})
+
+
+def contains(text, gold):
+    return gold.lower() in " ".join(text.split()).lower()
+
+
+def baseline_context(index, company_name, question):
+    """The previous pipeline: top 3 blank-line chunks by vector similarity"""
+    from company_store import company_key
+    results = index.query(question, where={"company": company_key(company_name)}, n_results=3)
+    return results["documents"][0]
+
+
+def evaluate(args):
+    data_dir = tempfile.mkdtemp(prefix="ai-retrieval-eval-")
+    configure_environment(data_dir, args)
+
+    import services
+    from company_retrieval import hybrid_rank
+    from company_store import company_key
+    from llm_text import estimate_tokens
+    from vector_index import HashingEmbedder, LocalVectorIndex
+
+    baseline_index = LocalVectorIndex(embedder=HashingEmbedder(dim=int(os.getenv("LOCAL_INDEX_DIM", 1024))))
+    chunk_counts = {}
+    for company_name, page in COMPANY_PAGES.items():
+        services.store_company_info_in_vector_db(company_name, page)
+        chunk_counts[company_name] = len(services.split_company_chunks(page))
+        key = company_key(company_name)
+        paragraphs = [chunk.strip() for chunk in page.split("\n\n") if chunk.strip()]
+        baseline_index.add(
+            paragraphs,
+            [{"company": key} for _ in paragraphs],
+            [f"{key}_{i}" for i in range(len(paragraphs))]
+        )
+
+    def prompt_tokens(company_name, question, context):
+        return estimate_tokens(services.COMPANY_RESEARCH_PROMPT.format(
+            context=context, question=question, company_name=company_name
+        ))
+
+    rows = []
+    for company_name, question, gold in EVAL_QUESTIONS:
+        report = {}
+        context = services.retrieve_company_context(company_name, question, report)
+        documents, _, similarity_lists = services._company_candidates(company_name, [question])
+        order, _ = hybrid_rank(question, documents, similarity_lists[0], services.RETRIEVAL_HYBRID_ALPHA)
+        rank = next((rank for rank, index in enumerate(order, start=1) if contains(documents[index], gold)), None)
+        chunks = baseline_context(baseline_index, company_name, question)
+        baseline_rank = next((rank for rank, chunk in enumerate(chunks, start=1) if contains(chunk, gold)), None)
+        rows.append({
+            "company": company_name,
+            "question": question,
+            "hit": contains(context, gold),
+            "reciprocalRank": 1.0 / rank if rank else 0.0,
+            "promptTokens": prompt_tokens(company_name, question, context),
+            "selectedChunks": report.get("selected", 0),
+            "baselineHit": baseline_rank is not None,
+            "baselineReciprocalRank": 1.0 / baseline_rank if baseline_rank else 0.0,
+            "baselinePromptTokens": prompt_tokens(company_name, question, "\n".join(chunks)),
+        })
+
+    tokens = statistics.mean(row["promptTokens"] for row in rows)
+    baseline_tokens = statistics.mean(row["baselinePromptTokens"] for row in rows)
+    return {
+        "settings": {
+            "chunkTokens": services.RETRIEVAL_CHUNK_TOKENS,
+            "overlapTokens": services.RETRIEVAL_CHUNK_OVERLAP_TOKENS,
+            "topK": services.RETRIEVAL_TOP_K,
+            "contextTokens": services.RETRIEVAL_CONTEXT_TOKENS,
+            "alpha": services.RETRIEVAL_HYBRID_ALPHA,
+        },
+        "chunks": chunk_counts,
+        "summary": {
+            "questions": len(rows),
+            "recall": round(sum(row["hit"] for row in rows) / len(rows), 3),
+            "mrr": round(statistics.mean(row["reciprocalRank"] for row in rows), 3),
+            "meanPromptTokens": round(tokens, 1),
+            "baselineRecall": round(sum(row["baselineHit"] for row in rows) / len(rows), 3),
+            "baselineMRR": round(statistics.mean(row["baselineReciprocalRank"] for row in rows), 3),
+            "baselineMeanPromptTokens": round(baseline_tokens, 1),
+            "promptTokenReduction": round(1 - tokens / baseline_tokens, 3),
+        },
+        "questions": rows,
+    }
+
+
+def print_report(report):
+    for row in report["questions"]:
+        print(f"{'hit ' if row['hit'] else 'MISS'} {row['promptTokens']:5d} tok "
+              f"(baseline {'hit ' if row['baselineHit'] else 'MISS'} {row['baselinePromptTokens']:5d} tok)  "
+              f"{row['company']}: {row['question']}", file=sys.stderr)
+    summary = report["summary"]
+    print(f"\nrecall {summary['recall']:.0%} (MRR {summary['mrr']:.2f}) at "
+          f"{summary['meanPromptTokens']:.0f} prompt tokens; "
+          f"baseline recall {summary['baselineRecall']:.0%} (MRR {summary['baselineMRR']:.2f}) at "
+          f"{summary['baselineMeanPromptTokens']:.0f} tokens; "
+          f"{-summary['promptTokenReduction']:+.0%} prompt tokens vs baseline", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top-k", type=int, help="override RETRIEVAL_TOP_K")
+    parser.add_argument("--context-tokens", type=int, help="override RETRIEVAL_CONTEXT_TOKENS")
+    parser.add_argument("--alpha", type=float, help="override RETRIEVAL_HYBRID_ALPHA")
+    parser.add_argument("--chunk-tokens", type=int, help="override RETRIEVAL_CHUNK_TOKENS")
+    parser.add_argument("--output", help="write the full report JSON to this file")
+    args = parser.parse_args()
+
+    report = evaluate(args)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,35 @@
-from flask import Flask, request, jsonify
+import time
+_module_import_started = time.perf_counter()
+
+from flask import Flask, request, jsonify, Response, stream_with_context, g
 from flask_cors import CORS
 from dotenv import load_dotenv
+import importlib
 import os
 import sys
-import fitz
+import io
 import json
-from langchain_google_genai import ChatGoogleGenerativeAI
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from werkzeug.datastructures import MultiDict
 from langchain_core.prompts import PromptTemplate, ChatPromptTemplate
 from langchain_core.messages import HumanMessage
-import requests
-from bs4 import BeautifulSoup
+from pdf_cache import PDFTextCache
+from pdf_extraction import PDFExtractor, PDFLimitError, read_upload
+from llm_cache import create_llm_cache, make_cache_key
+from single_flight import SingleFlight, flight_key
+import metrics
+from metrics import record_llm_io, stage
+from resilient_llm import CircuitBreaker, LLMServiceError, ResilientLLM, TokenBucket
+from job_queue import PRIORITIES, JobQueue, QueueFullError, parse_priority
+from company_retrieval import assemble_context, chunk_text, select_chunks, tokenize_documents
+from company_store import CompanyStore, company_key, content_hash
+from keyword_scorer import format_score, score_context, score_resume
+from interview_questions import GenerationCostTracker, QuestionGenerator
+from llm_text import estimate_tokens, message_text
+from question_bank import QuestionBank
+from text_compaction import CompactionTracker, compact_job_description, compact_resume
 
 # Windows SQLite fix for ChromaDB
 def fix_sqlite_windows():
@@ -45,6 +65,20 @@ def init_chromadb():
         from chromadb.config import Settings
 
         # Strategy 2: Try different client configurations
+        persist_dir = os.getenv("CHROMA_PERSIST_DIR", "chroma_data")
+        if persist_dir:
+            try:
+                # Persistent client so ingested companies survive restarts
+                chroma_client = chromadb.PersistentClient(
+                    path=persist_dir,
+                    settings=Settings(anonymized_telemetry=False)
+                )
+                CHROMA_AVAILABLE = True
+                print(f"ChromaDB initialized successfully (persistent mode: {persist_dir})")
+                return True
+            except Exception as e:
+                print(f"ChromaDB persistent client failed: {e}, trying in-memory")
+
         try:
             # For deployment environments (like Render)
             chroma_client = chromadb.Client(Settings(
@@ -78,10 +112,36 @@ def init_chromadb():
 # Load environment variables
 load_dotenv()
 
+# Several server processes (gunicorn workers) share caches and stores through
+# local files instead of process memory; see gunicorn.conf.py
+MULTIPROCESS_MODE = os.getenv("MULTIPROCESS_MODE", "false").lower() == "true"
+
+def shared_default(name, single_process_value, multiprocess_value):
+    """Read a setting whose default depends on MULTIPROCESS_MODE; warns when an explicit
+    value keeps per-process state under several workers"""
+    value = os.getenv(name, multiprocess_value if MULTIPROCESS_MODE else single_process_value)
+    if MULTIPROCESS_MODE and value.lower() == single_process_value.lower():
+        print(f"Warning: {name}={value!r} is not shared between worker processes "
+              f"(multi-process default: {multiprocess_value!r})")
+    return value
+
 # Initialize Flask app
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    """Count the request and observe its latency under the route pattern (bounded label values)"""
+    started = g.get("request_started")
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        metrics.observe_request(route, request.method, response.status_code, time.perf_counter() - started)
+    return response
+
 # Configure LangChain with Google Generative AI
 api_key = os.getenv("GOOGLE_API_KEY")
 if not api_key:
@@ -89,27 +149,189 @@ if not api_key:
 
 
 
-# Initialize LangChain model with proper configuration
-try:
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-1.5-flash",
-        google_api_key=api_key,
-        temperature=0.7
+# Heavy components (Gemini client, ChromaDB, PyMuPDF, local index) are created
+# on first use, or ahead of time by the optional warm-up thread, so the app can
+# answer /api/health as soon as Flask is up
+_components = {}
+_component_locks = {}
+_components_lock = threading.Lock()
+component_init_timings = {}
+
+def lazy_component(name, factory):
+    """Return a named component, creating it exactly once (thread-safe) on first use"""
+    if name in _components:
+        return _components[name]
+    with _components_lock:
+        lock = _component_locks.setdefault(name, threading.Lock())
+    with lock:
+        if name not in _components:
+            started = time.perf_counter()
+            _components[name] = factory()
+            component_init_timings[name] = round((time.perf_counter() - started) * 1000, 1)
+    return _components[name]
+
+# LangChain model, created by get_llm() unless replaced with set_llm()
+llm = None
+
+# Deadlines, retries, rate limiting and circuit breaking for every model call
+LLM_RESILIENCE_ENABLED = os.getenv("LLM_RESILIENCE_ENABLED", "true").lower() == "true"
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", 60))
+
+def wrap_llm(model):
+    """Wrap a chat model in ResilientLLM configured from the environment"""
+    if not LLM_RESILIENCE_ENABLED:
+        return model
+    rate_per_minute = float(os.getenv("LLM_RATE_LIMIT_PER_MINUTE", 0))
+    return ResilientLLM(
+        model,
+        timeout=LLM_TIMEOUT_SECONDS,
+        max_retries=int(os.getenv("LLM_MAX_RETRIES", 3)),
+        backoff_base=float(os.getenv("LLM_BACKOFF_BASE_SECONDS", 0.5)),
+        backoff_max=float(os.getenv("LLM_BACKOFF_MAX_SECONDS", 8)),
+        rate_limiter=TokenBucket(
+            rate_per_minute,
+            burst=int(os.getenv("LLM_RATE_LIMIT_BURST") or 0) or None
+        ) if rate_per_minute > 0 else None,
+        rate_limit_max_wait=float(os.getenv("LLM_RATE_LIMIT_MAX_WAIT_SECONDS", 10)),
+        circuit_breaker=CircuitBreaker(
+            failure_threshold=int(os.getenv("LLM_CIRCUIT_FAILURE_THRESHOLD", 5)),
+            reset_seconds=float(os.getenv("LLM_CIRCUIT_RESET_SECONDS", 30))
+        ),
+        max_workers=int(os.getenv("LLM_CALL_WORKERS", 64))
     )
 
+def llm_error_response(error):
+    """JSON error for an LLMServiceError, with Retry-After when the wait is known"""
+    response = jsonify({"error": str(error)})
+    response.status_code = error.status
+    if error.retry_after:
+        response.headers["Retry-After"] = str(error.retry_after)
+    return response
 
-except Exception as e:
-    print(f"Error with LangChain model: {e}")
-    raise
-
-# Initialize ChromaDB with fallback strategies
-if not init_chromadb():
-    print("Using in-memory fallback for vector storage")
-    CHROMA_AVAILABLE = False
-    chroma_client = None
+def create_llm():
+    """Initialize LangChain model with proper configuration"""
+    try:
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        return ChatGoogleGenerativeAI(
+            model="gemini-1.5-flash",
+            google_api_key=api_key,
+            temperature=0.7,
+            timeout=LLM_TIMEOUT_SECONDS,
+            # 1 disables the SDK's own retries; ResilientLLM retries with backoff instead
+            max_retries=1
+        )
+    except Exception as e:
+        print(f"Error with LangChain model: {e}")
+        raise
+
+def get_llm():
+    """Return the chat model, creating the Gemini client on first use"""
+    global llm
+    if llm is None:
+        llm = lazy_component("llm", lambda: wrap_llm(create_llm()))
+    return llm
+
+def _create_chroma_client():
+    if MULTIPROCESS_MODE:
+        # The embedded client is not safe with several processes writing one directory
+        print("ChromaDB is not used in multi-process mode, using local vector index")
+        return None
+    if os.getenv("CHROMA_ENABLED", "true").lower() != "true":
+        print("ChromaDB disabled, using local vector index")
+        return None
+    # Initialize ChromaDB with fallback strategies
+    if not init_chromadb():
+        print("Using local vector index fallback for vector storage")
+        return None
+    return chroma_client
+
+def get_chroma_client():
+    """Return the ChromaDB client (initialized on first use), or None if unavailable"""
+    return lazy_component("chromadb", _create_chroma_client)
+
+def _create_local_vector_index():
+    from vector_index import HashingEmbedder, LocalVectorIndex, SQLiteVectorIndex
+    embedder = HashingEmbedder(dim=int(os.getenv("LOCAL_INDEX_DIM", 1024)))
+    # files: in-memory matrix saved to LOCAL_INDEX_DIR; sqlite: shared by every process
+    if shared_default("LOCAL_INDEX_BACKEND", "files", "sqlite").lower() == "sqlite":
+        return SQLiteVectorIndex(embedder=embedder, path=os.getenv("LOCAL_INDEX_PATH", "vector_index.sqlite3"))
+    return LocalVectorIndex(embedder=embedder, path=os.getenv("LOCAL_INDEX_DIR", "vector_index") or None)
+
+def get_local_vector_index():
+    """Local NumPy vector index used for company research when ChromaDB is unavailable"""
+    return lazy_component("local_vector_index", _create_local_vector_index)
+
+# Bulk job ranking limits
+RANK_MAX_JOBS = int(os.getenv("RANK_MAX_JOBS", 500))
+RANK_MAX_LLM_JOBS = int(os.getenv("RANK_MAX_LLM_JOBS", 5))
+RANK_DETAIL_LIMIT = int(os.getenv("RANK_DETAIL_LIMIT", 20))
+
+def _create_job_ranker():
+    from job_ranking import JobRanker
+    from vector_index import HashingEmbedder
+    return JobRanker(HashingEmbedder(dim=int(os.getenv("RANK_EMBEDDING_DIM", 4096))))
+
+def get_job_ranker():
+    """NumPy TF-IDF ranker for the bulk job ranking endpoint"""
+    return lazy_component("job_ranker", _create_job_ranker)
+
+# PDF upload limits and extraction budget (PDF_MAX_TOKENS overrides PDF_MAX_CHARS at ~4 chars/token)
+PDF_MAX_BYTES = int(os.getenv("PDF_MAX_BYTES", 10 * 1024 * 1024))
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", 50))
+PDF_MAX_CHARS = int(os.getenv("PDF_MAX_TOKENS") or 0) * 4 or int(os.getenv("PDF_MAX_CHARS", 60000))
+# Whole request bodies (PDF plus form fields such as rank-jobs' job list) are refused before
+# werkzeug buffers them; read_upload then enforces PDF_MAX_BYTES on the file itself
+app.config["MAX_CONTENT_LENGTH"] = int(os.getenv("MAX_UPLOAD_BYTES") or PDF_MAX_BYTES + 4 * 1024 * 1024)
+
+@app.errorhandler(413)
+def request_too_large(error):
+    return jsonify({"error": f"Request is larger than the {app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)} MB limit"}), 413
+
+# Token budgets for the resume and job description once they have been compacted
+PROMPT_COMPACTION_ENABLED = os.getenv("PROMPT_COMPACTION_ENABLED", "true").lower() == "true"
+RESUME_TOKEN_BUDGET = int(os.getenv("RESUME_TOKEN_BUDGET", 1500))
+JOB_DESCRIPTION_TOKEN_BUDGET = int(os.getenv("JOB_DESCRIPTION_TOKEN_BUDGET", 800))
+compaction_tracker = CompactionTracker()
+
+def _create_pdf_extractor():
+    importlib.import_module("fitz")
+    return PDFExtractor(
+        max_pages=PDF_MAX_PAGES,
+        max_chars=PDF_MAX_CHARS,
+        parallel_min_pages=int(os.getenv("PDF_PARALLEL_MIN_PAGES", 8)),
+        max_workers=int(os.getenv("PDF_WORKERS", 2))
+    )
 
-# In-memory storage fallback for company research
-company_research_storage = {}
+def get_pdf_extractor():
+    """Return the PDF extractor, importing PyMuPDF on first use"""
+    return lazy_component("pdf_extractor", _create_pdf_extractor)
+
+# Persistent record of researched companies, so each one is ingested once
+company_store = CompanyStore(
+    path=os.getenv("COMPANY_STORE_PATH", "company_store.sqlite3"),
+    ttl_seconds=int(os.getenv("COMPANY_INFO_TTL_SECONDS", 86400))
+)
+
+# Cache of extracted PDF text keyed by a hash of the PDF bytes
+pdf_text_cache = PDFTextCache(
+    max_bytes=int(os.getenv("PDF_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+    disk_dir=shared_default("PDF_CACHE_DIR", "", "pdf_cache") or None,
+    disk_max_bytes=int(os.getenv("PDF_CACHE_DISK_MAX_BYTES") or 256 * 1024 * 1024)
+)
+
+# Cache of LLM completions keyed by template, model settings and normalized inputs
+llm_response_cache = create_llm_cache(
+    backend_name=shared_default("LLM_CACHE_BACKEND", "memory", "sqlite"),
+    ttl_seconds=int(os.getenv("LLM_CACHE_TTL_SECONDS", 3600)),
+    max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", 1024)),
+    sqlite_path=os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3")
+)
+
+# Bounded worker pool for running several analyses of one resume concurrently
+analysis_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("ANALYSIS_MAX_WORKERS", 4)),
+    thread_name_prefix="analysis"
+)
 
 # LangChain PromptTemplates for different analysis types
 PROMPTS = {
@@ -209,34 +431,339 @@ Example format:
 Return ONLY the JSON array, nothing else.
 """)
 
-def get_langchain_response(prompt_template, pdf_content, job_description):
-    """Generate response using LangChain"""
+# Follow-up prompt used to fill in only the questions that were missing or invalid
+AI_PREP_FOLLOWUP_PROMPT = ChatPromptTemplate.from_template("""
+You are an experienced Technical Interview Specialist and Career Coach. You are completing a set of interview questions for a candidate and need exactly {missing_count} more.
+
+Based on the provided information:
+- Target Role: {target_role}
+- Years of Experience: {years_experience}
+- Topics to Focus On: {topics}
+- Additional Description: {description}
+
+Do not repeat or rephrase any of these existing questions:
+{existing_questions}
+
+For each question, provide a detailed explanation covering why this question is important, key points the interviewer is looking for, tips for answering effectively, and common mistakes to avoid.
+
+IMPORTANT: You must respond with ONLY a valid JSON array of exactly {missing_count} objects, each with "question" and "explanation" fields.
+
+Return ONLY the JSON array, nothing else.
+""")
+
+# Number of questions in every AI Prep set
+INTERVIEW_QUESTION_COUNT = 10
+
+# Token and latency cost of interview question generation
+interview_generation_tracker = GenerationCostTracker()
+
+# Bank of validated questions per (role, experience bucket, topic); requests
+# with a free-text description always go to the LLM
+question_bank = None
+if os.getenv("QUESTION_BANK_ENABLED", "true").lower() == "true":
+    question_bank = QuestionBank(
+        path=os.getenv("QUESTION_BANK_PATH", "question_bank.sqlite3"),
+        refresh_seconds=int(shared_default("QUESTION_BANK_REFRESH_SECONDS", "0", "60"))
+    )
+
+def lookup_question_bank(target_role, years_experience, topics, description):
+    """Assemble a question set from the bank, or None to fall back to the LLM"""
+    if question_bank is None or description:
+        return None
+    return question_bank.assemble(target_role, years_experience, topics, INTERVIEW_QUESTION_COUNT)
+
+def add_to_question_bank(target_role, years_experience, topics, description, questions):
+    """Keep a generated set so later requests for the same key skip the LLM"""
+    if question_bank is None or description:
+        return
     try:
-        # Format the prompt with the provided content
+        question_bank.add(target_role, years_experience, topics, questions)
+    except Exception as e:
+        print(f"Question bank write failed: {e}")
+
+# Identical prompts that are in flight at the same time share one LLM call
+SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+llm_single_flight = SingleFlight()
+
+def llm_flight_key(endpoint, formatted_prompt):
+    """Single-flight key: the fully formatted prompt plus the model settings that shape its answer"""
+    model = get_llm()
+    return flight_key(
+        endpoint,
+        getattr(model, "model", type(model).__name__),
+        getattr(model, "temperature", None),
+        formatted_prompt
+    )
+
+def coalesce(endpoint, formatted_prompt, fn):
+    """Run fn() once for concurrent identical prompts and share its result"""
+    if not SINGLE_FLIGHT_ENABLED:
+        return fn()
+    result, _ = llm_single_flight.do(llm_flight_key(endpoint, formatted_prompt), fn)
+    return result
+
+def set_llm(new_llm, resilient=True):
+    """Replace the chat model, e.g. with fake_llm.FakeLLM in tests"""
+    global llm
+    llm = wrap_llm(new_llm) if resilient else new_llm
+
+def lookup_cached_response(endpoint, template_name, inputs):
+    """Return (cache_key, cached_completion) for a prompt; both None when caching is off"""
+    if llm_response_cache is None:
+        return None, None
+    model = get_llm()
+    cache_key = make_cache_key(
+        template_name,
+        getattr(model, "model", type(model).__name__),
+        getattr(model, "temperature", None),
+        inputs
+    )
+    return cache_key, llm_response_cache.get(cache_key, endpoint=endpoint)
+
+def store_cached_response(cache_key, content):
+    """Store a completion under a key from lookup_cached_response"""
+    if llm_response_cache is not None and cache_key is not None:
+        llm_response_cache.set(cache_key, content)
+
+def invoke_llm_cached(endpoint, template_name, inputs, formatted_prompt, validate=None):
+    """Invoke the LLM, serving repeated prompts from the response cache.
+
+    validate, if given, must raise ValueError for unusable completions: those
+    are neither served from nor written to the cache.
+    """
+    cache_key, cached = lookup_cached_response(endpoint, template_name, inputs)
+    if cached is not None:
+        try:
+            if validate is not None:
+                validate(cached)
+            return cached
+        except ValueError:
+            pass
+
+    def call():
+        with stage("llm_invoke"):
+            response = get_llm().invoke([HumanMessage(content=formatted_prompt)])
+        usage = getattr(response, "usage_metadata", None) or {}
+        record_llm_io(
+            endpoint, formatted_prompt, message_text(response),
+            usage.get("input_tokens"), usage.get("output_tokens")
+        )
+        if validate is not None:
+            validate(response.content)
+        store_cached_response(cache_key, response.content)
+        return response.content
+
+    return coalesce(endpoint, formatted_prompt, call)
+
+def sse_event(event, data):
+    """Format a Server-Sent Event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def stream_llm_events(endpoint, template_name, inputs, formatted_prompt, metadata=None):
+    """Yield SSE events for a streamed completion, ending with a timings event"""
+    started = time.perf_counter()
+    cache_key, cached = lookup_cached_response(endpoint, template_name, inputs)
+    if cached is not None:
+        yield sse_event("chunk", {"text": cached})
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        yield sse_event("done", {
+            **(metadata or {}),
+            "cached": True,
+            "timeToFirstTokenMs": elapsed_ms,
+            "totalDurationMs": elapsed_ms
+        })
+        return
+
+    first_token_ms = None
+    parts = []
+    try:
+        messages = [HumanMessage(content=formatted_prompt)]
+        for chunk in get_llm().stream(messages):
+            text = message_text(chunk)
+            if not text:
+                continue
+            if first_token_ms is None:
+                first_token_ms = round((time.perf_counter() - started) * 1000, 1)
+            parts.append(text)
+            yield sse_event("chunk", {"text": text})
+    except Exception as e:
+        yield sse_event("error", {"error": f"Error generating response: {str(e)}"})
+        return
+
+    completion = "".join(parts)
+    metrics.stage_latency.observe(time.perf_counter() - started, stage="llm_stream")
+    record_llm_io(endpoint, formatted_prompt, completion)
+    store_cached_response(cache_key, completion)
+    yield sse_event("done", {
+        **(metadata or {}),
+        "cached": False,
+        "timeToFirstTokenMs": first_token_ms,
+        "totalDurationMs": round((time.perf_counter() - started) * 1000, 1)
+    })
+
+def sse_response(events):
+    """Wrap an SSE event generator in a streaming Flask response"""
+    return Response(
+        stream_with_context(events),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def format_analysis_prompt(prompt_template, pdf_content, job_description, extra_context=None):
+    """Format an analysis prompt; returns (formatted_prompt, cache inputs)"""
+    with stage("prompt_format"):
         formatted_prompt = prompt_template.format(
             pdf_content=pdf_content,
             job_description=job_description
         )
+    inputs = {"pdf_content": pdf_content, "job_description": job_description}
+    if extra_context:
+        formatted_prompt += "\n\n" + extra_context
+        inputs["extra_context"] = extra_context
+    return formatted_prompt, inputs
 
-        # Get response from LangChain model
-        messages = [HumanMessage(content=formatted_prompt)]
-        response = llm.invoke(messages)
-        return response.content
+def get_langchain_response(prompt_template, pdf_content, job_description, template_name=None, extra_context=None):
+    """Generate response using LangChain"""
+    try:
+        if template_name is None:
+            template_name = next(
+                (name for name, template in PROMPTS.items() if template is prompt_template),
+                "custom"
+            )
+
+        # Format the prompt with the provided content
+        formatted_prompt, inputs = format_analysis_prompt(
+            prompt_template, pdf_content, job_description, extra_context
+        )
+
+        # Get response from LangChain model (or the response cache)
+        return invoke_llm_cached("analyze-resume", template_name, inputs, formatted_prompt)
+    except LLMServiceError:
+        raise
     except Exception as e:
 
         return f"Error generating response: {str(e)}"
 
-def extract_text_from_pdf(pdf_bytes):
-    """Extract text content from PDF bytes"""
+def parse_analysis_types(raw_values):
+    """Parse analysisTypes form values (repeated fields, comma lists or JSON arrays)"""
+    analysis_types = []
+    for raw in raw_values:
+        raw = raw.strip()
+        if raw.startswith('['):
+            values = json.loads(raw)
+        else:
+            values = raw.split(',')
+        for value in values:
+            value = str(value).strip()
+            if value == 'all':
+                analysis_types.extend(PROMPTS.keys())
+            elif value:
+                analysis_types.append(value)
+    # Drop duplicates while keeping the requested order
+    return list(dict.fromkeys(analysis_types))
+
+def validate_analysis_types(raw_values):
+    """Parse and check analysisTypes form values; raises ValueError with the message for a 400"""
+    try:
+        analysis_types = parse_analysis_types(raw_values)
+    except ValueError:
+        raise ValueError("analysisTypes must be a list of analysis types")
+    if not analysis_types:
+        raise ValueError("analysisTypes cannot be empty")
+    unknown_types = [t for t in analysis_types if t not in PROMPTS]
+    if unknown_types:
+        raise ValueError(f"Unknown analysis types: {', '.join(unknown_types)}")
+    return analysis_types
+
+def run_analyses(pdf_text, job_description, analysis_types, extra_context=None):
+    """Run several analyses concurrently; returns (analyses, errors, timings)"""
+    def run_one(analysis_type):
+        started = time.perf_counter()
+        analysis = get_langchain_response(
+            PROMPTS[analysis_type], pdf_text, job_description, analysis_type, extra_context
+        )
+        return analysis, time.perf_counter() - started
+
+    futures = {
+        analysis_type: analysis_executor.submit(run_one, analysis_type)
+        for analysis_type in analysis_types
+    }
+
+    analyses, errors, timings = {}, {}, {}
+    service_errors = []
+    for analysis_type, future in futures.items():
+        try:
+            analysis, elapsed = future.result()
+            timings[analysis_type] = round(elapsed * 1000, 1)
+        except LLMServiceError as e:
+            service_errors.append(e)
+            analysis = f"Error generating response: {str(e)}"
+        except Exception as e:
+            analysis = f"Error generating response: {str(e)}"
+        if analysis.startswith("Error"):
+            errors[analysis_type] = analysis
+        else:
+            analyses[analysis_type] = analysis
+    # Nothing to return: let the route report the provider error with its status
+    if service_errors and len(service_errors) == len(futures):
+        raise service_errors[0]
+    return analyses, errors, timings
+
+# Analysis types the local keyword scorer can answer without the LLM
+FAST_ANALYSIS_TYPES = ("keywords", "percentage")
+ANALYSIS_MODES = ("llm", "fast", "hybrid")
+
+def parse_analysis_mode(raw_mode):
+    """Validate the analysis mode: llm (default), fast (local scorer) or hybrid (scorer as LLM context)"""
+    mode = (raw_mode or "llm").strip().lower()
+    if mode not in ANALYSIS_MODES:
+        raise ValueError(f"mode must be one of: {', '.join(ANALYSIS_MODES)}")
+    return mode
+
+def extract_text_from_pdf(pdf_bytes, report=None):
+    """Extract text content from PDF bytes; fills `report` with page timings if given"""
+    # Repeat uploads of the same resume skip PyMuPDF entirely; the budget is part
+    # of the key because it changes the extracted text
+    cache_key = f"{pdf_text_cache.key_for(pdf_bytes)}-{PDF_MAX_CHARS}"
+    cached_text = pdf_text_cache.get(cache_key)
+    if cached_text is not None:
+        if report is not None:
+            report["cached"] = True
+        return cached_text
+
     try:
-        document = fitz.open(stream=pdf_bytes, filetype="pdf")
-        text_parts = []
-        for page in document:
-            text_parts.append(page.get_text())
-        return " ".join(text_parts)
+        with stage("pdf_extract"):
+            text, extraction_report = get_pdf_extractor().extract(pdf_bytes)
+        pdf_text_cache.put(cache_key, text)
+        if report is not None:
+            report.update(extraction_report, cached=False)
+        return text
+    except PDFLimitError:
+        raise
     except Exception as e:
         return f"Error extracting PDF text: {str(e)}"
 
+def compact_prompt_inputs(pdf_text, job_description, report=None):
+    """Clean and trim resume and job description to their token budgets before prompting"""
+    if not PROMPT_COMPACTION_ENABLED:
+        return pdf_text, job_description
+
+    started = time.perf_counter()
+    tokens_before = estimate_tokens(pdf_text) + estimate_tokens(job_description)
+    with stage("prompt_compaction"):
+        compact_text, sections = compact_resume(pdf_text, job_description, RESUME_TOKEN_BUDGET)
+        compact_description = compact_job_description(job_description, JOB_DESCRIPTION_TOKEN_BUDGET)
+    stats = {
+        "tokensBefore": tokens_before,
+        "tokensAfter": estimate_tokens(compact_text) + estimate_tokens(compact_description),
+        "compactionMs": round((time.perf_counter() - started) * 1000, 2),
+        "sections": sections
+    }
+    compaction_tracker.record(stats)
+    if report is not None:
+        report.update(stats)
+    return compact_text, compact_description
+
 @app.route('/api/analyze-resume', methods=['POST'])
 def analyze_resume():
     """API endpoint to analyze resume against job description"""
@@ -252,23 +779,90 @@ def analyze_resume():
         resume_file = request.files['resume']
         job_description = request.form['jobDescription']
         analysis_type = request.form.get('analysisType', 'general')
+        try:
+            mode = parse_analysis_mode(request.form.get('mode'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        # Batch mode: several analysis types in one upload
+        analysis_types = None
+        if 'analysisTypes' in request.form:
+            try:
+                analysis_types = validate_analysis_types(request.form.getlist('analysisTypes'))
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
         
         # Validate file type
         if not resume_file.filename.lower().endswith('.pdf'):
             return jsonify({"error": "Only PDF files are supported"}), 400
         
         # Read and process PDF
-        pdf_bytes = resume_file.read()
-        pdf_text = extract_text_from_pdf(pdf_bytes)
+        pdf_bytes = read_upload(resume_file, PDF_MAX_BYTES)
+        extraction = {}
+        pdf_text = extract_text_from_pdf(pdf_bytes, extraction)
         
         if pdf_text.startswith("Error"):
             return jsonify({"error": pdf_text}), 500
+
+        # The local scorer sees the full resume; it is cheap enough not to need compaction
+        score = score_resume(pdf_text, job_description) if mode != "llm" else None
+        extra_context = score_context(score) if mode == "hybrid" else None
+
+        if analysis_types is None:
+            template_name = analysis_type if analysis_type in PROMPTS else "general"
+            if mode == "fast":
+                if template_name not in FAST_ANALYSIS_TYPES:
+                    return jsonify({"error": f"Fast mode supports only: {', '.join(FAST_ANALYSIS_TYPES)}"}), 400
+                return jsonify({
+                    "success": True,
+                    "analysis": format_score(score, template_name),
+                    "analysisType": analysis_type,
+                    "mode": mode,
+                    "score": score,
+                    "extraction": extraction
+                })
+
+        compaction = {}
+        pdf_text, job_description = compact_prompt_inputs(pdf_text, job_description, compaction)
+
+        if analysis_types is not None:
+            # In fast mode the scorer answers what it can and the LLM handles the rest
+            local_types = [t for t in analysis_types if t in FAST_ANALYSIS_TYPES] if mode == "fast" else []
+            llm_types = [t for t in analysis_types if t not in local_types]
+
+            # The PDF is parsed once and every analysis runs concurrently
+            try:
+                analyses, errors, timings = run_analyses(pdf_text, job_description, llm_types, extra_context)
+            except LLMServiceError as e:
+                if not local_types:
+                    raise
+                # The scorer's answers still make a partial response
+                analyses, errors, timings = {}, {t: f"Error generating response: {str(e)}" for t in llm_types}, {}
+            for local_type in local_types:
+                analyses[local_type] = format_score(score, local_type)
+                timings[local_type] = score["elapsedMs"]
+
+            if not analyses:
+                return jsonify({"error": "All analyses failed", "errors": errors}), 500
+
+            return jsonify({
+                "success": True,
+                "partial": bool(errors),
+                "analyses": analyses,
+                "errors": errors,
+                "analysisTypes": analysis_types,
+                "timingsMs": timings,
+                "mode": mode,
+                "score": score,
+                "extraction": extraction,
+                "compaction": compaction
+            })
         
         # Get appropriate prompt template
-        prompt_template = PROMPTS.get(analysis_type, PROMPTS["general"])
+        prompt_template = PROMPTS[template_name]
 
         # Get analysis from LangChain
-        analysis = get_langchain_response(prompt_template, pdf_text, job_description)
+        analysis = get_langchain_response(prompt_template, pdf_text, job_description, template_name, extra_context)
         
         if analysis.startswith("Error"):
             return jsonify({"error": analysis}), 500
@@ -277,12 +871,264 @@ def analyze_resume():
         return jsonify({
             "success": True,
             "analysis": analysis,
-            "analysisType": analysis_type
+            "analysisType": analysis_type,
+            "mode": mode,
+            "score": score,
+            "extraction": extraction,
+            "compaction": compaction
         })
         
+    except PDFLimitError as e:
+        return jsonify({"error": str(e)}), 413
+    except LLMServiceError as e:
+        return llm_error_response(e)
     except Exception as e:
         return jsonify({"error": f"Server error: {str(e)}"}), 500
 
+@app.route('/api/analyze-resume/stream', methods=['POST'])
+def analyze_resume_stream():
+    """Streaming (SSE) variant of /api/analyze-resume"""
+    if 'resume' not in request.files:
+        return jsonify({"error": "Missing resume file"}), 400
+
+    if 'jobDescription' not in request.form:
+        return jsonify({"error": "Missing job description"}), 400
+
+    try:
+        resume_file = request.files['resume']
+        job_description = request.form['jobDescription']
+        analysis_type = request.form.get('analysisType', 'general')
+        try:
+            mode = parse_analysis_mode(request.form.get('mode'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if mode == "fast":
+            # Nothing to stream: the local scorer answers in milliseconds
+            return jsonify({"error": "Fast mode is not streamed; use /api/analyze-resume"}), 400
+
+        if not resume_file.filename.lower().endswith('.pdf'):
+            return jsonify({"error": "Only PDF files are supported"}), 400
+
+        pdf_text = extract_text_from_pdf(read_upload(resume_file, PDF_MAX_BYTES))
+
+        if pdf_text.startswith("Error"):
+            return jsonify({"error": pdf_text}), 500
+
+        metadata = {"analysisType": analysis_type}
+        extra_context = None
+        if mode == "hybrid":
+            metadata["score"] = score_resume(pdf_text, job_description)
+            extra_context = score_context(metadata["score"])
+
+        pdf_text, job_description = compact_prompt_inputs(pdf_text, job_description)
+
+        template_name = analysis_type if analysis_type in PROMPTS else "general"
+        formatted_prompt, inputs = format_analysis_prompt(
+            PROMPTS[template_name], pdf_text, job_description, extra_context
+        )
+
+        return sse_response(stream_llm_events(
+            "analyze-resume",
+            template_name,
+            inputs,
+            formatted_prompt,
+            metadata=metadata
+        ))
+
+    except PDFLimitError as e:
+        return jsonify({"error": str(e)}), 413
+    except Exception as e:
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+
+def parse_jobs(raw_jobs):
+    """Parse the jobs form field; returns (jobs, skipped ids) or raises ValueError"""
+    try:
+        items = json.loads(raw_jobs)
+    except json.JSONDecodeError:
+        raise ValueError("jobs must be a JSON array")
+    if not isinstance(items, list) or not items:
+        raise ValueError("jobs must be a non-empty JSON array")
+    if len(items) > RANK_MAX_JOBS:
+        raise ValueError(f"At most {RANK_MAX_JOBS} jobs can be ranked per request")
+
+    jobs, skipped = [], []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            raise ValueError("Each job must be an object")
+        # Accept JobApplication records as stored (_id) or trimmed down (id)
+        job_id = str(item.get("id") or item.get("_id") or index)
+        description = item.get("jobDescription")
+        if not isinstance(description, str) or not description.strip():
+            skipped.append(job_id)
+            continue
+        jobs.append({
+            "id": job_id,
+            "company": item.get("company", ""),
+            "position": item.get("position", ""),
+            "jobDescription": description
+        })
+    if not jobs:
+        raise ValueError("No job has a job description to rank against")
+    return jobs, skipped
+
+@app.route('/api/rank-jobs', methods=['POST'])
+def rank_jobs():
+    """Rank one resume against many job descriptions, optionally analyzing the top matches"""
+    if 'resume' not in request.files:
+        return jsonify({"error": "Missing resume file"}), 400
+
+    if 'jobs' not in request.form:
+        return jsonify({"error": "Missing jobs"}), 400
+
+    try:
+        resume_file = request.files['resume']
+        try:
+            jobs, skipped = parse_jobs(request.form['jobs'])
+            top_k = int(request.form.get('topK', 0))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if not 0 <= top_k <= RANK_MAX_LLM_JOBS:
+            return jsonify({"error": f"topK must be between 0 and {RANK_MAX_LLM_JOBS}"}), 400
+
+        analysis_type = request.form.get('analysisType', 'percentage')
+        if analysis_type not in PROMPTS:
+            return jsonify({"error": f"Unknown analysis type: {analysis_type}"}), 400
+
+        if not resume_file.filename.lower().endswith('.pdf'):
+            return jsonify({"error": "Only PDF files are supported"}), 400
+
+        # The resume is parsed once for every job
+        extraction = {}
+        pdf_text = extract_text_from_pdf(read_upload(resume_file, PDF_MAX_BYTES), extraction)
+
+        if pdf_text.startswith("Error"):
+            return jsonify({"error": pdf_text}), 500
+
+        with stage("job_ranking"):
+            order, similarities, ranking_ms = get_job_ranker().rank(
+                pdf_text, [job["jobDescription"] for job in jobs]
+            )
+
+        # Keyword details only for the head of the list, where users actually look
+        started = time.perf_counter()
+        rankings, scores = [], {}
+        for rank, index in enumerate(order, start=1):
+            job = jobs[index]
+            entry = {
+                "rank": rank,
+                "id": job["id"],
+                "company": job["company"],
+                "position": job["position"],
+                "similarity": round(float(similarities[index]) * 100, 1)
+            }
+            if rank <= max(RANK_DETAIL_LIMIT, top_k):
+                scores[index] = score_resume(pdf_text, job["jobDescription"])
+                entry["matchPercentage"] = scores[index]["matchPercentage"]
+                entry["matchedSkills"] = scores[index]["matchedSkills"]
+                entry["missingSkills"] = scores[index]["missingSkills"]
+            rankings.append(entry)
+        keywords_ms = round((time.perf_counter() - started) * 1000, 2)
+
+        # The LLM only sees the top-k jobs, with the local score as context
+        started = time.perf_counter()
+        def analyze_one(index):
+            resume_text, job_description = compact_prompt_inputs(pdf_text, jobs[index]["jobDescription"])
+            return get_langchain_response(
+                PROMPTS[analysis_type], resume_text, job_description,
+                analysis_type, score_context(scores[index])
+            )
+
+        futures = [(entry, analysis_executor.submit(analyze_one, index))
+                   for entry, index in zip(rankings[:top_k], order[:top_k])]
+        for entry, future in futures:
+            try:
+                analysis = future.result()
+            except Exception as e:
+                analysis = f"Error generating response: {str(e)}"
+            if analysis.startswith("Error"):
+                entry["analysisError"] = analysis
+            else:
+                entry["analysis"] = analysis
+
+        return jsonify({
+            "success": True,
+            "rankings": rankings,
+            "skipped": skipped,
+            "analysisType": analysis_type if top_k else None,
+            "timingsMs": {
+                "ranking": ranking_ms,
+                "keywords": keywords_ms,
+                "analysis": round((time.perf_counter() - started) * 1000, 2) if top_k else 0.0
+            },
+            "extraction": extraction
+        })
+
+    except PDFLimitError as e:
+        return jsonify({"error": str(e)}), 413
+    except Exception as e:
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+
+def parse_interview_questions(response_content):
+    """Parse and validate the AI Prep JSON array; raises ValueError with a client-facing message"""
+    # Clean the response text - remove any markdown formatting
+    response_text = response_content.strip()
+    if response_text.startswith('```json'):
+        response_text = response_text[7:]
+    if response_text.endswith('```'):
+        response_text = response_text[:-3]
+    response_text = response_text.strip()
+
+    try:
+        questions_data = json.loads(response_text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Failed to parse AI response as JSON: {str(e)}")
+
+    # Validate that we have exactly 10 questions
+    if not isinstance(questions_data, list):
+        raise ValueError("Invalid response format from AI")
+
+    if len(questions_data) != 10:
+        raise ValueError(f"Expected 10 questions, got {len(questions_data)}")
+
+    # Validate each question object
+    for i, item in enumerate(questions_data):
+        if not isinstance(item, dict) or 'question' not in item or 'explanation' not in item:
+            raise ValueError(f"Invalid question format at index {i}")
+
+    return questions_data
+
+def make_question_generator(prompt_inputs):
+    """Build the AI Prep generation pipeline for one set of prompt inputs"""
+    def build_followup_prompt(missing_count, existing_questions):
+        return AI_PREP_FOLLOWUP_PROMPT.format(
+            missing_count=missing_count,
+            existing_questions="\n".join(f"- {question}" for question in existing_questions) or "- (none)",
+            **prompt_inputs
+        )
+
+    return QuestionGenerator(
+        build_prompt=lambda: AI_PREP_PROMPT.format(**prompt_inputs),
+        build_followup_prompt=build_followup_prompt,
+        count=INTERVIEW_QUESTION_COUNT,
+        max_retries=int(os.getenv("INTERVIEW_MAX_RETRIES", 2))
+    )
+
+def generate_question_set(prompt_inputs):
+    """Stream, validate and top up a question set; returns (questions, generation_stats)"""
+    formatted_prompt = AI_PREP_PROMPT.format(**prompt_inputs)
+
+    def generate():
+        with stage("llm_generate_questions"):
+            questions, stats = make_question_generator(prompt_inputs).run(get_llm())
+        interview_generation_tracker.record(stats, success=len(questions) == INTERVIEW_QUESTION_COUNT)
+        record_llm_io(
+            "generate-interview-questions", formatted_prompt, json.dumps(questions),
+            stats["inputTokens"], stats["outputTokens"]
+        )
+        return questions, stats
+
+    return coalesce("generate-interview-questions", formatted_prompt, generate)
+
 @app.route('/api/generate-interview-questions', methods=['POST'])
 def generate_interview_questions():
     """API endpoint to generate interview questions based on role and experience"""
@@ -305,56 +1151,69 @@ def generate_interview_questions():
             return jsonify({"error": "Years of experience is required"}), 400
 
         # Format the prompt with user data using LangChain
-        formatted_prompt = AI_PREP_PROMPT.format(
-            target_role=target_role,
-            years_experience=years_experience,
-            topics=topics if topics else "General topics relevant to the role",
-            description=description if description else "No additional description provided"
-        )
+        prompt_inputs = {
+            "target_role": target_role,
+            "years_experience": years_experience,
+            "topics": topics if topics else "General topics relevant to the role",
+            "description": description if description else "No additional description provided"
+        }
 
-        # Get response from LangChain
+        # Serve from the question bank when this key has been pre-generated
+        banked_questions = lookup_question_bank(target_role, years_experience, topics, description)
+        if banked_questions is not None:
+            return jsonify({
+                "success": True,
+                "questions": banked_questions,
+                "metadata": {
+                    "targetRole": target_role,
+                    "yearsExperience": years_experience,
+                    "topics": topics,
+                    "description": description
+                },
+                "source": "bank"
+            })
+
+        # Get questions from the response cache or the generation pipeline
         try:
-            messages = [HumanMessage(content=formatted_prompt)]
-            response = llm.invoke(messages)
-
-            # Parse the JSON response
-            try:
-                # Clean the response text - remove any markdown formatting
-                response_text = response.content.strip()
-                if response_text.startswith('```json'):
-                    response_text = response_text[7:]
-                if response_text.endswith('```'):
-                    response_text = response_text[:-3]
-                response_text = response_text.strip()
-
-                questions_data = json.loads(response_text)
-
-                # Validate that we have exactly 10 questions
-                if not isinstance(questions_data, list):
-                    return jsonify({"error": "Invalid response format from AI"}), 500
-
-                if len(questions_data) != 10:
-                    return jsonify({"error": f"Expected 10 questions, got {len(questions_data)}"}), 500
-
-                # Validate each question object
-                for i, item in enumerate(questions_data):
-                    if not isinstance(item, dict) or 'question' not in item or 'explanation' not in item:
-                        return jsonify({"error": f"Invalid question format at index {i}"}), 500
-
-                return jsonify({
-                    "success": True,
-                    "questions": questions_data,
-                    "metadata": {
-                        "targetRole": target_role,
-                        "yearsExperience": years_experience,
-                        "topics": topics,
-                        "description": description
-                    }
-                })
-
-            except json.JSONDecodeError as e:
-                return jsonify({"error": f"Failed to parse AI response as JSON: {str(e)}"}), 500
-
+            cache_key, cached_content = lookup_cached_response(
+                "generate-interview-questions", "ai_prep", prompt_inputs
+            )
+            questions_data, generation = None, None
+            if cached_content is not None:
+                try:
+                    questions_data = parse_interview_questions(cached_content)
+                except ValueError:
+                    questions_data = None
+
+            if questions_data is None:
+                questions_data, generation = generate_question_set(prompt_inputs)
+
+                if len(questions_data) != INTERVIEW_QUESTION_COUNT:
+                    return jsonify({
+                        "error": f"Expected {INTERVIEW_QUESTION_COUNT} questions, got {len(questions_data)}",
+                        "generation": generation
+                    }), 500
+
+                # Only complete question sets are worth serving again
+                store_cached_response(cache_key, json.dumps(questions_data))
+                add_to_question_bank(target_role, years_experience, topics, description, questions_data)
+
+            return jsonify({
+                "success": True,
+                "questions": questions_data,
+                "metadata": {
+                    "targetRole": target_role,
+                    "yearsExperience": years_experience,
+                    "topics": topics,
+                    "description": description
+                },
+                "generation": generation,
+                "source": "cache" if generation is None else "llm"
+            })
+
+        except LLMServiceError as e:
+            print(f"AI generation error: {str(e)}")
+            return llm_error_response(e)
         except Exception as e:
             print(f"AI generation error: {str(e)}")
             return jsonify({"error": f"AI generation error: {str(e)}"}), 500
@@ -404,97 +1263,342 @@ def search_company_info(company_name):
     except Exception as e:
         return f"Error searching for company information: {str(e)}"
 
+# Company research retrieval: chunk sizes, candidate pool, hybrid weighting and context budget
+RETRIEVAL_CHUNK_TOKENS = int(os.getenv("RETRIEVAL_CHUNK_TOKENS", 80))
+RETRIEVAL_CHUNK_OVERLAP_TOKENS = int(os.getenv("RETRIEVAL_CHUNK_OVERLAP_TOKENS", 16))
+RETRIEVAL_CANDIDATES = int(os.getenv("RETRIEVAL_CANDIDATES", 20))
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", 4))
+RETRIEVAL_CONTEXT_TOKENS = int(os.getenv("RETRIEVAL_CONTEXT_TOKENS", 350))
+# Weight of vector similarity against BM25 (1.0 = vector only, 0.0 = BM25 only)
+RETRIEVAL_HYBRID_ALPHA = float(os.getenv("RETRIEVAL_HYBRID_ALPHA", 0.5))
+RETRIEVAL_EMBED_BATCH_SIZE = int(os.getenv("RETRIEVAL_EMBED_BATCH_SIZE", 64))
+
+def split_company_chunks(company_info):
+    """Split company info into token-sized, overlapping chunks for retrieval"""
+    return chunk_text(company_info, RETRIEVAL_CHUNK_TOKENS, RETRIEVAL_CHUNK_OVERLAP_TOKENS)
+
 def store_company_info_in_vector_db(company_name, company_info):
     """Store company information in vector database or fallback storage"""
-    try:
-        if CHROMA_AVAILABLE and chroma_client:
-            # Use ChromaDB
-            collection_name = "company_research"
-            try:
-                collection = chroma_client.get_collection(name=collection_name)
-            except:
-                collection = chroma_client.create_collection(name=collection_name)
-
-            # Split company info into chunks for better retrieval
-            chunks = company_info.split('\n\n')
-
-            # Store each chunk with metadata
-            for i, chunk in enumerate(chunks):
-                if chunk.strip():
-                    collection.add(
-                        documents=[chunk.strip()],
-                        metadatas=[{"company": company_name, "chunk_id": i}],
-                        ids=[f"{company_name}_chunk_{i}"]
-                    )
-        else:
-            # Use in-memory fallback
-            company_research_storage[company_name] = company_info
+    key = company_key(company_name)
+    chunks = split_company_chunks(company_info)
+    metadatas = [{"company": key, "chunk_id": i} for i in range(len(chunks))]
+    ids = [f"{key}_chunk_{i}" for i in range(len(chunks))]
+
+    client = get_chroma_client()
+    if client is not None:
+        # Use ChromaDB
+        try:
+            collection = client.get_or_create_collection(name="company_research")
+
+            # Replace any previous chunks for this company in one batched write
+            collection.delete(where={"company": key})
+            # Chroma embeds each add() call as one batch
+            for start in range(0, len(chunks), RETRIEVAL_EMBED_BATCH_SIZE):
+                end = start + RETRIEVAL_EMBED_BATCH_SIZE
+                collection.add(documents=chunks[start:end], metadatas=metadatas[start:end], ids=ids[start:end])
+            return True
+        except Exception as e:
+            print(f"Error storing company info in ChromaDB: {str(e)}, using local index")
 
+    # Use the local vector index fallback
+    try:
+        local_index = get_local_vector_index()
+        local_index.add(chunks, metadatas, ids, replace_where={"company": key})
+        local_index.save()
         return True
-
     except Exception as e:
         print(f"Error storing company info: {str(e)}")
-        # Fallback to in-memory storage
-        company_research_storage[company_name] = company_info
+        return False
+
+def company_in_vector_db(company_name):
+    """Check whether a company's chunks are present in the active storage backend"""
+    key = company_key(company_name)
+    if get_local_vector_index().get(where={"company": key}, limit=1)["ids"]:
         return True
+    client = get_chroma_client()
+    if client is not None:
+        try:
+            collection = client.get_collection(name="company_research")
+            return bool(collection.get(where={"company": key}, limit=1)["ids"])
+        except Exception:
+            return False
+    return False
+
+def ensure_company_ingested(company_name):
+    """Fetch and ingest a company unless a fresh copy is stored; returns (company_info, error)"""
+    record = company_store.get(company_name)
+
+    # Fresh record: skip the fetch, re-ingesting only if the vector store lost it
+    if company_store.is_fresh(record):
+        if not company_in_vector_db(company_name):
+            store_company_info_in_vector_db(company_name, record["raw_info"])
+        return record["raw_info"], None
+
+    company_info = search_company_info(company_name)
+    if company_info.startswith("Error"):
+        if record:
+            # A stale copy beats no answer at all
+            return record["raw_info"], None
+        return None, company_info
+
+    # Unchanged content only needs its freshness bumped
+    if record and record["content_hash"] == content_hash(company_info) and company_in_vector_db(company_name):
+        company_store.touch(company_name)
+        return company_info, None
+
+    if not store_company_info_in_vector_db(company_name, company_info):
+        return None, "Failed to store company information"
+
+    company_store.save(company_name, company_info, len(split_company_chunks(company_info)))
+    return company_info, None
+
+# Prompt for answering questions from retrieved company information
+COMPANY_RESEARCH_PROMPT = PromptTemplate(
+    input_variables=["context", "question", "company_name"],
+    template="""
+            Based on the following information about {company_name}, please answer the question.
 
-def query_company_info(company_name, question):
-    """Query company information using RAG or fallback storage"""
-    try:
-        context = ""
+            Company Information:
+            {context}
 
-        if CHROMA_AVAILABLE and chroma_client:
-            # Use ChromaDB
-            try:
-                collection = chroma_client.get_collection(name="company_research")
+            Question: {question}
 
-                # Search for relevant information
+            Please provide a comprehensive answer based on the available information. If the information is not sufficient, mention what additional research might be helpful.
+            """
+)
+
+def retrieve_company_context(company_name, question, report=None):
+    """Retrieve the stored company information most relevant to a question, within the context budget"""
+    contexts, reports, _ = retrieve_company_contexts(company_name, [question])
+    if report is not None:
+        report.update(reports[0])
+    return contexts[0]
+
+def retrieve_company_contexts(company_name, questions, shared_max_tokens=None):
+    """Retrieve context for several questions with one vector query; returns (contexts, reports, shared_context).
+
+    shared_context joins every question's chunks within shared_max_tokens, for one batched prompt.
+    """
+    with stage("vector_query"):
+        documents, positions, similarity_lists = _company_candidates(company_name, questions)
+    if not documents:
+        return ["" for _ in questions], [{} for _ in questions], ""
+
+    with stage("context_selection"):
+        doc_tokens = tokenize_documents(documents)
+        selections = [
+            select_chunks(
+                question, documents, positions, similarities,
+                top_k=RETRIEVAL_TOP_K,
+                max_tokens=RETRIEVAL_CONTEXT_TOKENS,
+                alpha=RETRIEVAL_HYBRID_ALPHA,
+                doc_tokens=doc_tokens
+            )
+            for question, similarities in zip(questions, similarity_lists)
+        ]
+        contexts = [
+            assemble_context([documents[index] for index in selected], RETRIEVAL_CONTEXT_TOKENS)
+            for selected in selections
+        ]
+        shared_context = ""
+        if shared_max_tokens:
+            union = sorted(set().union(*selections), key=lambda index: positions[index])
+            shared_context = assemble_context([documents[index] for index in union], shared_max_tokens)
+
+    reports = [
+        {"candidates": len(documents), "selected": len(selected), "contextTokens": estimate_tokens(context)}
+        for selected, context in zip(selections, contexts)
+    ]
+    return contexts, reports, shared_context
+
+def _company_candidates(company_name, questions):
+    """Every stored chunk of a company, its position, and per question its vector similarity (None outside the top candidates)"""
+    where = {"company": company_key(company_name)}
+
+    client = get_chroma_client()
+    if client is not None:
+        # Use ChromaDB
+        try:
+            collection = client.get_collection(name="company_research")
+            stored = collection.get(where=where)
+            if stored["ids"]:
                 results = collection.query(
-                    query_texts=[question],
-                    where={"company": company_name},
-                    n_results=3
+                    query_texts=list(questions),
+                    where=where,
+                    n_results=min(RETRIEVAL_CANDIDATES, len(stored["ids"]))
                 )
+                return _candidate_lists(stored, results)
+        except Exception as e:
+            print(f"ChromaDB query failed: {e}, using fallback")
+
+    # Use the local vector index fallback
+    local_index = get_local_vector_index()
+    stored = local_index.get(where=where)
+    if not stored["ids"]:
+        return [], [], []
+    return _candidate_lists(stored, local_index.query_many(list(questions), where=where, n_results=RETRIEVAL_CANDIDATES))
+
+def _candidate_lists(stored, results):
+    positions = [metadata.get("chunk_id", index) for index, metadata in enumerate(stored["metadatas"])]
+    similarity_lists = []
+    for ids, distances in zip(results["ids"], results["distances"]):
+        # Lower distance is better for every metric the stores use
+        similarity_by_id = {chunk_id: -distance for chunk_id, distance in zip(ids, distances)}
+        similarity_lists.append([similarity_by_id.get(chunk_id) for chunk_id in stored["ids"]])
+    return stored["documents"], positions, similarity_lists
+
+NO_COMPANY_INFO = "No information found for this company. Please try researching the company first."
+
+def format_company_question_prompt(company_name, question, context):
+    """Return (formatted_prompt, cache inputs) for one research question"""
+    inputs = {"context": context, "question": question, "company_name": company_name}
+    return COMPANY_RESEARCH_PROMPT.format(**inputs), inputs
+
+def answer_company_question(company_name, question, context):
+    """Answer one question from its retrieved context"""
+    if not context:
+        return NO_COMPANY_INFO
+
+    formatted_prompt, inputs = format_company_question_prompt(company_name, question, context)
+    return invoke_llm_cached("research-company", "company_research", inputs, formatted_prompt)
+
+def query_company_info(company_name, question, report=None):
+    """Query company information using RAG or fallback storage"""
+    try:
+        context = retrieve_company_context(company_name, question, report)
+        return answer_company_question(company_name, question, context)
 
-                if results['documents'] and results['documents'][0]:
-                    context = "\n".join(results['documents'][0])
-            except Exception as e:
-                print(f"ChromaDB query failed: {e}, using fallback")
-                context = company_research_storage.get(company_name, "")
-        else:
-            # Use in-memory fallback
-            context = company_research_storage.get(company_name, "")
+    except LLMServiceError:
+        raise
+    except Exception as e:
+        return f"Error querying company information: {str(e)}"
 
-        if not context:
-            return "No information found for this company. Please try researching the company first."
+# Multi-question research: one ingest and retrieval pass, then concurrent or batched answers
+RESEARCH_MAX_QUESTIONS = int(os.getenv("RESEARCH_MAX_QUESTIONS", 8))
+RESEARCH_BATCH_CONTEXT_TOKENS = int(os.getenv("RESEARCH_BATCH_CONTEXT_TOKENS", 900))
+RESEARCH_ANSWER_MODES = ("concurrent", "batched")
 
-        # Create prompt for answering the question
-        rag_prompt = PromptTemplate(
-            input_variables=["context", "question", "company_name"],
-            template="""
-            Based on the following information about {company_name}, please answer the question.
+COMPANY_RESEARCH_BATCH_PROMPT = PromptTemplate(
+    input_variables=["context", "questions", "company_name", "count"],
+    template="""
+            Based on the following information about {company_name}, please answer each of the {count} numbered questions.
 
             Company Information:
             {context}
 
-            Question: {question}
+            Questions:
+            {questions}
 
-            Please provide a comprehensive answer based on the available information. If the information is not sufficient, mention what additional research might be helpful.
+            Give a comprehensive answer to each question based on the available information. If the information is not sufficient, mention what additional research might be helpful.
+
+            IMPORTANT: You must respond with ONLY a valid JSON array of exactly {count} strings, the answers in the same order as the questions. No other text before or after.
             """
-        )
+)
+
+def parse_research_questions(raw_questions):
+    """Validate the questions field: a non-empty list of question strings; raises ValueError"""
+    if not isinstance(raw_questions, list) or not raw_questions:
+        raise ValueError("questions must be a non-empty list of strings")
+    if not all(isinstance(question, str) for question in raw_questions):
+        raise ValueError("questions must be a non-empty list of strings")
+    # Drop blanks and duplicates while keeping the requested order
+    questions = list(dict.fromkeys(question.strip() for question in raw_questions if question.strip()))
+    if not questions:
+        raise ValueError("questions cannot be empty")
+    if len(questions) > RESEARCH_MAX_QUESTIONS:
+        raise ValueError(f"At most {RESEARCH_MAX_QUESTIONS} questions can be asked per request")
+    return questions
+
+def parse_research_answer_mode(raw_mode):
+    """Validate answerMode: concurrent (one prompt per question, default) or batched (one prompt)"""
+    mode = (raw_mode or "concurrent").strip().lower()
+    if mode not in RESEARCH_ANSWER_MODES:
+        raise ValueError(f"answerMode must be one of: {', '.join(RESEARCH_ANSWER_MODES)}")
+    return mode
+
+def parse_batch_answers(content, count):
+    """Parse the batched research completion into `count` answers; raises ValueError"""
+    response_text = content.strip()
+    if response_text.startswith('```json'):
+        response_text = response_text[7:]
+    if response_text.endswith('```'):
+        response_text = response_text[:-3]
+    try:
+        answers = json.loads(response_text.strip())
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Failed to parse AI response as JSON: {str(e)}")
+    if not isinstance(answers, list) or len(answers) != count:
+        raise ValueError(f"Expected {count} answers")
+    if not all(isinstance(answer, str) and answer.strip() for answer in answers):
+        raise ValueError("Every answer must be a non-empty string")
+    return answers
+
+def format_company_batch_prompt(company_name, questions, shared_context):
+    """Return (formatted_prompt, cache inputs) for answering numbered questions in one call"""
+    numbered = "\n".join(f"{number}. {question}" for number, question in enumerate(questions, start=1))
+    inputs = {"context": shared_context, "questions": numbered, "company_name": company_name}
+    return COMPANY_RESEARCH_BATCH_PROMPT.format(**inputs, count=len(questions)), inputs
+
+def answer_company_questions_batched(company_name, questions, shared_context):
+    """Answer every question with one prompt over the shared context; raises ValueError if unusable"""
+    if not shared_context:
+        return [NO_COMPANY_INFO for _ in questions]
+    formatted_prompt, inputs = format_company_batch_prompt(company_name, questions, shared_context)
+    content = invoke_llm_cached(
+        "research-company",
+        "company_research_batch",
+        inputs,
+        formatted_prompt,
+        validate=lambda completion: parse_batch_answers(completion, len(questions))
+    )
+    return parse_batch_answers(content, len(questions))
 
-        # Format prompt and get response
-        formatted_prompt = rag_prompt.format(
-            context=context,
-            question=question,
-            company_name=company_name
-        )
+def answer_company_questions(company_name, questions, answer_mode="concurrent"):
+    """Answer several questions about an ingested company; returns (results, timings, answer_mode used)"""
+    started = time.perf_counter()
+    contexts, reports, shared_context = retrieve_company_contexts(
+        company_name, questions, RESEARCH_BATCH_CONTEXT_TOKENS if answer_mode == "batched" else None
+    )
+    retrieval_ms = round((time.perf_counter() - started) * 1000, 1)
+    results = [{"question": question, "retrieval": report} for question, report in zip(questions, reports)]
 
-        messages = [HumanMessage(content=formatted_prompt)]
-        response = llm.invoke(messages)
-        return response.content
+    started = time.perf_counter()
+    if answer_mode == "batched":
+        try:
+            answers = answer_company_questions_batched(company_name, questions, shared_context)
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+            for result, answer in zip(results, answers):
+                result.update(answer=answer, timingMs=elapsed_ms)
+        except ValueError as e:
+            print(f"Batched company research answer unusable ({e}), answering separately")
+            answer_mode = "concurrent"
+
+    if answer_mode == "concurrent":
+        def run_one(question, context):
+            question_started = time.perf_counter()
+            answer = answer_company_question(company_name, question, context)
+            return answer, round((time.perf_counter() - question_started) * 1000, 1)
+
+        futures = [analysis_executor.submit(run_one, question, context)
+                   for question, context in zip(questions, contexts)]
+        service_errors = []
+        for result, future in zip(results, futures):
+            try:
+                answer, elapsed_ms = future.result()
+                result.update(answer=answer, timingMs=elapsed_ms)
+            except LLMServiceError as e:
+                service_errors.append(e)
+                result["error"] = str(e)
+            except Exception as e:
+                result["error"] = f"Error querying company information: {str(e)}"
+        # Nothing to return: let the route report the provider error with its status
+        if service_errors and len(service_errors) == len(results):
+            raise service_errors[0]
 
-    except Exception as e:
-        return f"Error querying company information: {str(e)}"
+    return results, {
+        "retrieval": retrieval_ms,
+        "answers": round((time.perf_counter() - started) * 1000, 1)
+    }, answer_mode
 
 @app.route('/api/research-company', methods=['POST'])
 def research_company():
@@ -511,37 +1615,366 @@ def research_company():
         if not company_name:
             return jsonify({"error": "Company name cannot be empty"}), 400
 
-        # Search for company information
-        company_info = search_company_info(company_name)
-
-        if company_info.startswith("Error"):
-            return jsonify({"error": company_info}), 500
-
-        # Store in vector database
-        stored = store_company_info_in_vector_db(company_name, company_info)
-
-        if not stored:
-            return jsonify({"error": "Failed to store company information"}), 500
+        # Several questions share one ingest and retrieval pass
+        questions = None
+        if 'questions' in data:
+            try:
+                questions = parse_research_questions(data['questions'])
+                answer_mode = parse_research_answer_mode(data.get('answerMode'))
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+
+        # Search for and ingest company information (skipped while a fresh copy is stored)
+        started = time.perf_counter()
+        company_info, error = ensure_company_ingested(company_name)
+
+        if error:
+            return jsonify({"error": error}), 500
+
+        if questions is not None:
+            ingest_ms = round((time.perf_counter() - started) * 1000, 1)
+            results, timings, answer_mode = answer_company_questions(company_name, questions, answer_mode)
+            errors = [result for result in results if "error" in result]
+            if len(errors) == len(results):
+                return jsonify({"error": "All questions failed", "questions": results}), 500
+
+            return jsonify({
+                "success": True,
+                "company": company_name,
+                "questions": results,
+                "partial": bool(errors),
+                "answerMode": answer_mode,
+                "raw_info": company_info,
+                "timingsMs": {
+                    "ingest": ingest_ms,
+                    **timings,
+                    "total": round((time.perf_counter() - started) * 1000, 1)
+                }
+            })
 
         # Query the information to answer the question
-        answer = query_company_info(company_name, question)
+        retrieval = {}
+        answer = query_company_info(company_name, question, retrieval)
 
         return jsonify({
             "success": True,
             "company": company_name,
             "question": question,
             "answer": answer,
-            "raw_info": company_info
+            "raw_info": company_info,
+            "retrieval": retrieval
         })
 
+    except LLMServiceError as e:
+        return llm_error_response(e)
     except Exception as e:
         print(f"Company research error: {str(e)}")
         return jsonify({"error": f"Server error: {str(e)}"}), 500
 
+@app.route('/api/research-company/stream', methods=['POST'])
+def research_company_stream():
+    """Streaming (SSE) variant of /api/research-company"""
+    try:
+        data = request.get_json()
+
+        if not data or 'company' not in data:
+            return jsonify({"error": "Company name is required"}), 400
+
+        company_name = data['company'].strip()
+        question = data.get('question', 'Tell me about this company, its culture, recent news, and interview tips.')
+
+        if not company_name:
+            return jsonify({"error": "Company name cannot be empty"}), 400
+
+        if 'questions' in data:
+            return jsonify({"error": "Multiple questions are not streamed; use /api/research-company"}), 400
+
+        company_info, error = ensure_company_ingested(company_name)
+
+        if error:
+            return jsonify({"error": error}), 500
+
+        retrieval = {}
+        context = retrieve_company_context(company_name, question, retrieval)
+        if not context:
+            return jsonify({"error": NO_COMPANY_INFO}), 404
+
+        formatted_prompt = COMPANY_RESEARCH_PROMPT.format(
+            context=context,
+            question=question,
+            company_name=company_name
+        )
+
+        return sse_response(stream_llm_events(
+            "research-company",
+            "company_research",
+            {"context": context, "question": question, "company_name": company_name},
+            formatted_prompt,
+            metadata={"company": company_name, "question": question, "retrieval": retrieval}
+        ))
+
+    except Exception as e:
+        print(f"Company research error: {str(e)}")
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+
+# Asynchronous jobs: long analyses are queued, answered with a job ID and
+# processed by local workers that replay the synchronous endpoint
+JOB_QUEUE_ENABLED = os.getenv("JOB_QUEUE_ENABLED", "true").lower() == "true"
+JOB_WEBHOOK_ALLOWED_HOSTS = {
+    host.strip().lower() for host in os.getenv("JOB_WEBHOOK_ALLOWED_HOSTS", "").split(",") if host.strip()
+}
+
+def send_webhook(url, body, headers):
+    """POST a finished job to its webhook URL; returns the HTTP status"""
+    import requests
+    return requests.post(url, data=body, headers=headers, timeout=10).status_code
+
+def replay_view(view, path, **request_kwargs):
+    """Run a synchronous view in a synthetic request; returns (status_code, body, retry_after)"""
+    with app.test_request_context(path, method="POST", **request_kwargs):
+        response = app.make_response(view())
+    retry_after = response.headers.get("Retry-After")
+    return response.status_code, response.get_json(silent=True), float(retry_after) if retry_after else None
+
+def run_analyze_resume_job(payload, attachment):
+    form = MultiDict(payload["form"])
+    form.add("resume", (io.BytesIO(attachment), payload["filename"]))
+    return replay_view(analyze_resume, "/api/analyze-resume", data=form, content_type="multipart/form-data")
+
+def run_research_company_job(payload, attachment):
+    return replay_view(research_company, "/api/research-company", json=payload)
+
+job_queue = None
+if JOB_QUEUE_ENABLED:
+    job_queue = JobQueue(
+        path=os.getenv("JOB_QUEUE_PATH", "jobs.sqlite3"),
+        handlers={
+            "analyze-resume": run_analyze_resume_job,
+            "research-company": run_research_company_job
+        },
+        workers=int(os.getenv("JOB_WORKERS", 2)),
+        max_pending=int(os.getenv("JOB_MAX_PENDING", 1000)),
+        max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", 3)),
+        retry_delay=float(os.getenv("JOB_RETRY_DELAY_SECONDS", 5)),
+        result_ttl_seconds=int(os.getenv("JOB_RESULT_TTL_SECONDS", 86400)),
+        stale_after_seconds=int(os.getenv("JOB_STALE_AFTER_SECONDS", 900)),
+        webhook_sender=send_webhook,
+        webhook_secret=os.getenv("JOB_WEBHOOK_SECRET") or None
+    )
+
+def parse_webhook_url(raw_url):
+    """Validate an optional webhook URL against JOB_WEBHOOK_ALLOWED_HOSTS; raises ValueError"""
+    if not raw_url:
+        return None
+    if not JOB_WEBHOOK_ALLOWED_HOSTS:
+        raise ValueError("Webhooks are not enabled on this server")
+    parsed = urlparse(raw_url)
+    if parsed.scheme not in ("http", "https") or (parsed.hostname or "").lower() not in JOB_WEBHOOK_ALLOWED_HOSTS:
+        raise ValueError("webhookUrl must be an http(s) URL on an allowed host")
+    return raw_url
+
+def job_status(job):
+    """Client-facing view of a queued job"""
+    return {
+        "jobId": job["id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "priority": next(name for name, value in PRIORITIES.items() if value == job["priority"]),
+        "attempts": job["attempts"],
+        "queuePosition": job_queue.position(job),
+        "createdAt": job["created_at"],
+        "startedAt": job["started_at"],
+        "finishedAt": job["finished_at"],
+        "statusCode": job["status_code"],
+        "error": job["error"],
+        "webhookStatus": job["webhook_status"],
+        "statusUrl": f"/api/jobs/{job['id']}",
+        "resultUrl": f"/api/jobs/{job['id']}/result"
+    }
+
+def submit_job(kind, payload, attachment, raw_priority, raw_webhook_url):
+    """Queue a job; returns the 202 response, or a 400/503 error"""
+    if job_queue is None:
+        return jsonify({"error": "Job queue is disabled"}), 503
+    try:
+        priority = parse_priority(raw_priority)
+        webhook_url = parse_webhook_url(raw_webhook_url)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        job_id = job_queue.submit(kind, payload, attachment, priority, webhook_url)
+    except QueueFullError as e:
+        response = jsonify({"error": str(e)})
+        response.status_code = 503
+        response.headers["Retry-After"] = "5"
+        return response
+    response = jsonify({"success": True, **job_status(job_queue.get(job_id))})
+    response.status_code = 202
+    response.headers["Location"] = f"/api/jobs/{job_id}"
+    return response
+
+@app.route('/api/jobs/analyze-resume', methods=['POST'])
+def submit_analyze_resume_job():
+    """Queue /api/analyze-resume; accepts the same fields plus priority and webhookUrl"""
+    if 'resume' not in request.files:
+        return jsonify({"error": "Missing resume file"}), 400
+
+    if 'jobDescription' not in request.form:
+        return jsonify({"error": "Missing job description"}), 400
+
+    try:
+        resume_file = request.files['resume']
+        if not resume_file.filename.lower().endswith('.pdf'):
+            return jsonify({"error": "Only PDF files are supported"}), 400
+        try:
+            parse_analysis_mode(request.form.get('mode'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        # Everything else is validated when the worker replays the request
+        form = [(key, value) for key, value in request.form.items(multi=True)
+                if key not in ("priority", "webhookUrl")]
+        return submit_job(
+            "analyze-resume",
+            {"form": form, "filename": resume_file.filename},
+            read_upload(resume_file, PDF_MAX_BYTES),
+            request.form.get('priority'),
+            request.form.get('webhookUrl')
+        )
+
+    except PDFLimitError as e:
+        return jsonify({"error": str(e)}), 413
+    except Exception as e:
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+
+@app.route('/api/jobs/research-company', methods=['POST'])
+def submit_research_company_job():
+    """Queue /api/research-company; accepts the same JSON plus priority and webhookUrl"""
+    try:
+        data = request.get_json()
+
+        if not data or not str(data.get('company', '')).strip():
+            return jsonify({"error": "Company name is required"}), 400
+
+        payload = {key: value for key, value in data.items() if key not in ("priority", "webhookUrl")}
+        return submit_job("research-company", payload, None, data.get('priority'), data.get('webhookUrl'))
+
+    except Exception as e:
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status of a queued job, including its result once finished"""
+    job = job_queue.get(job_id) if job_queue else None
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify({"success": True, **job_status(job), "result": job["result"]})
+
+@app.route('/api/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    """The finished job's response with its original status code, or 202 while pending"""
+    job = job_queue.get(job_id) if job_queue else None
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if job["status"] in ("queued", "running"):
+        response = jsonify({"success": True, **job_status(job)})
+        response.status_code = 202
+        response.headers["Retry-After"] = "2"
+        return response
+    if job["status"] == "cancelled":
+        return jsonify({"error": "Job was cancelled"}), 410
+    return jsonify(job["result"]), job["status_code"]
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Cancel a job that has not started yet"""
+    job = job_queue.get(job_id) if job_queue else None
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if not job_queue.cancel(job_id):
+        return jsonify({"error": f"Job is already {job_queue.get(job_id)['status']}"}), 409
+    return jsonify({"success": True, **job_status(job_queue.get(job_id))})
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({"status": "healthy", "service": "resume-analyzer-api"})
+    return jsonify({
+        "status": "healthy",
+        "service": "resume-analyzer-api",
+        "pdfCache": pdf_text_cache.stats(),
+        "llmClient": llm.stats() if isinstance(llm, ResilientLLM) else None,
+        "singleFlight": llm_single_flight.stats(),
+        "compaction": compaction_tracker.stats(),
+        "pdfExtraction": get_pdf_extractor().stats() if "pdf_extractor" in _components else None,
+        "llmCache": llm_response_cache.stats() if llm_response_cache else None,
+        "interviewGeneration": interview_generation_tracker.stats(),
+        "questionBank": question_bank.stats() if question_bank else None,
+        "jobQueue": job_queue.stats() if job_queue else None,
+        "process": {"pid": os.getpid(), "multiprocessMode": MULTIPROCESS_MODE},
+        "startup": {
+            "moduleImportMs": module_import_ms,
+            "initializedComponents": sorted(_components),
+            "componentInitMs": dict(component_init_timings)
+        }
+    })
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus text-format metrics: request counts, latency histograms, stage timings, LLM I/O"""
+    return Response(metrics.registry.render(), content_type=metrics.registry.CONTENT_TYPE)
+
+def warm_up():
+    """Create every heavy component ahead of the first request"""
+    for loader in (get_llm, get_chroma_client, get_local_vector_index, get_pdf_extractor):
+        try:
+            loader()
+        except Exception as e:
+            print(f"Warm-up of {loader.__name__} failed: {e}")
+    try:
+        get_pdf_extractor().warm_up()
+    except Exception as e:
+        print(f"Warm-up of PDF workers failed: {e}")
+
+def start_warm_up_thread():
+    """Run warm_up() in a daemon thread so startup is not blocked"""
+    thread = threading.Thread(target=warm_up, name="warm-up", daemon=True)
+    thread.start()
+    return thread
+
+def preload_modules():
+    """Import heavy libraries without creating clients, threads or connections.
+
+    Called in a preloading server master so forked workers share these pages
+    copy-on-write; clients (gRPC channels especially) must be created after fork.
+    """
+    for module_name in ("numpy", "fitz", "vector_index", "job_ranking", "langchain_google_genai"):
+        try:
+            importlib.import_module(module_name)
+        except Exception as e:
+            print(f"Preload of {module_name} failed: {e}")
+
+def close_connections():
+    """Close this thread's SQLite connections so none is inherited across fork()"""
+    stores = [company_store, question_bank, job_queue, getattr(llm_response_cache, "backend", None)]
+    if "local_vector_index" in _components:
+        stores.append(_components["local_vector_index"])
+    for store in stores:
+        if hasattr(store, "close"):
+            store.close()
+
+def start_background_workers():
+    """Start this process's background threads: the optional warm-up and the job queue workers.
+
+    Called by server entrypoints only (__main__, async_services, gunicorn post_fork), so
+    scripts importing this module never claim and run persisted jobs.
+    """
+    if os.getenv("WARMUP_ON_START", "false").lower() == "true":
+        start_warm_up_thread()
+    # Queued jobs (including those persisted before a restart) are picked up as soon as the app loads
+    if job_queue is not None:
+        job_queue.start()
+
+module_import_ms = round((time.perf_counter() - _module_import_started) * 1000, 1)
 
 if __name__ == '__main__':
     # Get port from environment variable or use default
@@ -550,4 +1983,8 @@ if __name__ == '__main__':
     # Run in production mode if not in debug
     debug_mode = os.environ.get('NODE_ENV') != 'production'
 
+    # The debug reloader's watcher process only restarts the server; the child serves
+    if not debug_mode or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_workers()
+
     app.run(host='0.0.0.0', port=port, debug=debug_mode)
@@ -0,0 +1,119 @@
+import asyncio
+import hashlib
+import threading
+
+
+def flight_key(*parts):
+    """Stable key for a call, e.g. (endpoint, model, temperature, formatted prompt)"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Run one call per key at a time; concurrent duplicates wait and share its result"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executed = 0
+        self.coalesced = 0
+        self.failures = 0
+
+    def do(self, key, fn):
+        """Return (result, shared); shared is True when another caller did the work"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            with self._lock:
+                self.failures += 1
+            raise
+        finally:
+            # Forget the key before waking waiters so later callers start a fresh call
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def stats(self):
+        with self._lock:
+            return {
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+                "failures": self.failures,
+                "inFlight": len(self._calls)
+            }
+
+
+class AsyncSingleFlight:
+    """Event-loop counterpart of SingleFlight for coroutine calls"""
+
+    def __init__(self):
+        self._calls = {}
+        self.executed = 0
+        self.coalesced = 0
+        self.failures = 0
+
+    async def do(self, key, coro_factory):
+        """Await coro_factory() once per key; returns (result, shared)"""
+        future = self._calls.get(key)
+        if future is not None:
+            self.coalesced += 1
+            # shield() so one cancelled waiter does not cancel the shared call
+            return await asyncio.shield(future), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.executed += 1
+        try:
+            result = await coro_factory()
+        except BaseException as e:
+            self.failures += 1
+            if isinstance(e, Exception):
+                future.set_exception(e)
+                # Waiters re-raise it; mark it retrieved so the leader alone is not warned about
+                future.exception()
+            else:
+                future.cancel()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self._calls[key]
+
+    def stats(self):
+        return {
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "failures": self.failures,
+            "inFlight": len(self._calls)
+        }
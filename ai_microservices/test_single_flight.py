@@ -0,0 +1,87 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from fake_llm import FakeLLM
+from single_flight import AsyncSingleFlight, SingleFlight, flight_key
+
+CALLERS = 8
+KEY = flight_key("research-company", "fake-llm", 0.0, "What is the culture like?")
+
+
+def run_concurrently(flight, llm):
+    # The barrier releases every caller together, well inside the fake model's latency
+    barrier = threading.Barrier(CALLERS)
+
+    def call():
+        barrier.wait()
+        try:
+            return flight.do(KEY, lambda: llm.invoke("What is the culture like?").content)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=CALLERS) as pool:
+        return list(pool.map(lambda _: call(), range(CALLERS)))
+
+
+def test_concurrent_identical_calls_reach_the_model_once():
+    llm = FakeLLM(responses="Shared answer", latency=0.5)
+    flight = SingleFlight()
+
+    outcomes = run_concurrently(flight, llm)
+
+    assert llm.calls == 1
+    assert [result for result, _ in outcomes] == ["Shared answer"] * CALLERS
+    assert sum(1 for _, shared in outcomes if not shared) == 1
+    assert flight.stats() == {"executed": 1, "coalesced": CALLERS - 1, "failures": 0, "inFlight": 0}
+
+
+def test_error_reaches_every_waiter():
+    llm = FakeLLM(latency=0.5, errors=[RuntimeError("provider down")])
+    flight = SingleFlight()
+
+    outcomes = run_concurrently(flight, llm)
+
+    assert llm.calls == 1
+    assert all(isinstance(outcome, RuntimeError) and str(outcome) == "provider down" for outcome in outcomes)
+    assert flight.stats()["failures"] == 1
+
+    # The failed call is forgotten: the next caller starts a fresh one
+    assert flight.do(KEY, lambda: llm.invoke("again").content) == ("Fake analysis response", False)
+    assert llm.calls == 2
+
+
+def test_async_concurrent_identical_calls_reach_the_model_once():
+    llm = FakeLLM(responses="Shared answer", latency=0.2)
+    flight = AsyncSingleFlight()
+
+    async def call():
+        response = await llm.ainvoke("What is the culture like?")
+        return response.content
+
+    async def main():
+        return await asyncio.gather(*(flight.do(KEY, call) for _ in range(CALLERS)))
+
+    outcomes = asyncio.run(main())
+
+    assert llm.calls == 1
+    assert [result for result, _ in outcomes] == ["Shared answer"] * CALLERS
+    assert flight.stats()["coalesced"] == CALLERS - 1
+
+
+def test_async_error_reaches_every_waiter():
+    llm = FakeLLM(latency=0.2, errors=[RuntimeError("provider down")])
+    flight = AsyncSingleFlight()
+
+    async def call():
+        return (await llm.ainvoke("What is the culture like?")).content
+
+    async def main():
+        return await asyncio.gather(*(flight.do(KEY, call) for _ in range(CALLERS)), return_exceptions=True)
+
+    outcomes = asyncio.run(main())
+
+    assert llm.calls == 1
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+    assert flight.stats()["failures"] == 1
+    assert flight.stats()["inFlight"] == 0
@@ -0,0 +1,63 @@
+from llm_text import estimate_tokens
+from text_compaction import clean_text, compact_job_description, compact_resume
+
+SENTENCE = "We are looking for a backend engineer who enjoys building reliable Python services. "
+
+
+def test_single_line_job_description_is_cut_not_dropped():
+    job_description = (SENTENCE * 70).strip()
+    assert "\n" not in job_description and len(job_description) > 5000
+
+    compacted = compact_job_description(job_description, 800)
+
+    assert compacted
+    assert estimate_tokens(compacted) <= 800
+    assert job_description.startswith(compacted)
+    # Cut at a sentence end, not mid-word
+    assert compacted.endswith("services.")
+
+
+def test_job_description_is_never_empty():
+    assert compact_job_description("Supercalifragilisticexpialidocious " * 50, 1)
+
+
+def test_single_line_section_is_trimmed_not_dropped():
+    resume = "\n".join([
+        "Jane Doe",
+        "jane@example.com",
+        "Skills",
+        "Python, Flask, SQL, Docker, Kubernetes",
+        "Experience",
+        "Built and operated Python services for payments. " * 60,
+    ])
+
+    compacted, report = compact_resume(resume, "Python backend engineer with Flask and SQL", 300)
+
+    assert "experience" in report["trimmed"]
+    assert "experience" not in report["dropped"]
+    assert "Built and operated Python services" in compacted
+    assert estimate_tokens(compacted) <= 300
+
+
+def test_clean_text_keeps_short_repeated_lines():
+    assert clean_text("Skills\nPython\nProjects\nPython") == "Skills\nPython\nProjects\nPython"
+    resume = "Software Engineer\nAcme, 2019-2021\n\nSoftware Engineer\nGlobex, 2021-2024"
+    assert clean_text(resume).count("Software Engineer") == 2
+
+
+def test_clean_text_drops_page_boilerplate():
+    footer = "Jane Doe | jane@example.com | +1 555 123 4567 | Portland, OR"
+    text = f"Experience\nBuilt things\n{footer}\n2\nMore things\n{footer}\nDone\nDone"
+    assert clean_text(text) == f"Experience\nBuilt things\n{footer}\nMore things\nDone"
+
+
+def test_clean_text_keeps_bullets_repeated_under_two_jobs():
+    bullet = "Led migration of the billing platform to Kubernetes and Terraform"
+    resume = f"Experience\nAcme, 2019-2021\n{bullet}\nShipped the API\n\nGlobex, 2021-2024\n{bullet}\nMentored engineers"
+    assert clean_text(resume).count(bullet) == 2
+
+
+def test_clean_text_drops_headers_repeated_at_form_feeds():
+    header = "Jane Doe - Senior Software Engineer - Curriculum Vitae"
+    text = f"{header}\nSummary\nBuilds services\n\f{header}\nExperience\nAcme\n\f{header}\nEducation\nBSc"
+    assert clean_text(text) == f"{header}\nSummary\nBuilds services\nExperience\nAcme\nEducation\nBSc"
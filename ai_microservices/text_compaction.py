@@ -0,0 +1,269 @@
+import bisect
+import math
+import re
+import threading
+
+from llm_text import estimate_tokens
+
+# Heading spellings mapped to a canonical section name
+SECTION_HEADINGS = {
+    "summary": "summary",
+    "professional summary": "summary",
+    "profile": "summary",
+    "about me": "summary",
+    "objective": "summary",
+    "career objective": "summary",
+    "experience": "experience",
+    "work experience": "experience",
+    "professional experience": "experience",
+    "employment": "experience",
+    "employment history": "experience",
+    "work history": "experience",
+    "internships": "experience",
+    "skills": "skills",
+    "technical skills": "skills",
+    "core competencies": "skills",
+    "technologies": "skills",
+    "tools": "skills",
+    "education": "education",
+    "academic background": "education",
+    "projects": "projects",
+    "personal projects": "projects",
+    "key projects": "projects",
+    "certifications": "certifications",
+    "licenses and certifications": "certifications",
+    "awards": "awards",
+    "honors and awards": "awards",
+    "achievements": "awards",
+    "publications": "publications",
+    "volunteer": "volunteer",
+    "volunteering": "volunteer",
+    "volunteer experience": "volunteer",
+    "languages": "languages",
+    "interests": "interests",
+    "hobbies": "interests",
+    "references": "references",
+}
+
+_SPACE_RE = re.compile(r"[ \t\u00a0\u200b]+")
+_HEADING_STRIP_RE = re.compile(r"[^a-z& ]+")
+_PAGE_NUMBER_RE = re.compile(r"^(page\s*)?\d+(\s*(of|/)\s*\d+)?$", re.IGNORECASE)
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#]*")
+_SENTENCE_END_RE = re.compile(r"[.!?;](?=\s)")
+
+# A line repeated only within this many lines of a page break (form feed or page
+# number) is a page header or footer
+BOILERPLATE_EDGE_LINES = 2
+
+# Very common words that should not count as overlap with the job description
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or our the to we will with you your "
+    "this that who work working team years year experience ability strong".split()
+)
+
+
+def _is_page_break(line):
+    return line == "\f" or bool(_PAGE_NUMBER_RE.match(line))
+
+
+def _page_boilerplate(lines):
+    """Keys of lines that repeat and only ever appear next to a page break (or, once the
+    text has page breaks, at its start or end)"""
+    content = [i for i, line in enumerate(lines) if line and not _is_page_break(line)]
+    edges = set()
+    for index, line in enumerate(lines):
+        if line and _is_page_break(line):
+            position = bisect.bisect_left(content, index)
+            edges.update(content[max(0, position - BOILERPLATE_EDGE_LINES):position + BOILERPLATE_EDGE_LINES])
+    if edges:
+        edges.update(content[:BOILERPLATE_EDGE_LINES] + content[-BOILERPLATE_EDGE_LINES:])
+
+    counts, edge_counts = {}, {}
+    for index in content:
+        key = lines[index].lower()
+        counts[key] = counts.get(key, 0) + 1
+        if index in edges:
+            edge_counts[key] = edge_counts.get(key, 0) + 1
+    return {key for key, count in counts.items() if count > 1 and edge_counts.get(key) == count}
+
+
+def clean_text(text):
+    """Collapse whitespace and drop page numbers and repeated lines (headers, footers)"""
+    # Form feeds mark page breaks; keep one "\f" line between pages
+    stripped = []
+    for page_number, page in enumerate(text.split("\f")):
+        if page_number:
+            stripped.append("\f")
+        stripped.extend(_SPACE_RE.sub(" ", raw_line).strip() for raw_line in page.splitlines())
+    boilerplate = _page_boilerplate(stripped)
+    lines = []
+    seen = set()
+    previous_key = None
+    previous_blank = True
+    for line in stripped:
+        if line == "\f":
+            continue
+        if not line:
+            if not previous_blank:
+                lines.append("")
+            previous_blank = True
+            continue
+        if _PAGE_NUMBER_RE.match(line):
+            continue
+        key = line.lower()
+        # Back-to-back copies are extraction noise. Elsewhere only lines repeated at page
+        # breaks are boilerplate: the same bullet under two jobs is content
+        if key == previous_key or (key in seen and key in boilerplate):
+            continue
+        seen.add(key)
+        previous_key = key
+        lines.append(line)
+        previous_blank = False
+    return "\n".join(lines).strip()
+
+
+def _heading_name(line):
+    if len(line) > 40:
+        return None
+    key = _HEADING_STRIP_RE.sub("", line.lower().replace("&", " and ")).strip()
+    key = " ".join(key.split())
+    return SECTION_HEADINGS.get(key)
+
+
+def split_sections(text):
+    """Split cleaned resume text into [(section_name, text)]; text before the first heading is 'header'"""
+    sections = [["header", []]]
+    for line in text.splitlines():
+        name = _heading_name(line) if line else None
+        if name is not None:
+            sections.append([name, [line]])
+        else:
+            sections[-1][1].append(line)
+    return [(name, "\n".join(lines).strip()) for name, lines in sections if "\n".join(lines).strip()]
+
+
+def _terms(text):
+    return [word for word in _WORD_RE.findall(text.lower()) if word not in _STOPWORDS]
+
+
+def relevance(section_text, job_terms):
+    """Share of a section's terms that appear in the job description, damped for length"""
+    terms = _terms(section_text)
+    if not terms or not job_terms:
+        return 0.0
+    hits = sum(1 for term in terms if term in job_terms)
+    return hits / math.sqrt(len(terms))
+
+
+def _cut_line(line, max_tokens):
+    """Shorten a line to about max_tokens, at a sentence end if one is near, else at a word boundary"""
+    max_chars = max_tokens * 4
+    if len(line) <= max_chars:
+        return line
+    head = line[:max_chars + 1]
+    sentence_ends = [match.end() for match in _SENTENCE_END_RE.finditer(head)]
+    if sentence_ends and sentence_ends[-1] >= max_chars // 2:
+        return head[:sentence_ends[-1]]
+    space = head.rfind(" ")
+    return (head[:space] if space > 0 else head[:max_chars]).rstrip()
+
+
+def _trim_to_tokens(text, max_tokens):
+    # Keep whole lines from the top of the section while they fit; the first line
+    # that does not fit is cut short rather than dropped (often the text is one long line)
+    kept, used = [], 0
+    for line in text.splitlines():
+        cost = estimate_tokens(line) + 1
+        if used + cost > max_tokens:
+            remaining = max_tokens - used - 1
+            piece = _cut_line(line, remaining) if remaining > 0 else ""
+            if piece:
+                kept.append(piece)
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept).strip()
+
+
+def compact_resume(text, job_description, max_tokens):
+    """Clean the resume and keep its most job-relevant sections within max_tokens; returns (text, sections)"""
+    cleaned = clean_text(text)
+    if not max_tokens or estimate_tokens(cleaned) <= max_tokens:
+        return cleaned, {"kept": [name for name, _ in split_sections(cleaned)], "trimmed": [], "dropped": []}
+
+    sections = split_sections(cleaned)
+    job_terms = set(_terms(job_description))
+    # The header (name, contact, headline) always goes first; the rest compete on relevance
+    order = sorted(
+        range(len(sections)),
+        key=lambda i: (sections[i][0] != "header", -relevance(sections[i][1], job_terms))
+    )
+
+    budget = max_tokens
+    chosen = {}
+    report = {"kept": [], "trimmed": [], "dropped": []}
+    # First pass keeps every section that fits whole, so a long section cannot
+    # crowd out short, relevant ones such as skills
+    deferred = []
+    for i in order:
+        cost = estimate_tokens(sections[i][1]) + 1
+        if cost <= budget:
+            chosen[i] = sections[i][1]
+            budget -= cost
+            report["kept"].append(sections[i][0])
+        else:
+            deferred.append(i)
+
+    # Second pass trims the sections that did not fit into whatever budget is left
+    for i in deferred:
+        name, section_text = sections[i]
+        trimmed = _trim_to_tokens(section_text, budget)
+        if trimmed and (name == "header" or "\n" in trimmed):
+            # Worth keeping only if more than the heading line survives
+            chosen[i] = trimmed
+            budget -= sum(estimate_tokens(line) + 1 for line in trimmed.splitlines())
+            report["trimmed"].append(name)
+        else:
+            report["dropped"].append(name)
+
+    # Original order reads more naturally to the model than relevance order
+    return "\n\n".join(chosen[i] for i in sorted(chosen)), report
+
+
+def compact_job_description(text, max_tokens):
+    """Clean the job description and cut it to max_tokens at a line, sentence or word boundary"""
+    cleaned = clean_text(text)
+    if not max_tokens or estimate_tokens(cleaned) <= max_tokens:
+        return cleaned
+    # Never hand the model an empty job description, however small the budget
+    return _trim_to_tokens(cleaned, max_tokens) or _cut_line(cleaned.splitlines()[0], max(1, max_tokens))
+
+
+class CompactionTracker:
+    """Aggregate prompt-input tokens before and after compaction"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.documents = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self.compaction_ms = 0.0
+
+    def record(self, report):
+        with self._lock:
+            self.documents += 1
+            self.tokens_before += report["tokensBefore"]
+            self.tokens_after += report["tokensAfter"]
+            self.compaction_ms += report["compactionMs"]
+
+    def stats(self):
+        with self._lock:
+            saved = self.tokens_before - self.tokens_after
+            return {
+                "documents": self.documents,
+                "tokensBefore": self.tokens_before,
+                "tokensAfter": self.tokens_after,
+                "tokensSaved": saved,
+                "savedPercent": round(saved * 100 / self.tokens_before, 1) if self.tokens_before else 0.0,
+                "avgCompactionMs": round(self.compaction_ms / self.documents, 2) if self.documents else 0.0
+            }
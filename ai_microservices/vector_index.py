@@ -0,0 +1,344 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.\-]*")
+
+
+def tokenize(text):
+    """Lowercase word tokens, keeping things like c++, c# and node.js intact"""
+    return [token.rstrip(".-") for token in _TOKEN_RE.findall(text.lower())]
+
+
+class HashingEmbedder:
+    """Dependency-free embedder: hashed unigram and bigram counts, L2-normalized"""
+
+    # Bound on memoized feature hashes; vocabularies repeat heavily across documents
+    BUCKET_CACHE_SIZE = 200000
+
+    def __init__(self, dim=1024):
+        self.dim = dim
+        self._buckets = {}
+
+    def _bucket(self, feature):
+        bucket = self._buckets.get(feature)
+        if bucket is not None:
+            return bucket
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        # The top bit picks the sign so collisions tend to cancel out
+        bucket = (value % self.dim, 1.0 if value >> 63 else -1.0)
+        if len(self._buckets) >= self.BUCKET_CACHE_SIZE:
+            self._buckets.clear()
+        self._buckets[feature] = bucket
+        return bucket
+
+    def count_matrix(self, texts, signed=True):
+        """Hashed unigram and bigram counts as an (n, dim) float32 matrix"""
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            for feature in features:
+                index, sign = self._bucket(feature)
+                matrix[row, index] += sign if signed else 1.0
+        return matrix
+
+    def embed(self, texts):
+        """Embed a list of texts into an (n, dim) float32 matrix"""
+        matrix = self.count_matrix(texts)
+        # Sublinear term frequency, then unit length so dot product == cosine
+        matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+
+def top_k_results(embeddings, query_vectors, n_results, ids, documents, metadatas):
+    """Top-k cosine matches of each query among candidate rows, shaped like a ChromaDB query result"""
+    results = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+    if not ids:
+        for values in results.values():
+            values.extend([] for _ in query_vectors)
+        return results
+
+    # (candidates, queries): one column of scores per query
+    all_scores = embeddings @ query_vectors.T
+    k = min(n_results, len(ids))
+    for column in range(len(query_vectors)):
+        scores = all_scores[:, column]
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        results["ids"].append([ids[i] for i in top])
+        results["documents"].append([documents[i] for i in top])
+        results["metadatas"].append([metadatas[i] for i in top])
+        results["distances"].append([float(1.0 - scores[i]) for i in top])
+    return results
+
+
+class LocalVectorIndex:
+    """In-process vector index with metadata filtering and top-k cosine search"""
+
+    def __init__(self, embedder=None, path=None):
+        self.embedder = embedder or HashingEmbedder()
+        self.path = path
+        self._lock = threading.Lock()
+        # Serialises whole saves so concurrent ones cannot interleave the two file replaces
+        self._save_lock = threading.Lock()
+        self.embeddings = np.zeros((0, self.embedder.dim), dtype=np.float32)
+        self.documents = []
+        self.metadatas = []
+        self.ids = []
+
+        if self.path:
+            self.load()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, documents, metadatas, ids, replace_where=None):
+        """Embed and add a batch of documents; existing ids (and replace_where matches) are replaced"""
+        vectors = self.embedder.embed(documents)
+        replaced = set(ids)
+        with self._lock:
+            self._delete_where(
+                lambda index: self.ids[index] in replaced
+                or (replace_where is not None and self._matches(self.metadatas[index], replace_where))
+            )
+            self.embeddings = np.vstack([self.embeddings, vectors])
+            self.documents.extend(documents)
+            self.metadatas.extend(metadatas)
+            self.ids.extend(ids)
+
+    def delete(self, where):
+        """Delete every entry whose metadata matches all key/value pairs in where"""
+        with self._lock:
+            self._delete_where(lambda index: self._matches(self.metadatas[index], where))
+
+    def get(self, where, limit=None):
+        """Return ids, documents and metadatas matching a metadata filter"""
+        # add() and delete() swap these lists, so positions are only valid under the lock
+        with self._lock:
+            matches = [i for i in range(len(self.ids)) if self._matches(self.metadatas[i], where)]
+            if limit is not None:
+                matches = matches[:limit]
+            return {
+                "ids": [self.ids[i] for i in matches],
+                "documents": [self.documents[i] for i in matches],
+                "metadatas": [self.metadatas[i] for i in matches]
+            }
+
+    def query(self, query_text, where=None, n_results=3):
+        """Top-k cosine search, shaped like a ChromaDB query result"""
+        return self.query_many([query_text], where, n_results)
+
+    def query_many(self, query_texts, where=None, n_results=3):
+        """Top-k cosine search for several queries with one embedding pass and one matrix product"""
+        query_vectors = self.embedder.embed(query_texts)
+        with self._lock:
+            candidates = [i for i in range(len(self.ids)) if not where or self._matches(self.metadatas[i], where)]
+            return top_k_results(
+                self.embeddings[np.array(candidates, dtype=np.int64)], query_vectors, n_results,
+                [self.ids[i] for i in candidates],
+                [self.documents[i] for i in candidates],
+                [self.metadatas[i] for i in candidates]
+            )
+
+    def save(self):
+        """Write embeddings (.npy) and metadata (.json) atomically to self.path"""
+        if not self.path:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        with self._save_lock:
+            with self._lock:
+                embeddings = np.array(self.embeddings, copy=True)
+                # Release the memory map from load(): Windows cannot replace a file that is still mapped
+                self.embeddings = embeddings
+                records = {
+                    "dim": self.embedder.dim,
+                    "ids": list(self.ids),
+                    "documents": list(self.documents),
+                    "metadatas": list(self.metadatas)
+                }
+
+            # Writes happen outside self._lock so searches and adds are not blocked meanwhile
+            fd, tmp_npy = tempfile.mkstemp(dir=self.path, suffix=".npy")
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, embeddings)
+            fd, tmp_json = tempfile.mkstemp(dir=self.path, suffix=".json")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(records, f)
+            os.replace(tmp_npy, os.path.join(self.path, "embeddings.npy"))
+            os.replace(tmp_json, os.path.join(self.path, "records.json"))
+
+    def load(self):
+        """Load a saved index, memory-mapping the embedding matrix"""
+        npy_path = os.path.join(self.path, "embeddings.npy")
+        json_path = os.path.join(self.path, "records.json")
+        if not (os.path.exists(npy_path) and os.path.exists(json_path)):
+            return False
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                records = json.load(f)
+            if records.get("dim") != self.embedder.dim:
+                print("Local vector index dimension changed, starting empty")
+                return False
+            embeddings = np.load(npy_path, mmap_mode="r")
+            if embeddings.shape[0] != len(records["ids"]):
+                print("Local vector index files are out of sync, starting empty")
+                return False
+        except (OSError, ValueError) as e:
+            print(f"Failed to load local vector index: {e}")
+            return False
+
+        with self._lock:
+            self.embeddings = embeddings
+            self.ids = records["ids"]
+            self.documents = records["documents"]
+            self.metadatas = records["metadatas"]
+        return True
+
+    @staticmethod
+    def _matches(metadata, where):
+        return all(metadata.get(key) == value for key, value in where.items())
+
+    def _delete_where(self, predicate):
+        # Caller must hold the lock
+        keep = [i for i in range(len(self.ids)) if not predicate(i)]
+        if len(keep) == len(self.ids):
+            return
+        self.embeddings = self.embeddings[keep]
+        self.documents = [self.documents[i] for i in keep]
+        self.metadatas = [self.metadatas[i] for i in keep]
+        self.ids = [self.ids[i] for i in keep]
+
+
+class SQLiteVectorIndex:
+    """Vector index stored in SQLite, so several server processes share one copy.
+
+    Same interface as LocalVectorIndex. Every write is its own transaction
+    (BEGIN IMMEDIATE), so concurrent ingests from different processes
+    serialize instead of overwriting each other's files. Metadata fields
+    listed in indexed_fields get an index for filtered queries.
+    """
+
+    def __init__(self, embedder=None, path="vector_index.sqlite3", indexed_fields=("company",)):
+        self.embedder = embedder or HashingEmbedder()
+        self.path = path
+        self._local = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        conn = self._connect()
+        conn.execute("CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "id TEXT PRIMARY KEY, document TEXT NOT NULL, metadata TEXT NOT NULL, embedding BLOB NOT NULL)"
+        )
+        for field in indexed_fields:
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS entries_{field} ON entries (json_extract(metadata, '$.{field}'))"
+            )
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("SELECT value FROM settings WHERE name = 'dim'").fetchone()
+        if row is not None and int(row[0]) != self.embedder.dim:
+            print("SQLite vector index dimension changed, starting empty")
+            conn.execute("DELETE FROM entries")
+        conn.execute("INSERT OR REPLACE INTO settings VALUES ('dim', ?)", (str(self.embedder.dim),))
+        conn.execute("COMMIT")
+
+    def _connect(self):
+        # sqlite3 connections must not be shared across threads, nor with a forked child
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def close(self):
+        """Close this thread's connection, e.g. in a server master before it forks workers"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            conn.close()
+        self._local.conn = None
+
+    @staticmethod
+    def _where_sql(where):
+        if not where:
+            return "", ()
+        clauses = [f"json_extract(metadata, '$.{key}') = ?" for key in where]
+        return " WHERE " + " AND ".join(clauses), tuple(where.values())
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def add(self, documents, metadatas, ids, replace_where=None):
+        """Embed and add a batch of documents; existing ids (and replace_where matches) are replaced"""
+        vectors = self.embedder.embed(documents).astype(np.float32)
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if replace_where is not None:
+                clause, params = self._where_sql(replace_where)
+                conn.execute("DELETE FROM entries" + clause, params)
+            conn.executemany(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                [(entry_id, document, json.dumps(metadata), vector.tobytes())
+                 for entry_id, document, metadata, vector in zip(ids, documents, metadatas, vectors)]
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def delete(self, where):
+        """Delete every entry whose metadata matches all key/value pairs in where"""
+        clause, params = self._where_sql(where)
+        self._connect().execute("DELETE FROM entries" + clause, params)
+
+    def get(self, where, limit=None):
+        """Return ids, documents and metadatas matching a metadata filter"""
+        clause, params = self._where_sql(where)
+        sql = "SELECT id, document, metadata FROM entries" + clause + " ORDER BY rowid"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        rows = self._connect().execute(sql, params).fetchall()
+        return {
+            "ids": [row[0] for row in rows],
+            "documents": [row[1] for row in rows],
+            "metadatas": [json.loads(row[2]) for row in rows]
+        }
+
+    def query(self, query_text, where=None, n_results=3):
+        """Top-k cosine search, shaped like a ChromaDB query result"""
+        return self.query_many([query_text], where, n_results)
+
+    def query_many(self, query_texts, where=None, n_results=3):
+        """Top-k cosine search for several queries over the matching rows"""
+        query_vectors = self.embedder.embed(query_texts)
+        clause, params = self._where_sql(where)
+        rows = self._connect().execute(
+            "SELECT id, document, metadata, embedding FROM entries" + clause + " ORDER BY rowid", params
+        ).fetchall()
+        embeddings = np.array(
+            [np.frombuffer(row[3], dtype=np.float32) for row in rows], dtype=np.float32
+        ).reshape(len(rows), self.embedder.dim)
+        return top_k_results(
+            embeddings, query_vectors, n_results,
+            [row[0] for row in rows],
+            [row[1] for row in rows],
+            [json.loads(row[2]) for row in rows]
+        )
+
+    def save(self):
+        # Writes are committed as they happen
+        pass
@@ -15,13 +15,15 @@ const aiApi = axios.create({
 export const analyzeResume = async (
   resumeFile,
   jobDescription,
-  analysisType = "general"
+  analysisType = "general",
+  mode = "llm" // "fast" scores keywords/percentage locally, "hybrid" feeds that score to the LLM
 ) => {
   try {
     const formData = new FormData();
     formData.append("resume", resumeFile);
     formData.append("jobDescription", jobDescription);
     formData.append("analysisType", analysisType);
+    formData.append("mode", mode);
 
     const response = await aiApi.post("/analyze-resume", formData, {
       headers: {
@@ -36,6 +38,123 @@ export const analyzeResume = async (
   }
 };
 
+// Run several analysis types on one upload (the PDF is parsed once)
+export const analyzeResumeBatch = async (
+  resumeFile,
+  jobDescription,
+  analysisTypes = ["general", "skills", "keywords", "percentage"]
+) => {
+  try {
+    const formData = new FormData();
+    formData.append("resume", resumeFile);
+    formData.append("jobDescription", jobDescription);
+    formData.append("analysisTypes", analysisTypes.join(","));
+
+    const response = await aiApi.post("/analyze-resume", formData, {
+      headers: {
+        "Content-Type": "multipart/form-data",
+      },
+    });
+
+    return response.data;
+  } catch (error) {
+    console.error("Batch resume analysis error:", error);
+    throw error;
+  }
+};
+
+// Rank one resume against many saved job applications (LLM runs only on the top topK)
+export const rankJobs = async (resumeFile, jobs, topK = 0) => {
+  try {
+    const formData = new FormData();
+    formData.append("resume", resumeFile);
+    formData.append(
+      "jobs",
+      JSON.stringify(
+        jobs.map(({ _id, company, position, jobDescription }) => ({
+          _id,
+          company,
+          position,
+          jobDescription,
+        }))
+      )
+    );
+    formData.append("topK", topK);
+
+    const response = await aiApi.post("/rank-jobs", formData, {
+      headers: {
+        "Content-Type": "multipart/form-data",
+      },
+    });
+
+    return response.data;
+  } catch (error) {
+    console.error("Job ranking error:", error);
+    throw error;
+  }
+};
+
+// Queue a resume analysis; resolves to the job status ({ jobId, status, resultUrl, ... })
+export const submitResumeAnalysisJob = async (
+  resumeFile,
+  jobDescription,
+  analysisType = "general",
+  priority = "normal"
+) => {
+  try {
+    const formData = new FormData();
+    formData.append("resume", resumeFile);
+    formData.append("jobDescription", jobDescription);
+    formData.append("analysisType", analysisType);
+    formData.append("priority", priority);
+
+    const response = await aiApi.post("/jobs/analyze-resume", formData, {
+      headers: {
+        "Content-Type": "multipart/form-data",
+      },
+    });
+
+    return response.data;
+  } catch (error) {
+    console.error("Resume analysis job submission error:", error);
+    throw error;
+  }
+};
+
+// Queue a company research question
+export const submitCompanyResearchJob = async (researchData, priority = "normal") => {
+  try {
+    const response = await aiApi.post("/jobs/research-company", {
+      ...researchData,
+      priority,
+    });
+    return response.data;
+  } catch (error) {
+    console.error("Company research job submission error:", error);
+    throw error;
+  }
+};
+
+// Poll a queued job until it finishes; resolves to the same body the synchronous endpoint returns
+export const waitForJob = async (jobId, intervalMs = 2000, timeoutMs = 300000) => {
+  const deadline = Date.now() + timeoutMs;
+  while (Date.now() < deadline) {
+    const response = await aiApi.get(`/jobs/${jobId}/result`, {
+      validateStatus: () => true,
+    });
+    if (response.status !== 202) {
+      if (response.status >= 400) {
+        const error = new Error(response.data?.error || "Job failed");
+        error.response = response;
+        throw error;
+      }
+      return response.data;
+    }
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+  throw new Error(`Job ${jobId} did not finish in time`);
+};
+
 // Generate interview questions for AI Prep
 export const generateInterviewQuestions = async (prepData) => {
   try {
@@ -72,6 +191,26 @@ export const researchCompany = async (researchData) => {
   }
 };
 
+// Ask several questions about one company in a single request (one ingest and retrieval pass);
+// answerMode "batched" answers them all with one LLM call
+export const researchCompanyQuestions = async (
+  company,
+  questions,
+  answerMode = "concurrent"
+) => {
+  try {
+    const response = await aiApi.post("/research-company", {
+      company,
+      questions,
+      answerMode,
+    });
+    return response.data;
+  } catch (error) {
+    console.error("Company research error:", error);
+    throw error;
+  }
+};
+
 // Health check for AI Services API
 export const checkAIServicesHealth = async () => {
   try {